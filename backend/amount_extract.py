@@ -0,0 +1,158 @@
+"""
+Single-pass extraction of money mentions from tender text.
+
+The API (past-tender analysis) and the Streamlit bid page used to run their own
+label regexes - rebuilt per call, one re.search pass per pattern - and disagreed
+on lakh / crore handling. extract_amounts() makes ONE pass over the text with
+precompiled regexes and returns every money mention with:
+
+- label:  budget / emd / performance_security / tender_fee / solvency / turnover /
+          cost (generic) / None, from the nearest label on the same line
+          (up to LABEL_WINDOW chars before the amount, or AFTER_LABEL_WINDOW after it)
+- amount, unit ("lakh" / "crore" / None) and value (normalized INR)
+- page (1-based, counted from form feeds / extract_amounts_from_pages) and offset
+
+pick_budget() / pick_emd() apply the old precedence rules to the mention list, so a
+document is scanned once for every field. Benchmark: backend/bench_amounts.py.
+"""
+import re
+
+LABEL_WINDOW = 80  # label ... amount, same line
+AFTER_LABEL_WINDOW = 60  # amount ... label, same line (e.g. "Rs. 2,00,000 as EMD")
+MIN_BUDGET_INR = 1_000
+
+LABELS = {
+    "budget": r"estimated\s+(?:total|cost|amount|value)|tender\s+(?:value|amount)|approximate\s+(?:cost|value)"
+              r"|total\s+(?:estimated|amount|cost)|project\s+cost|contract\s+value|amount\s+put\s+to\s+tender",
+    "emd": r"emd|earnest\s+money(?:\s+deposit)?|bid\s+security",
+    "performance_security": r"performance\s+(?:security|(?:bank\s+)?guarantee)",
+    "tender_fee": r"tender\s+(?:document\s+)?fee|document\s+fee|cost\s+of\s+(?:the\s+)?(?:tender|bid)\s+document",
+    "solvency": r"solvency",
+    "turnover": r"turnover",
+    "cost": r"cost|value|amount|budget",  # generic, lowest priority
+}
+
+_UNITS = {"lakh": 100_000, "crore": 10_000_000}
+_NUMBER = r"\d[\d,]*(?:\.\d+)?"
+
+_LABEL_RE = re.compile("|".join(rf"\b(?P<{label}>{pattern})\b" for label, pattern in LABELS.items()), re.IGNORECASE)
+# The text itself is scanned once, for amounts only; labels are matched inside the
+# small same-line window around each hit (alternating labels into the main scan
+# makes the regex engine try every label at every character). The leading lookahead
+# lets most positions fail on one character test; word boundaries are checked on hits.
+_AMOUNT_RE = re.compile(
+    r"(?=[₹RrIi0-9])(?:"
+    # ₹ / Rs. / INR / Rupees + number + optional unit (single-letter L / C only right after a number)
+    rf"(?P<currency>₹|Rs\b\.?|INR\b|Rupees\b)\s*(?P<amount>{_NUMBER})"
+    r"(?:\s*(?P<unit>lakhs?|lacs?|crores?|cr\b\.?|l\b|c\b))?"
+    # number + written unit, no currency ("52.18 Crore")
+    rf"|(?P<bare_amount>{_NUMBER})\s*(?P<bare_unit>lakhs?|lacs?|crores?|cr\b\.?))",
+    re.IGNORECASE,
+)
+
+
+def _unit_name(unit: str):
+    if not unit:
+        return None
+    unit = unit.lower().rstrip(".")
+    return "lakh" if unit[0] == "l" else "crore"
+
+
+def _label_for(text: str, start: int, end: int):
+    """Nearest label before the amount on its line, else a specific label right after it."""
+    line_start = text.rfind("\n", 0, start) + 1
+    before = None
+    for m in _LABEL_RE.finditer(text, max(line_start, start - LABEL_WINDOW - 40), start):
+        if start - m.end() <= LABEL_WINDOW:
+            before = m.lastgroup  # label groups have no nested groups, so lastgroup names the label
+    if before is not None and before != "cost":
+        return before
+    line_end = text.find("\n", end)
+    for m in _LABEL_RE.finditer(text, end, min(end + AFTER_LABEL_WINDOW + 40, len(text) if line_end < 0 else line_end)):
+        if m.start() - end > AFTER_LABEL_WINDOW:
+            break
+        if m.lastgroup != "cost":
+            return m.lastgroup
+    return before
+
+
+def iter_amounts(text: str, page: int = None):
+    """Yields every money mention in `text`, in document order (see module docstring for fields)."""
+    page = page or 1
+    counted_to = 0
+    for m in _AMOUNT_RE.finditer(text):
+        if m.start() and (text[m.start() - 1].isalnum() or (m.group("bare_amount") and text[m.start() - 1] in ".,")):
+            continue  # "hours 5", "x12 lakh", the tail of "1.5 lakh" - not a mention start
+        amount_text = m.group("amount") or m.group("bare_amount")
+        try:
+            amount = float(amount_text.replace(",", ""))
+        except ValueError:  # "1,2.3.4"-style garbage
+            continue
+        page += text.count("\f", counted_to, m.start())
+        counted_to = m.start()
+        unit = _unit_name(m.group("unit") or m.group("bare_unit"))
+        yield {
+            "label": _label_for(text, m.start(), m.end()),
+            "amount": amount,
+            "unit": unit,
+            "value": amount * _UNITS[unit] if unit else amount,
+            "currency": m.group("currency") is not None,
+            "page": page,
+            "offset": m.start(),
+            "text": m.group(0),
+            "raw_amount": amount_text,
+        }
+
+
+def extract_amounts(text: str, page: int = None) -> list:
+    return list(iter_amounts(text, page))
+
+
+def extract_amounts_from_pages(pages: list) -> list:
+    """extract_amounts over a list of page texts, with 1-based page numbers."""
+    return [mention for number, text in enumerate(pages, start=1) for mention in extract_amounts(text, number)]
+
+
+def pick_amount(mentions: list, label: str, min_value: float = 0.0) -> float:
+    """Value of the first mention with `label` above `min_value`, else 0.0."""
+    return next((m["value"] for m in mentions if m["label"] == label and m["value"] > min_value), 0.0)
+
+
+def pick_budget(mentions: list) -> float:
+    """
+    Estimated budget in INR: a budget-labelled amount, else the first currency amount
+    with a lakh / crore unit, else any ₹ amount, else a generic cost / value / amount
+    with a unit, else any Rs. / INR amount of 5+ characters. 0.0 if none.
+    """
+    tiers = (
+        lambda m: m["label"] == "budget",
+        lambda m: m["currency"] and m["unit"],
+        lambda m: m["text"].startswith("₹"),
+        lambda m: m["label"] == "cost" and m["unit"],
+        lambda m: m["currency"] and len(m["raw_amount"]) >= 5,
+    )
+    for accept in tiers:
+        value = next((m["value"] for m in mentions if accept(m) and m["value"] > MIN_BUDGET_INR), None)
+        if value is not None:
+            return value
+    return 0.0
+
+
+def pick_emd(mentions: list) -> float:
+    return pick_amount(mentions, "emd")
+
+
+def extract_tender_amounts(text: str) -> dict:
+    """
+    Estimated budget and EMD (INR) from one scan of `text`. The scan stops as soon as
+    both have a labelled mention; the rest of the text is only read for the fallbacks.
+    """
+    mentions = []
+    has_budget = has_emd = False
+    for mention in iter_amounts(text):
+        mentions.append(mention)
+        has_budget = has_budget or (mention["label"] == "budget" and mention["value"] > MIN_BUDGET_INR)
+        has_emd = has_emd or (mention["label"] == "emd" and mention["value"] > 0)
+        if has_budget and has_emd:
+            break
+    return {"estimated_budget": pick_budget(mentions), "emd": pick_emd(mentions)}
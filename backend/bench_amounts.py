@@ -0,0 +1,131 @@
+"""
+Amount extraction benchmark: single-pass scanner vs the previous per-pattern regexes.
+
+Reads sample_tenders/, repeats the corpus to the requested sizes, and times
+extracting the budget + EMD with backend/amount_extract.py against the
+multi-pattern implementation it replaced (kept below as the reference). Also
+prints, per sample PDF, both results so disagreements are visible.
+
+Usage (from the repo root):
+    python backend/bench_amounts.py
+    python backend/bench_amounts.py --sizes-mb 1 10 50 --repeat 3
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.amount_extract import extract_amounts, extract_tender_amounts
+from backend.pdf_extract import extract_pages
+
+SAMPLE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sample_tenders")
+
+
+# --- Reference: the per-pattern extractors previously in rag_api.py ---
+
+def legacy_extract_budget(text: str) -> float:
+    patterns = [
+        r"(?:Estimated\s+(?:Cost|Amount|Value)|Tender\s+(?:Value|Amount)|Approximate\s+(?:Cost|Value)|Total\s+(?:Estimated|Amount))[^\n]{0,80}₹\s*([\d,\.]+)\s*(Lakh|Lakhs|Lac|Lacs|L|Crore|Crores|Cr|CR|C)?",
+        r"(?:Estimated\s+(?:Cost|Amount|Value)|Tender\s+(?:Value|Amount)|Approximate\s+(?:Cost|Value)|Total\s+(?:Estimated|Amount))[^\n]{0,80}(?:Rs\.?|INR)\s*([\d,\.]+)\s*(Lakh|Lakhs|Lac|Lacs|L|Crore|Crores|Cr|CR|C)?",
+        r"(?:Rs\.?|INR|₹)\s*([\d,\.]+)\s*(Lakh|Lakhs|Lac|Lacs|Crore|Crores|Cr)\b",
+        r"₹\s*([\d,\.]+)\s*(Lakh|Lakhs|Lac|Lacs|L|Crore|Crores|Cr|CR)?",
+        r"(?:cost|value|amount|budget)[^\n]{0,60}([\d,\.]+)\s*(Lakh|Lakhs|Lac|Lacs|Crore|Crores)",
+        r"(?:Rs\.?|INR)\s*([\d,\.]{5,})",
+    ]
+    for pat in patterns:
+        m = re.search(pat, text, re.IGNORECASE)
+        if m:
+            try:
+                val = float(m.group(1).replace(",", ""))
+                if val == 0:
+                    continue
+                unit = (m.group(2) or "").strip().lower() if m.lastindex and m.lastindex >= 2 else ""
+                if unit in ("lakh", "lakhs", "lac", "lacs", "l"):
+                    val *= 100_000
+                elif unit in ("crore", "crores", "cr", "c"):
+                    val *= 10_000_000
+                if val > 1_000:
+                    return val
+            except (ValueError, IndexError, AttributeError):
+                continue
+    return 0.0
+
+
+def legacy_extract_emd(text: str) -> float:
+    patterns = [
+        r"(?:EMD|Earnest\s+Money(?:\s+Deposit)?)[^\n₹]{0,80}₹\s*([\d,\.]+)\s*(Lakh|Lakhs|Lac|Crore|Crores|Cr)?",
+        r"(?:EMD|Earnest\s+Money(?:\s+Deposit)?)[^\n]{0,80}(?:Rs\.?|INR)\s*([\d,\.]+)\s*(Lakh|Lakhs|Lac|Crore|Crores|Cr)?",
+        r"(?:Rs\.?|INR|₹)\s*([\d,\.]+)[^\n]{0,40}(?:EMD|Earnest\s+Money)",
+    ]
+    for pat in patterns:
+        m = re.search(pat, text, re.IGNORECASE)
+        if m:
+            try:
+                val = float(m.group(1).replace(",", ""))
+                if val == 0:
+                    continue
+                unit = (m.group(2) or "").strip().lower() if m.lastindex and m.lastindex >= 2 else ""
+                if unit in ("lakh", "lakhs", "lac"):
+                    val *= 100_000
+                elif unit in ("crore", "crores", "cr"):
+                    val *= 10_000_000
+                return val
+            except (ValueError, IndexError, AttributeError):
+                continue
+    return 0.0
+
+
+def load_corpus(sample_dir: str) -> dict:
+    corpus = {}
+    for fname in sorted(os.listdir(sample_dir)):
+        if fname.lower().endswith(".pdf"):
+            corpus[fname] = "".join(p["text"] + "\n" for p in extract_pages(os.path.join(sample_dir, fname)))
+    return corpus
+
+
+def best_time(func, text: str, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.time()
+        func(text)
+        timings.append(time.time() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Single-pass vs per-pattern amount extraction")
+    parser.add_argument("--sample-dir", default=SAMPLE_DIR)
+    parser.add_argument("--sizes-mb", nargs="+", type=float, default=[1, 10])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.sample_dir)
+    if not corpus:
+        print(f"No PDFs found in {args.sample_dir}")
+        return
+
+    print("[BENCH] Per-document results (budget / EMD, INR):")
+    for fname, text in corpus.items():
+        new = extract_tender_amounts(text)
+        print(f"  {fname:<42} new {new['estimated_budget']:>16,.0f} / {new['emd']:>14,.0f}   "
+              f"legacy {legacy_extract_budget(text):>16,.0f} / {legacy_extract_emd(text):>14,.0f}")
+
+    legacy = lambda text: (legacy_extract_budget(text), legacy_extract_emd(text))
+    base = "\n".join(corpus.values())
+    for size_mb in args.sizes_mb:
+        # Amounts are placed at the END of the text (worst case for first-match searches)
+        filler = re.sub(r"(?i)rs\.?|inr|₹|lakh|crore|emd|earnest|estimated|\d", "x", base)
+        text = filler * max(1, int(size_mb * 1024 * 1024 / len(filler))) + base
+        legacy_s = best_time(legacy, text, args.repeat)
+        new_s = best_time(extract_tender_amounts, text, args.repeat)
+        mentions = len(extract_amounts(text))
+        print(f"[BENCH] {len(text) / 1024 / 1024:6.1f} MB: legacy {legacy_s * 1000:8.1f} ms, "
+              f"single-pass {new_s * 1000:8.1f} ms ({legacy_s / new_s:.1f}x), {mentions} mentions")
+
+
+if __name__ == "__main__":
+    main()
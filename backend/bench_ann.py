@@ -0,0 +1,127 @@
+"""
+Recall-vs-latency benchmark for the per-tender index types (backend/index_factory.py).
+
+Builds flat, HNSW and IVF-PQ indexes over the same vectors and reports, per type:
+build time, index size, mean query latency and recall@k against exact (flat) search.
+HNSW efSearch and IVF nprobe are swept so INDEX_HNSW_EF_SEARCH / INDEX_IVF_NPROBE can
+be picked for a target recall.
+
+Vectors are synthetic clustered unit vectors by default (sample_tenders/ alone is too
+small for ANN to matter); --source corpus embeds the sample_tenders/ chunks instead.
+
+Usage (from the repo root):
+    python backend/bench_ann.py
+    python backend/bench_ann.py --sizes 20000 200000 --k 10 --ef-search 32 64 128 --nprobe 8 16 32
+    python backend/bench_ann.py --source corpus
+"""
+import argparse
+import os
+import sys
+import time
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import faiss
+import numpy as np
+
+from backend.index_factory import build_index
+
+SAMPLE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sample_tenders")
+
+
+def synthetic_vectors(n: int, dim: int, seed: int = 0) -> np.ndarray:
+    """Unit vectors around n/50 random centroids - closer to sentence embeddings than uniform noise."""
+    rng = np.random.default_rng(seed)
+    centroids = rng.standard_normal((max(1, n // 50), dim)).astype(np.float32)
+    vectors = centroids[rng.integers(0, len(centroids), n)] + 0.35 * rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def corpus_vectors(sample_dir: str) -> np.ndarray:
+    from backend.bench_embeddings import load_corpus_chunks
+    from backend.embedding_engine import create_embeddings
+    chunks = load_corpus_chunks(sample_dir, 1000, 100)
+    return np.asarray(create_embeddings().embed_documents(chunks), dtype=np.float32)
+
+
+def timed_search(index, queries: np.ndarray, k: int):
+    start = time.time()
+    _, ids = index.search(queries, k)
+    return ids, (time.time() - start) / len(queries) * 1000
+
+
+def recall_at_k(ids: np.ndarray, truth: np.ndarray) -> float:
+    k = truth.shape[1]
+    return float(np.mean([len(set(a) & set(b)) / k for a, b in zip(ids, truth)]))
+
+
+def bench_size(vectors: np.ndarray, queries: np.ndarray, k: int, ef_search: list, nprobe: list, types: list,
+               search_threads: int):
+    n = len(vectors)
+    print(f"\n[BENCH] {n} vectors, dim {vectors.shape[1]}, {len(queries)} queries, k={k}")
+    truth = None
+    for index_type in ["flat"] + [t for t in types if t != "flat"]:
+        if index_type == "ivfpq" and n < 256 * 39:
+            print(f"[BENCH] {'ivfpq':<6} skipped: needs >= {256 * 39} vectors to train")
+            continue
+        faiss.omp_set_num_threads(os.cpu_count() or 1)  # builds use every core, as in ingestion
+        start = time.time()
+        index = build_index(vectors, index_type)
+        build_s = time.time() - start
+        faiss.omp_set_num_threads(search_threads)
+        size_mb = faiss.serialize_index(index).nbytes / (1024 * 1024)
+
+        if index_type == "flat":
+            truth, latency = timed_search(index, queries, k)
+            print(f"[BENCH] {'flat':<6} build {build_s:6.2f}s  size {size_mb:8.1f} MB  "
+                  f"{latency:7.3f} ms/query  recall@{k} 1.000")
+            continue
+
+        if index_type == "hnsw":
+            sweep = [("efSearch", ef, lambda ef=ef: setattr(index.hnsw, "efSearch", ef)) for ef in ef_search]
+        else:
+            sweep = [("nprobe", p, lambda p=p: setattr(index, "nprobe", min(p, index.nlist))) for p in nprobe]
+        for knob, value, apply in sweep:
+            apply()
+            ids, latency = timed_search(index, queries, k)
+            print(f"[BENCH] {index_type:<6} build {build_s:6.2f}s  size {size_mb:8.1f} MB  "
+                  f"{latency:7.3f} ms/query  recall@{k} {recall_at_k(ids, truth):.3f}  ({knob}={value})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flat vs HNSW vs IVF-PQ recall and latency")
+    parser.add_argument("--source", choices=["synthetic", "corpus"], default="synthetic")
+    parser.add_argument("--sample-dir", default=SAMPLE_DIR)
+    parser.add_argument("--sizes", nargs="+", type=int, default=[2000, 20000, 100000],
+                        help="number of synthetic vectors (ignored for --source corpus)")
+    parser.add_argument("--dim", type=int, default=384, help="synthetic vector dimension (bge-small = 384)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--types", nargs="+", choices=["hnsw", "ivfpq"], default=["hnsw", "ivfpq"])
+    parser.add_argument("--ef-search", nargs="+", type=int, default=[16, 32, 64, 128])
+    parser.add_argument("--nprobe", nargs="+", type=int, default=[4, 16, 64])
+    parser.add_argument("--threads", type=int, default=1,
+                        help="FAISS OpenMP threads for search (1 = per-request latency as the API sees it)")
+    args = parser.parse_args()
+
+    if args.source == "corpus":
+        vectors = corpus_vectors(args.sample_dir)
+        if not len(vectors):
+            print(f"No text chunks found in {args.sample_dir}")
+            return
+        datasets = [vectors]
+    else:
+        datasets = [synthetic_vectors(n, args.dim) for n in args.sizes]
+
+    rng = np.random.default_rng(1)
+    for vectors in datasets:
+        # Queries are perturbed corpus vectors, like a question paraphrasing a clause
+        queries = vectors[rng.integers(0, len(vectors), args.queries)]
+        queries = queries + 0.1 * rng.standard_normal(queries.shape).astype(np.float32)
+        queries = np.ascontiguousarray(queries / np.linalg.norm(queries, axis=1, keepdims=True), dtype=np.float32)
+        bench_size(vectors, queries, args.k, args.ef_search, args.nprobe, args.types, args.threads)
+
+
+if __name__ == "__main__":
+    main()
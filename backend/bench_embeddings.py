@@ -0,0 +1,113 @@
+"""
+Embedding throughput benchmark on the sample_tenders/ corpus.
+
+Chunks every PDF the same way /upload-tender does, then times embed_documents for
+each engine configuration and prints chunks/sec, so production hosts can be sized.
+
+Usage (from the repo root):
+    python backend/bench_embeddings.py
+    python backend/bench_embeddings.py --batch-sizes 64 256 --threads 1 4 --parallel none 0 --quantized both
+"""
+import argparse
+import itertools
+import os
+import sys
+import time
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from backend.embedding_engine import create_embeddings, engine_id, EMBEDDING_MODEL
+from backend.pdf_extract import extract_pages
+
+SAMPLE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sample_tenders")
+
+
+def load_corpus_chunks(sample_dir: str, chunk_size: int, chunk_overlap: int) -> list:
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    chunks = []
+    for fname in sorted(os.listdir(sample_dir)):
+        if not fname.lower().endswith(".pdf"):
+            continue
+        pages = extract_pages(os.path.join(sample_dir, fname))
+        text = "\n".join(p["text"] for p in pages if p["text"].strip())
+        chunks.extend(splitter.split_text(text))
+    return chunks
+
+
+def _none_or_int(value: str):
+    return None if value.lower() == "none" else int(value)
+
+
+def bench_config(chunks: list, model: str, batch_size: int, threads, parallel, quantized: bool, repeat: int) -> dict:
+    start = time.time()
+    engine = create_embeddings(model_name=model, batch_size=batch_size, threads=threads,
+                               parallel=parallel, quantized=quantized)
+    engine.embed_documents(chunks[:8])  # warm-up: model download / session start
+    load_time = time.time() - start
+
+    timings = []
+    for _ in range(repeat):
+        start = time.time()
+        engine.embed_documents(chunks)
+        timings.append(time.time() - start)
+    best = min(timings)
+    return {
+        "engine": engine_id(model, quantized),
+        "batch_size": batch_size,
+        "threads": threads,
+        "parallel": parallel,
+        "load_s": load_time,
+        "best_s": best,
+        "chunks_per_sec": len(chunks) / best if best else float("inf"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding engine throughput on sample_tenders/")
+    parser.add_argument("--sample-dir", default=SAMPLE_DIR)
+    parser.add_argument("--model", default=EMBEDDING_MODEL)
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[32, 128, 256])
+    parser.add_argument("--threads", nargs="+", type=_none_or_int, default=[None, 1, os.cpu_count() or 1],
+                        help="ONNX intra-op threads; 'none' = onnxruntime default")
+    parser.add_argument("--parallel", nargs="+", type=_none_or_int, default=[None, 0],
+                        help="data-parallel processes; 'none' = single process, 0 = all cores")
+    parser.add_argument("--quantized", choices=["no", "yes", "both"], default="both")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=2)
+    args = parser.parse_args()
+
+    chunks = load_corpus_chunks(args.sample_dir, args.chunk_size, args.chunk_overlap)
+    if not chunks:
+        print(f"No text chunks found in {args.sample_dir}")
+        return
+    print(f"[BENCH] {len(chunks)} chunks from {args.sample_dir}")
+
+    quantized_options = {"no": [False], "yes": [True], "both": [False, True]}[args.quantized]
+    results = []
+    for quantized, batch_size, threads, parallel in itertools.product(
+            quantized_options, args.batch_sizes, args.threads, args.parallel):
+        try:
+            result = bench_config(chunks, args.model, batch_size, threads, parallel, quantized, args.repeat)
+        except Exception as e:
+            print(f"[BENCH] Skipping quantized={quantized} batch={batch_size} threads={threads} parallel={parallel}: {e}")
+            continue
+        results.append(result)
+        print(f"[BENCH] {result['engine']:<32} batch={batch_size:<4} threads={str(threads):<5} "
+              f"parallel={str(parallel):<5} {result['chunks_per_sec']:8.1f} chunks/s "
+              f"(best {result['best_s']:.2f}s, load {result['load_s']:.2f}s)")
+
+    if results:
+        best = max(results, key=lambda r: r["chunks_per_sec"])
+        print("\nFastest configuration:")
+        print(f"  EMBEDDING_MODEL={args.model} EMBEDDING_QUANTIZED={int(best['engine'].endswith('-int8'))} "
+              f"EMBEDDING_BATCH_SIZE={best['batch_size']} EMBEDDING_THREADS={best['threads'] or ''} "
+              f"EMBEDDING_PARALLEL={'' if best['parallel'] is None else best['parallel']} "
+              f"-> {best['chunks_per_sec']:.1f} chunks/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Risk engine text extraction benchmark: PyMuPDF vs pdfplumber.
+
+For every PDF in sample_tenders/ (and, with --scale N, one document made of all
+samples repeated N times, which is large enough for the parallel page path),
+times each risk_engine.PDF_EXTRACTORS backend and reports how many clauses
+split_clauses finds in its text. The "flattened" column is the clause count of the
+old whitespace-collapsing cleanup, which left the clause splitter no line breaks.
+
+Usage (from the repo root):
+    python backend/bench_risk_extract.py
+    python backend/bench_risk_extract.py --scale 40 --repeat 3
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz  # PyMuPDF
+
+from backend.risk_engine import PDF_EXTRACTORS, clean_extracted_text, split_clauses
+
+SAMPLE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sample_tenders")
+
+
+def build_scaled_pdf(paths: list, scale: int) -> str:
+    """Writes one PDF containing every sample `scale` times; returns its path."""
+    combined = fitz.open()
+    for _ in range(scale):
+        for path in paths:
+            with fitz.open(path) as doc:
+                combined.insert_pdf(doc)
+    fd, out_path = tempfile.mkstemp(suffix=".pdf")
+    os.close(fd)
+    combined.save(out_path)
+    combined.close()
+    return out_path
+
+
+def best_time(func, path: str, repeat: int):
+    timings, pages = [], None
+    for _ in range(repeat):
+        start = time.time()
+        pages = func(path)
+        timings.append(time.time() - start)
+    return min(timings), pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PyMuPDF vs pdfplumber for risk_engine.extract_text")
+    parser.add_argument("--sample-dir", default=SAMPLE_DIR)
+    parser.add_argument("--scale", type=int, default=40, help="repeat the samples N times in one PDF (0 = skip)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    paths = [os.path.join(args.sample_dir, f) for f in sorted(os.listdir(args.sample_dir)) if f.lower().endswith(".pdf")]
+    if not paths:
+        print(f"No PDFs found in {args.sample_dir}")
+        return
+
+    scaled = build_scaled_pdf(paths, args.scale) if args.scale > 0 else None
+    try:
+        for path in paths + ([scaled] if scaled else []):
+            label = f"samples x{args.scale}" if path == scaled else os.path.basename(path)
+            with fitz.open(path) as doc:
+                page_count = len(doc)
+            print(f"[BENCH] {label} ({page_count} pages)")
+            for name, extract_pages in PDF_EXTRACTORS.items():
+                try:
+                    seconds, pages = best_time(extract_pages, path, args.repeat)
+                except ImportError as e:
+                    print(f"  {name:<11} unavailable: {e}")
+                    continue
+                raw = "\n".join(pages)
+                clauses = len(split_clauses(clean_extracted_text(raw)))
+                flattened = len(split_clauses(re.sub(r"\s+", " ", raw).strip()))
+                print(f"  {name:<11} {seconds * 1000:9.1f} ms  {clauses:5d} clauses (flattened: {flattened})")
+    finally:
+        if scaled:
+            os.remove(scaled)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Structure-aware chunking for tender documents.
+
+RecursiveCharacterTextSplitter cuts at a character budget, so a clause routinely
+ends up split across two chunks (and the 10% overlap duplicates text). Tenders
+carry their own structure, which ClauseTextSplitter splits on instead:
+
+- numbered clauses: "5.", "6)", "5.2.1", "Clause 12.3" at the start of a line
+  (the boundary risk_engine.split_clauses uses, extended to multi-level numbers)
+- headings: SECTION / CHAPTER / ANNEXURE / ... lines, markdown headings, short
+  ALL-CAPS lines - a heading always starts a new chunk
+- tables: consecutive "|"-delimited or column-aligned lines stay in one piece
+
+Whole clauses are packed into chunks of up to chunk_size characters; only a
+single clause longer than that is cut (recursively, with chunk_overlap). Each
+chunk records its clause number ("clause") and section heading ("heading") as
+metadata. CHUNKER=recursive restores the character splitter.
+"""
+import os
+import re
+
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter, TextSplitter
+
+# Configuration
+CHUNKER = os.getenv("CHUNKER", "clause").lower()  # clause | recursive
+CLAUSE_CHUNKER_VERSION = "clause-v1"  # bump when segmentation changes (part of the index cache key)
+
+_CLAUSE_RE = re.compile(
+    r"^(?:(?:clause|article|para(?:graph)?)\s+(\d{1,3}(?:\.\d{1,3})*)"  # Clause 12.3
+    r"|(\d{1,3}(?:\.\d{1,3})+)[\.\)]?(?=\s)"  # 5.2.1 / 5.2.1.
+    r"|(\d{1,3})[\.\)](?=\s))",  # 5. / 6)
+    re.IGNORECASE,
+)
+_HEADING_RE = re.compile(
+    r"^(?:#{1,6}\s+\S|(?:section|chapter|part|annexure|appendix|schedule|form)\b[\s\-:]*[\w\-]*)",
+    re.IGNORECASE,
+)
+_TABLE_COLUMNS_RE = re.compile(r"\S\s{3,}\S.*\S\s{3,}\S")  # three or more space-separated columns
+_MAX_HEADING_CHARS = 120
+
+
+def _is_table_line(line: str) -> bool:
+    return line.count("|") >= 2 or bool(_TABLE_COLUMNS_RE.search(line))
+
+
+def _is_heading(line: str) -> bool:
+    if len(line) > _MAX_HEADING_CHARS:
+        return False
+    if _HEADING_RE.match(line):
+        return True
+    letters = [c for c in line if c.isalpha()]
+    return len(letters) >= 4 and all(c.isupper() for c in letters) and not line.endswith((".", ","))
+
+
+def _segments(text: str) -> list:
+    """Splits page text into [kind, clause, lines] segments (kind: heading / clause / table / text)."""
+    segments = []
+    for raw in text.split("\n"):
+        line = raw.rstrip()
+        stripped = line.strip()
+        if not stripped:
+            if segments and segments[-1][2] and segments[-1][2][-1] != "":
+                segments[-1][2].append("")  # keep one paragraph break
+            continue
+        current = segments[-1] if segments else None
+        if _is_table_line(stripped):
+            if current is not None and current[0] == "table":
+                current[2].append(line)
+            else:
+                segments.append(["table", current[1] if current else None, [line]])
+            continue
+        match = _CLAUSE_RE.match(stripped)
+        if _is_heading(stripped) and not (match and len(stripped) > 60):
+            segments.append(["heading", match and next(g for g in match.groups() if g), [stripped]])
+        elif match:
+            segments.append(["clause", next(g for g in match.groups() if g), [stripped]])
+        elif current is None or current[0] in ("table", "heading"):
+            segments.append(["text", current[1] if current else None, [stripped]])
+        else:
+            current[2].append(stripped)
+    return [(kind, clause, "\n".join(lines).strip()) for kind, clause, lines in segments]
+
+
+class ClauseTextSplitter(TextSplitter):
+    """Clause / heading / table aware splitter that tags chunks with clause metadata."""
+
+    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 100, **kwargs):
+        super().__init__(chunk_size=chunk_size, chunk_overlap=chunk_overlap, **kwargs)
+        self._fallback = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        # Clause / heading in force at the end of the previous page, per source, so a
+        # page that opens mid-clause is still attributed to it (pages arrive in order)
+        self._carry = {}
+
+    def split_text(self, text: str) -> list:
+        chunks, _ = self._split(text, (None, None))
+        return [chunk for chunk, _, _ in chunks]
+
+    def _split(self, text: str, carry: tuple) -> tuple:
+        """
+        ([(chunk_text, clause, heading)], carry) for one page, starting from the carried
+        (clause, heading) and returning the one in force at the end of the page.
+        """
+        chunks = []
+        buf, buf_clause, buf_heading = [], None, None
+        clause, heading = carry
+
+        def flush():
+            nonlocal buf
+            if buf:
+                chunks.append(("\n".join(buf), buf_clause, buf_heading))
+                buf = []
+
+        for kind, seg_clause, seg_text in _segments(text):
+            if kind == "heading":
+                flush()
+                heading = seg_text[:_MAX_HEADING_CHARS]
+            if seg_clause is not None:
+                clause = seg_clause
+            if len(seg_text) > self._chunk_size:
+                flush()
+                chunks.extend((piece, clause, heading) for piece in self._fallback.split_text(seg_text))
+                continue
+            if buf and sum(len(b) + 1 for b in buf) + len(seg_text) > self._chunk_size:
+                flush()
+            if not buf:
+                buf_clause, buf_heading = clause, heading
+            elif buf_clause is None:
+                buf_clause = clause  # chunk opened with a heading: tag it with its first clause
+            buf.append(seg_text)
+        flush()
+        return chunks, (clause, heading)
+
+    def create_documents(self, texts: list, metadatas: list = None) -> list:
+        documents = []
+        for i, text in enumerate(texts):
+            metadata = (metadatas or [{}] * len(texts))[i] or {}
+            source = metadata.get("source")
+            chunks, self._carry[source] = self._split(text, self._carry.get(source, (None, None)))
+            for chunk, clause, heading in chunks:
+                chunk_metadata = dict(metadata)
+                if clause is not None:
+                    chunk_metadata["clause"] = clause
+                if heading is not None:
+                    chunk_metadata["heading"] = heading
+                documents.append(Document(page_content=chunk, metadata=chunk_metadata))
+        return documents
+
+
+def make_text_splitter(chunk_size: int, chunk_overlap: int) -> TextSplitter:
+    """Splitter for an ingestion path (CHUNKER selects clause-aware or character splitting)."""
+    if CHUNKER == "recursive":
+        return RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    return ClauseTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+
+
+def chunker_id() -> str:
+    """Chunking algorithm id for index cache keys ("recursive" for the original splitter)."""
+    return "recursive" if CHUNKER == "recursive" else CLAUSE_CHUNKER_VERSION
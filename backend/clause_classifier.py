@@ -0,0 +1,198 @@
+"""
+Local clause-risk classifier.
+
+risk_engine.LABELS is a fixed five-way taxonomy, so most clauses don't need a 70B
+model: a logistic regression on the BGE embeddings the service already computes
+separates them well. This module:
+
+- trains LogisticRegression on the Groq labels held in risk_engine's clause cache
+  (each entry carries its clause text; "None" is a class of its own) once
+  CLAUSE_MIN_TRAIN_LABELS are available - offline, via the CLI below, never inside a
+  request. The cache is already deduplicated per clause and bounded by TTL and size,
+  so the training set stays bounded (CLAUSE_CACHE_ENABLED=0 leaves nothing to train on)
+- predicts in-process: a clause whose top class probability is below
+  CLAUSE_LOCAL_THRESHOLD is left for Groq
+
+Until a model file exists (or while it was trained on other vectors - the file stores
+the embedding engine id) every clause goes to Groq. A model file written by the CLI
+while the server runs is picked up on the next classification. Embeddings go through
+the shared on-disk embedding cache, so repeat clauses cost one lookup plus a
+sub-millisecond predict.
+
+Build the model (from the repo root; re-run once the cached labels have grown by
+CLAUSE_RETRAIN_GROWTH, which is logged):
+    python backend/clause_classifier.py train
+"""
+import hashlib
+import os
+import re
+import sys
+import threading
+import time
+
+import numpy as np
+
+# Configuration
+CLAUSE_CLASSIFIER_ENABLED = os.getenv("CLAUSE_CLASSIFIER_ENABLED", "1") == "1"
+CLAUSE_MODEL_PATH = os.getenv("CLAUSE_MODEL_PATH", "clause_classifier.joblib")
+CLAUSE_LOCAL_THRESHOLD = float(os.getenv("CLAUSE_LOCAL_THRESHOLD", "0.75"))
+CLAUSE_MIN_TRAIN_LABELS = int(os.getenv("CLAUSE_MIN_TRAIN_LABELS", "50"))
+CLAUSE_RETRAIN_GROWTH = float(os.getenv("CLAUSE_RETRAIN_GROWTH", "0.5"))  # 0.5 = retrain after 50% more labels
+
+NONE_CLASS = "None"
+
+_embeddings = None
+_model = None  # {"classifier", "engine", "samples"} or False when unavailable
+_model_mtime = None  # mtime of CLAUSE_MODEL_PATH when _model was loaded
+_retrain_logged = False
+_lock = threading.RLock()
+
+
+def normalize_clause(text: str) -> str:
+    """Case / whitespace / clause-number insensitive form used for hashing."""
+    text = re.sub(r"^\s*(?:clause\s+)?\d+(?:\.\d+)*[\.\)]?\s*", "", text.lower())
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def clause_hash(text: str) -> str:
+    return hashlib.sha1(normalize_clause(text).encode("utf-8")).hexdigest()
+
+
+def _get_embeddings():
+    global _embeddings
+    if _embeddings is None:
+        from backend.embedding_cache import CachedEmbeddings, EmbeddingCache, EMBEDDING_CACHE_DIR, EMBEDDING_CACHE_ENABLED
+        from backend.embedding_engine import create_embeddings, engine_id
+        _embeddings = create_embeddings()
+        if EMBEDDING_CACHE_ENABLED:
+            _embeddings = CachedEmbeddings(_embeddings, EmbeddingCache(EMBEDDING_CACHE_DIR, engine_id()))
+    return _embeddings
+
+
+def _embed(texts: list) -> np.ndarray:
+    return np.asarray(_get_embeddings().embed_documents([t[:800] for t in texts]), dtype=np.float32)
+
+
+def _label_cache():
+    from backend.risk_engine import CLAUSE_LABEL_SCOPE, clause_label_cache
+    return clause_label_cache, CLAUSE_LABEL_SCOPE
+
+
+def load_labels() -> dict:
+    """clause hash -> (text, category) for every cached Groq label that carries its clause text."""
+    cache, scope = _label_cache()
+    labels = {}
+    for entry in cache.values(scope):
+        if entry.get("text"):  # entries cached before the text was stored can't be trained on
+            labels[clause_hash(entry["text"])] = (entry["text"], entry["category"] or NONE_CLASS)
+    return labels
+
+
+def train() -> dict:
+    """Fits the classifier on the cached Groq labels and saves it (CLI / offline only). Returns the model dict, or None."""
+    import joblib
+    from sklearn.linear_model import LogisticRegression
+    from backend.embedding_engine import engine_id
+
+    with _lock:
+        labels = list(load_labels().values())
+        classes = {category for _, category in labels}
+        if len(labels) < CLAUSE_MIN_TRAIN_LABELS or len(classes) < 2:
+            print(f"[CLAUSE-CLF] Not enough labels to train ({len(labels)} clauses, {len(classes)} classes)")
+            return None
+
+        start = time.time()
+        vectors = _embed([text for text, _ in labels])
+        classifier = LogisticRegression(max_iter=1000, class_weight="balanced", C=4.0)
+        classifier.fit(vectors, [category for _, category in labels])
+        model = {"classifier": classifier, "engine": engine_id(), "samples": len(labels)}
+        joblib.dump(model, f"{CLAUSE_MODEL_PATH}.tmp")
+        os.replace(f"{CLAUSE_MODEL_PATH}.tmp", CLAUSE_MODEL_PATH)  # a running server never loads a partial file
+        print(f"[CLAUSE-CLF] Trained on {len(labels)} clauses ({', '.join(sorted(classes))}) "
+              f"in {time.time() - start:.2f}s")
+        return model
+
+
+def _cached_label_count() -> int:
+    try:
+        cache, scope = _label_cache()
+        return cache.count_scope(scope)
+    except Exception as e:
+        print(f"[CLAUSE-CLF] Could not count cached labels: {e}")
+        return 0
+
+
+def _load_model():
+    """
+    The prebuilt model, (re)loaded when CLAUSE_MODEL_PATH changes on disk. None while
+    no usable model exists - callers then fall back to Groq; nothing is trained here.
+    """
+    global _model, _model_mtime, _retrain_logged
+    try:
+        mtime = os.path.getmtime(CLAUSE_MODEL_PATH)
+    except OSError:
+        mtime = None
+    with _lock:
+        if _model is None or mtime != _model_mtime:
+            _model_mtime = mtime
+            _retrain_logged = False
+            try:
+                import joblib
+                from backend.embedding_engine import engine_id
+                model = joblib.load(CLAUSE_MODEL_PATH) if mtime is not None else None
+                if model is not None and model.get("engine") != engine_id():
+                    print(f"[CLAUSE-CLF] Model was trained on {model.get('engine')} vectors; ignoring it "
+                          f"until it is retrained (python backend/clause_classifier.py train)")
+                    model = None
+                _model = model or False
+                if _model:
+                    print(f"[CLAUSE-CLF] Loaded model trained on {_model['samples']} clauses")
+            except ImportError as e:
+                print(f"[CLAUSE-CLF] scikit-learn unavailable, local classifier disabled: {e}")
+                _model = False
+            except Exception as e:
+                print(f"[CLAUSE-CLF] Could not load {CLAUSE_MODEL_PATH}: {e}")
+                _model = False
+
+        if _model and not _retrain_logged and _cached_label_count() > _model["samples"] * (1 + CLAUSE_RETRAIN_GROWTH):
+            print("[CLAUSE-CLF] Cached labels have grown since the last fit; "
+                  "retrain with: python backend/clause_classifier.py train")
+            _retrain_logged = True
+        return _model or None
+
+
+def local_classify(texts: list) -> list:
+    """
+    Local predictions for `texts`: (category|None, probability) where the top class
+    probability reaches CLAUSE_LOCAL_THRESHOLD, else None (ask Groq).
+    """
+    if not CLAUSE_CLASSIFIER_ENABLED or not texts:
+        return [None] * len(texts)
+    model = _load_model()
+    if model is None:
+        return [None] * len(texts)
+
+    try:
+        probabilities = model["classifier"].predict_proba(_embed(texts))
+    except Exception as e:
+        print(f"[CLAUSE-CLF] Local prediction failed: {e}")
+        return [None] * len(texts)
+
+    classes = model["classifier"].classes_
+    results = []
+    for row in probabilities:
+        best = int(np.argmax(row))
+        if row[best] < CLAUSE_LOCAL_THRESHOLD:
+            results.append(None)
+        else:
+            category = str(classes[best])
+            results.append((None if category == NONE_CLASS else category, float(row[best])))
+    return results
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "train":
+        sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        train()
+    else:
+        print("Usage: python backend/clause_classifier.py train")
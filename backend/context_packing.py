@@ -0,0 +1,142 @@
+"""
+Token-budgeted context assembly for Groq prompts.
+
+Retrieved chunks used to be joined as-is, so prompts carried the splitter overlap
+twice, sometimes the same chunk twice, and had no upper bound. pack_context():
+
+1. drops chunks whose text is already contained in a kept chunk of the same page
+2. merges chunks of the same page whose tail / head overlap (adjacent splits)
+   into one block, ranked by its best member
+3. adds blocks in relevance order until CONTEXT_TOKENS_* is reached
+
+Tokens are counted with tiktoken (cl100k_base, close to Llama 3's tokenizer for
+English text); if its encoding file can't be loaded, ~4 chars per token is used.
+"""
+import os
+import threading
+
+# Configuration
+CONTEXT_TOKENS_SECTION = int(os.getenv("CONTEXT_TOKENS_SECTION", "6000"))
+CONTEXT_TOKENS_SUMMARY = int(os.getenv("CONTEXT_TOKENS_SUMMARY", "4000"))
+CONTEXT_TOKEN_ENCODING = os.getenv("CONTEXT_TOKEN_ENCODING", "cl100k_base")
+
+MIN_OVERLAP_CHARS = 20
+MAX_OVERLAP_CHARS = 400  # splitter overlap is 100-200 chars
+
+_encoding = None
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding():
+    global _encoding
+    if _encoding is None:
+        with _encoding_lock:
+            if _encoding is None:
+                try:
+                    import tiktoken
+                    _encoding = tiktoken.get_encoding(CONTEXT_TOKEN_ENCODING)
+                except Exception as e:
+                    print(f"[CONTEXT] tiktoken unavailable, estimating 4 chars/token: {e}")
+                    _encoding = False
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    encoding = _get_encoding()
+    if encoding:
+        return len(encoding.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+
+def _overlap(head: str, tail: str) -> int:
+    """Length of the longest suffix of `head` that is a prefix of `tail` (0 if < MIN_OVERLAP_CHARS)."""
+    for size in range(min(len(head), len(tail), MAX_OVERLAP_CHARS), MIN_OVERLAP_CHARS - 1, -1):
+        if head.endswith(tail[:size]):
+            return size
+    return 0
+
+
+def _merge_text(a: str, b: str):
+    """a and b as one text if one contains the other or they overlap at either end, else None."""
+    if b in a:
+        return a
+    if a in b:
+        return b
+    size = _overlap(a, b)
+    if size:
+        return a + b[size:]
+    size = _overlap(b, a)
+    if size:
+        return b + a[size:]
+    return None
+
+
+def _page_key(doc):
+    return doc.metadata.get("source"), doc.metadata.get("page")
+
+
+class _Block:
+    def __init__(self, doc, rank: int):
+        self.key = _page_key(doc)
+        self.text = doc.page_content
+        self.docs = [doc]
+        self.rank = rank
+
+    def absorb(self, text: str, docs: list) -> bool:
+        """Merges `text` (made of `docs`) into this block if it is contained in it or overlaps either end."""
+        merged = _merge_text(self.text, text)
+        if merged is None:
+            return False
+        self.text = merged
+        self.docs.extend(docs)
+        return True
+
+
+def pack_context(docs: list, max_tokens: int, separator: str = "\n\n") -> tuple:
+    """
+    Dedupes, merges and budget-packs relevance-ordered `docs`.
+    Returns (context_text, included_docs, stats).
+    """
+    blocks = []
+    duplicates = 0
+    for rank, doc in enumerate(docs):
+        if not doc.page_content.strip():
+            continue
+        merged = None
+        for block in blocks:
+            if (block.key == _page_key(doc) and block.key != (None, None)) or block.text == doc.page_content:
+                if doc.page_content in block.text:
+                    duplicates += 1
+                    merged = block
+                    break
+                if block.absorb(doc.page_content, [doc]):
+                    merged = block
+                    break
+        if merged is None:
+            blocks.append(_Block(doc, rank))
+            continue
+        # A merge can make two blocks of the same page adjacent - fold them together
+        for other in [b for b in blocks if b is not merged and b.key == merged.key]:
+            if merged.absorb(other.text, other.docs):
+                merged.rank = min(merged.rank, other.rank)
+                blocks.remove(other)
+
+    blocks.sort(key=lambda b: b.rank)
+    separator_tokens = count_tokens(separator)
+    packed, used = [], 0
+    for block in blocks:
+        tokens = count_tokens(block.text) + (separator_tokens if packed else 0)
+        if used + tokens > max_tokens:
+            if packed:
+                continue  # a smaller, lower-ranked block may still fit
+            # The best block alone exceeds the budget: keep its head
+            encoding = _get_encoding()
+            block.text = encoding.decode(encoding.encode(block.text, disallowed_special=())[:max_tokens]) \
+                if encoding else block.text[:max_tokens * 4]
+            tokens = count_tokens(block.text)
+        packed.append(block)
+        used += tokens
+
+    stats = {"chunks": len(docs), "blocks": len(packed), "duplicates": duplicates,
+             "dropped_blocks": len(blocks) - len(packed), "tokens": used, "budget": max_tokens}
+    return separator.join(b.text for b in packed), [d for b in packed for d in b.docs], stats
@@ -0,0 +1,213 @@
+"""
+On-disk embedding cache shared by every indexing path.
+
+Tender PDFs from the same authority repeat large boilerplate blocks (GCC clauses,
+forms, declarations). Vectors are stored once per unique chunk text, so a new upload
+only sends previously unseen chunks through the embedding model.
+
+Layout (one directory per embedding model):
+- vectors.f32: float32 rows of `dim` values, append-only, read through np.memmap
+- keys.bin:    16-byte blake2b digests of the chunk text, row i <-> vector row i
+- meta.json:   {"dim": ...}
+
+Vectors are appended before their keys, so a reader never sees a key without its
+vector. Appends take an exclusive file lock, so the API process and background job
+workers can share one cache directory.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Configuration
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "1") == "1"
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", "embedding_cache")
+
+DIGEST_SIZE = 16
+
+
+def text_digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=DIGEST_SIZE).digest()
+
+
+@contextmanager
+def exclusive_file_lock(path: str, blocking: bool = True):
+    """
+    Cross-process lock on a side file (fcntl on POSIX, msvcrt on Windows).
+    With blocking=False, raises BlockingIOError instead of waiting for another holder.
+    """
+    with open(path, "a+b") as lock_file:
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+        except OSError as e:
+            if blocking:
+                raise
+            raise BlockingIOError(f"{path} is locked by another process") from e
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class EmbeddingCache:
+    """Append-only, memory-mapped digest -> float32 vector store."""
+
+    def __init__(self, cache_dir: str, namespace: str):
+        self.dir = os.path.join(cache_dir, re.sub(r"[^A-Za-z0-9._-]", "_", namespace))
+        os.makedirs(self.dir, exist_ok=True)
+        self.keys_path = os.path.join(self.dir, "keys.bin")
+        self.vectors_path = os.path.join(self.dir, "vectors.f32")
+        self.meta_path = os.path.join(self.dir, "meta.json")
+        self.lock_path = os.path.join(self.dir, ".lock")
+        self.dim = self._read_dim()
+        self._index = {}  # digest -> row
+        self._rows = 0
+        self._vectors = None  # np.memmap over the first self._rows rows
+        self._lock = threading.Lock()
+
+    def _read_dim(self):
+        try:
+            with open(self.meta_path, "r") as f:
+                return json.load(f)["dim"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _refresh(self):
+        """Picks up rows appended since the last call (by this or another process)."""
+        if self.dim is None:
+            self.dim = self._read_dim()
+            if self.dim is None:
+                return
+        row_bytes = self.dim * 4
+        try:
+            key_rows = os.path.getsize(self.keys_path) // DIGEST_SIZE
+            vector_rows = os.path.getsize(self.vectors_path) // row_bytes
+        except OSError:
+            return
+        rows = min(key_rows, vector_rows)
+        if rows <= self._rows:
+            return
+        with open(self.keys_path, "rb") as f:
+            f.seek(self._rows * DIGEST_SIZE)
+            new_keys = f.read((rows - self._rows) * DIGEST_SIZE)
+        for i in range(rows - self._rows):
+            self._index.setdefault(new_keys[i * DIGEST_SIZE:(i + 1) * DIGEST_SIZE], self._rows + i)
+        self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+        self._rows = rows
+
+    def get_many(self, digests: list) -> dict:
+        """{digest: vector} for the digests that are cached."""
+        with self._lock:
+            self._refresh()
+            rows = {d: self._index[d] for d in digests if d in self._index}
+            return {d: np.array(self._vectors[row]) for d, row in rows.items()}
+
+    def add_many(self, digests: list, vectors: list):
+        if not digests:
+            return
+        matrix = np.asarray(vectors, dtype=np.float32)
+        with self._lock, exclusive_file_lock(self.lock_path):
+            if self.dim is None:
+                self.dim = self._read_dim()
+            if self.dim is None:
+                self.dim = int(matrix.shape[1])
+                with open(self.meta_path, "w") as f:
+                    json.dump({"dim": self.dim}, f)
+            if matrix.shape[1] != self.dim:
+                print(f"[EMBED-CACHE] Dimension mismatch ({matrix.shape[1]} != {self.dim}); not caching")
+                return
+            self._refresh()
+
+            # Drop the tail of an append that was interrupted between the two files
+            key_rows = os.path.getsize(self.keys_path) // DIGEST_SIZE if os.path.exists(self.keys_path) else 0
+            for path, row_bytes in ((self.keys_path, DIGEST_SIZE), (self.vectors_path, self.dim * 4)):
+                if os.path.exists(path) and os.path.getsize(path) > key_rows * row_bytes:
+                    with open(path, "r+b") as f:
+                        f.truncate(key_rows * row_bytes)
+
+            new_rows = [i for i, d in enumerate(digests) if d not in self._index]
+            seen = set()
+            new_rows = [i for i in new_rows if not (digests[i] in seen or seen.add(digests[i]))]
+            if not new_rows:
+                return
+            with open(self.vectors_path, "ab") as f:
+                f.write(matrix[new_rows].tobytes())
+            with open(self.keys_path, "ab") as f:
+                f.write(b"".join(digests[i] for i in new_rows))
+            self._refresh()
+
+    def __len__(self):
+        with self._lock:
+            self._refresh()
+            return self._rows
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wraps a LangChain embeddings model: embed_documents() only sends chunks whose
+    text has not been embedded before to the underlying model. Queries are not cached.
+    """
+
+    def __init__(self, underlying: Embeddings, cache: EmbeddingCache):
+        self.underlying = underlying
+        self.cache = cache
+        self.hits = 0
+        self.misses = 0
+
+    def embed_documents(self, texts: list) -> list:
+        digests = [text_digest(t) for t in texts]
+        try:
+            found = self.cache.get_many(digests)
+        except Exception as e:
+            print(f"[EMBED-CACHE] Lookup failed (embedding everything): {e}")
+            found = {}
+
+        missing = {}  # digest -> text, de-duplicated within the batch
+        for digest, text in zip(digests, texts):
+            if digest not in found:
+                missing.setdefault(digest, text)
+        if missing:
+            new_vectors = self.underlying.embed_documents(list(missing.values()))
+            try:
+                self.cache.add_many(list(missing.keys()), new_vectors)
+            except Exception as e:
+                print(f"[EMBED-CACHE] Store failed: {e}")
+            found.update(zip(missing.keys(), (np.asarray(v, dtype=np.float32) for v in new_vectors)))
+
+        hits = len(texts) - len(missing)
+        self.hits += hits
+        self.misses += len(missing)
+        if hits:
+            print(f"[EMBED-CACHE] {hits}/{len(texts)} chunks served from cache")
+        return [found[d].tolist() for d in digests]
+
+    def embed_query(self, text: str) -> list:
+        return self.underlying.embed_query(text)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "cached_vectors": len(self.cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else None,
+        }
@@ -0,0 +1,91 @@
+"""
+Embedding engine configuration.
+
+One place to build the FastEmbed model used for indexing and retrieval, with the
+knobs that matter for throughput on CPU hosts:
+
+- EMBEDDING_MODEL:      FastEmbed model name (default BAAI/bge-small-en-v1.5)
+- EMBEDDING_BATCH_SIZE: texts per ONNX run inside one embed call
+- EMBEDDING_THREADS:    intra-op threads of the ONNX session (unset = onnxruntime default)
+- EMBEDDING_PARALLEL:   data-parallel worker processes per embed call
+                        (unset = single process, 0 = all cores)
+- EMBEDDING_QUANTIZED:  1 = int8 dynamically-quantized ONNX export of the model
+
+FastEmbed starts its data-parallel workers on every embed call, so when
+EMBEDDING_PARALLEL is set the caller should hand over large batches.
+Use backend/bench_embeddings.py to measure chunks/sec per configuration.
+"""
+import os
+
+from langchain_community.embeddings import FastEmbedEmbeddings
+
+
+def _optional_int(name: str):
+    value = os.getenv(name, "").strip()
+    return int(value) if value else None
+
+
+# Configuration
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "BAAI/bge-small-en-v1.5")
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "256"))
+EMBEDDING_THREADS = _optional_int("EMBEDDING_THREADS")
+EMBEDDING_PARALLEL = _optional_int("EMBEDDING_PARALLEL")
+EMBEDDING_QUANTIZED = os.getenv("EMBEDDING_QUANTIZED", "0") == "1"
+
+# int8 (dynamic quantization) ONNX exports of supported models, registered with
+# FastEmbed as custom models. Vectors are CLS-pooled and normalized like the originals.
+QUANTIZED_VARIANTS = {
+    "BAAI/bge-small-en-v1.5": {"model": "Xenova/bge-small-en-v1.5", "dim": 384},
+    "BAAI/bge-base-en-v1.5": {"model": "Xenova/bge-base-en-v1.5", "dim": 768},
+}
+QUANTIZED_MODEL_FILE = "onnx/model_quantized.onnx"
+
+_registered_variants = set()
+
+
+def _register_quantized_variant(model_name: str) -> str:
+    """Registers the int8 export of `model_name` with FastEmbed and returns its name."""
+    variant = QUANTIZED_VARIANTS.get(model_name)
+    if variant is None:
+        raise ValueError(f"No quantized variant configured for {model_name}. "
+                         f"Supported: {', '.join(QUANTIZED_VARIANTS)}")
+    if variant["model"] not in _registered_variants:
+        from fastembed import TextEmbedding
+        from fastembed.common.model_description import ModelSource, PoolingType
+        try:
+            TextEmbedding.add_custom_model(
+                model=variant["model"],
+                pooling=PoolingType.CLS,
+                normalization=True,
+                sources=ModelSource(hf=variant["model"]),
+                dim=variant["dim"],
+                model_file=QUANTIZED_MODEL_FILE,
+            )
+        except ValueError:
+            pass  # already registered in this process
+        _registered_variants.add(variant["model"])
+    return variant["model"]
+
+
+def engine_id(model_name: str = None, quantized: bool = None) -> str:
+    """
+    Identifies the vectors an engine produces. Batch size / threads / parallelism
+    don't change the vectors; the model and quantization do.
+    """
+    model_name = model_name or EMBEDDING_MODEL
+    quantized = EMBEDDING_QUANTIZED if quantized is None else quantized
+    return f"{model_name}-int8" if quantized else model_name
+
+
+def create_embeddings(model_name: str = None, batch_size: int = None, threads: int = None,
+                      parallel: int = None, quantized: bool = None) -> FastEmbedEmbeddings:
+    """Builds a FastEmbedEmbeddings instance; arguments override the environment config."""
+    model_name = model_name or EMBEDDING_MODEL
+    quantized = EMBEDDING_QUANTIZED if quantized is None else quantized
+    fastembed_model = _register_quantized_variant(model_name) if quantized else model_name
+    return FastEmbedEmbeddings(
+        model_name=fastembed_model,
+        batch_size=batch_size or EMBEDDING_BATCH_SIZE,
+        threads=threads if threads is not None else EMBEDDING_THREADS,
+        parallel=parallel if parallel is not None else EMBEDDING_PARALLEL,
+    )
@@ -0,0 +1,317 @@
+"""
+Cross-tender (archive-wide) vector index.
+
+Every completed per-tender index is also added to one global index, so a question
+can span several tenders, or the whole archive, without loading N indexes.
+
+- Shards: documents are assigned to GLOBAL_INDEX_SHARDS shards by their index key.
+  Each shard is an IndexIDMap2 over an HNSW graph, so search cost grows roughly
+  logarithmically with archive size; shards are searched concurrently and merged.
+- Metadata: chunks.sqlite3 maps each global chunk id to its document (index key,
+  file hash), page, parser and row in the per-tender chunk store, so text is read
+  lazily from the existing index_store files. Documents are stored once per file
+  hash; the files table maps every uploaded filename to the hash last uploaded
+  under it (a renamed re-upload and a reused name both resolve to the right bytes).
+- Filters: filename / index key / page range / parser. A filter that selects only
+  a few thousand chunks (e.g. one tender) is answered exactly over those vectors;
+  larger filters restrict the HNSW search with an IDSelector.
+
+Writers take a cross-process file lock (the API process and job workers both
+ingest); readers reload a shard when its file changes.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import faiss
+import numpy as np
+
+from backend.embedding_cache import exclusive_file_lock
+from backend.index_store import ChunkStore, VECTORS_FILE
+from backend.index_factory import index_type_name
+
+# Configuration
+GLOBAL_INDEX_ENABLED = os.getenv("GLOBAL_INDEX_ENABLED", "1") == "1"
+GLOBAL_INDEX_DIR = os.getenv("GLOBAL_INDEX_DIR", "global_index")
+GLOBAL_INDEX_SHARDS = int(os.getenv("GLOBAL_INDEX_SHARDS", "4"))
+GLOBAL_HNSW_M = int(os.getenv("GLOBAL_HNSW_M", "32"))
+GLOBAL_HNSW_EF_CONSTRUCTION = int(os.getenv("GLOBAL_HNSW_EF_CONSTRUCTION", "80"))
+GLOBAL_HNSW_EF_SEARCH = int(os.getenv("GLOBAL_HNSW_EF_SEARCH", "64"))
+GLOBAL_EXACT_FILTER_MAX = int(os.getenv("GLOBAL_EXACT_FILTER_MAX", "4096"))  # filtered ids at or below: exact search
+
+
+class GlobalIndex:
+    def __init__(self, root: str, num_shards: int):
+        self.root = root
+        self.num_shards = num_shards
+        os.makedirs(root, exist_ok=True)
+        self.db_path = os.path.join(root, "chunks.sqlite3")
+        self.lock_path = os.path.join(root, ".lock")
+        self._local = threading.local()
+        self._shards = {}  # shard -> ((mtime_ns, size), index)
+        self._shards_lock = threading.Lock()
+        self._chunk_stores = {}  # index_path -> ChunkStore
+        self._search_pool = ThreadPoolExecutor(max_workers=num_shards, thread_name_prefix="global-index")
+
+    # --- storage ---
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS documents (
+                    index_key TEXT PRIMARY KEY,
+                    index_path TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    file_hash TEXT NOT NULL,
+                    parsing_mode TEXT,
+                    shard INTEGER NOT NULL,
+                    chunk_count INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    added_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS documents_hash ON documents(file_hash);
+                CREATE INDEX IF NOT EXISTS documents_filename ON documents(filename);
+                CREATE TABLE IF NOT EXISTS chunks (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    index_key TEXT NOT NULL,
+                    row INTEGER NOT NULL,
+                    page INTEGER,
+                    parser TEXT
+                );
+                CREATE INDEX IF NOT EXISTS chunks_doc ON chunks(index_key, row);
+                CREATE INDEX IF NOT EXISTS chunks_page ON chunks(page);
+                CREATE INDEX IF NOT EXISTS chunks_parser ON chunks(parser);
+                CREATE TABLE IF NOT EXISTS files (
+                    filename TEXT PRIMARY KEY,
+                    file_hash TEXT NOT NULL,
+                    index_key TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS files_hash ON files(file_hash);
+                -- documents added before the files table existed
+                INSERT OR IGNORE INTO files (filename, file_hash, index_key, updated_at)
+                    SELECT filename, file_hash, index_key, added_at FROM documents;
+            """)
+            self._local.conn = conn
+        return conn
+
+    def shard_for(self, index_key: str) -> int:
+        return int(hashlib.sha1(index_key.encode("utf-8")).hexdigest()[:8], 16) % self.num_shards
+
+    def _shard_path(self, shard: int) -> str:
+        return os.path.join(self.root, f"shard_{shard}.faiss")
+
+    def _load_shard(self, shard: int):
+        """Current shard index (reloaded if another process rewrote it), or None if empty."""
+        path = self._shard_path(shard)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        mtime = (stat.st_mtime_ns, stat.st_size)
+        with self._shards_lock:
+            cached = self._shards.get(shard)
+            if cached and cached[0] == mtime:
+                return cached[1]
+        index = faiss.read_index(path)
+        with self._shards_lock:
+            self._shards[shard] = (mtime, index)
+        return index
+
+    def _new_shard(self, dim: int):
+        hnsw = faiss.IndexHNSWFlat(dim, GLOBAL_HNSW_M)
+        hnsw.hnsw.efConstruction = GLOBAL_HNSW_EF_CONSTRUCTION
+        return faiss.IndexIDMap2(hnsw)
+
+    def _save_shard(self, shard: int, index):
+        path = self._shard_path(shard)
+        faiss.write_index(index, f"{path}.tmp")
+        os.replace(f"{path}.tmp", path)
+
+    def _chunk_store(self, index_path: str) -> ChunkStore:
+        store = self._chunk_stores.get(index_path)
+        if store is None:
+            store = self._chunk_stores[index_path] = ChunkStore(index_path)
+        return store
+
+    # --- ingestion ---
+
+    def add_document(self, index_key: str, index_path: str, filename: str, file_hash: str,
+                     parsing_mode: str = None, embed_fn=None) -> int:
+        """
+        Adds a completed per-tender index. Idempotent: identical file contents are
+        indexed once (whichever chunking config arrives first), but every filename is
+        recorded, so filters find the bytes last uploaded under that name. Returns chunks added.
+        `embed_fn(texts)` re-embeds chunks if the per-tender index can't return its vectors.
+        """
+        conn = self._conn()
+        conn.execute("INSERT OR REPLACE INTO files (filename, file_hash, index_key, updated_at) VALUES (?, ?, ?, ?)",
+                     (filename, file_hash, index_key, time.time()))
+        conn.commit()
+        if conn.execute("SELECT 1 FROM documents WHERE file_hash = ? AND status = 'ready'", (file_hash,)).fetchone():
+            return 0
+
+        with exclusive_file_lock(self.lock_path):
+            if conn.execute("SELECT 1 FROM documents WHERE file_hash = ? AND status = 'ready'", (file_hash,)).fetchone():
+                return 0
+            shard = self.shard_for(index_key)
+            # Mutate a private copy: the cached shard may be serving searches right now
+            shard_path = self._shard_path(shard)
+            index = faiss.read_index(shard_path) if os.path.exists(shard_path) else None
+
+            # A previous add died before it was marked ready: drop its rows. Vectors it may
+            # already have written keep ids that are never reused (AUTOINCREMENT) and are
+            # ignored by search, since HNSW can't remove them.
+            if conn.execute("SELECT 1 FROM documents WHERE file_hash = ? AND status = 'pending'", (file_hash,)).fetchone():
+                conn.execute("DELETE FROM chunks WHERE index_key IN "
+                             "(SELECT index_key FROM documents WHERE file_hash = ? AND status = 'pending')", (file_hash,))
+                conn.execute("DELETE FROM documents WHERE file_hash = ? AND status = 'pending'", (file_hash,))
+                conn.commit()
+
+            store = ChunkStore(index_path)
+            source = faiss.read_index(os.path.join(index_path, VECTORS_FILE))
+            try:
+                if index_type_name(source) == "ivfpq" and embed_fn is not None:
+                    raise RuntimeError("PQ codes are lossy")  # re-embed (mostly embedding-cache hits)
+                vectors = source.reconstruct_n(0, source.ntotal)
+            except RuntimeError:
+                if embed_fn is None:
+                    raise
+                vectors = np.asarray(embed_fn([d.page_content for d in store.documents()]), dtype=np.float32)
+            vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+
+            metadatas = [store.search(row).metadata for row in range(len(store))]
+            conn.execute(
+                "INSERT OR REPLACE INTO documents (index_key, index_path, filename, file_hash, parsing_mode, "
+                "shard, chunk_count, status, added_at) VALUES (?, ?, ?, ?, ?, ?, ?, 'pending', ?)",
+                (index_key, index_path, filename, file_hash, parsing_mode, shard, len(metadatas), time.time()),
+            )
+            conn.executemany(
+                "INSERT INTO chunks (index_key, row, page, parser) VALUES (?, ?, ?, ?)",
+                [(index_key, row, m.get("page") if isinstance(m.get("page"), int) else None, m.get("parser"))
+                 for row, m in enumerate(metadatas)],
+            )
+            conn.commit()
+            ids = np.asarray([r[0] for r in conn.execute(
+                "SELECT id FROM chunks WHERE index_key = ? ORDER BY row", (index_key,))], dtype=np.int64)
+
+            if index is None:
+                index = self._new_shard(vectors.shape[1])
+            index.add_with_ids(vectors, ids)
+            self._save_shard(shard, index)
+
+            conn.execute("UPDATE documents SET status = 'ready' WHERE index_key = ?", (index_key,))
+            conn.commit()
+        print(f"[GLOBAL-INDEX] Added {filename} ({len(ids)} chunks) to shard {shard}")
+        return len(ids)
+
+    # --- search ---
+
+    def _filtered_ids(self, filenames=None, index_keys=None, page_min=None, page_max=None, parser=None):
+        """Global ids allowed by the filters, grouped by shard. None = no filter."""
+        clauses, params = ["d.status = 'ready'"], []
+        if filenames:
+            clauses.append(f"d.file_hash IN (SELECT file_hash FROM files WHERE filename IN "
+                           f"({','.join('?' * len(filenames))}))")
+            params.extend(filenames)
+        if index_keys:
+            clauses.append(f"d.index_key IN ({','.join('?' * len(index_keys))})")
+            params.extend(index_keys)
+        if page_min is not None:
+            clauses.append("c.page >= ?")
+            params.append(page_min)
+        if page_max is not None:
+            clauses.append("c.page <= ?")
+            params.append(page_max)
+        if parser:
+            clauses.append("c.parser = ?")
+            params.append(parser)
+        if len(clauses) == 1:
+            return None
+        by_shard = {}
+        for chunk_id, shard in self._conn().execute(
+                f"SELECT c.id, d.shard FROM chunks c JOIN documents d ON d.index_key = c.index_key "
+                f"WHERE {' AND '.join(clauses)}", params):
+            by_shard.setdefault(shard, []).append(chunk_id)
+        return {shard: np.asarray(ids, dtype=np.int64) for shard, ids in by_shard.items()}
+
+    def _search_shard(self, shard: int, query: np.ndarray, k: int, allowed_ids):
+        index = self._load_shard(shard)
+        if index is None or index.ntotal == 0:
+            return []
+        if allowed_ids is not None and len(allowed_ids) <= GLOBAL_EXACT_FILTER_MAX:
+            # Small filter (e.g. one tender): exact L2 over just those vectors
+            vectors = np.vstack([index.reconstruct(int(i)) for i in allowed_ids])
+            distances = ((vectors - query) ** 2).sum(axis=1)
+            top = np.argsort(distances)[:k]
+            return [(float(distances[i]), int(allowed_ids[i])) for i in top]
+        params = faiss.SearchParametersHNSW()
+        params.efSearch = max(GLOBAL_HNSW_EF_SEARCH, k * 2)
+        if allowed_ids is not None:
+            selector = faiss.IDSelectorBatch(allowed_ids)
+            params.sel = selector
+        distances, labels = index.search(query.reshape(1, -1), k, params=params)
+        return [(float(d), int(i)) for d, i in zip(distances[0], labels[0]) if i != -1]
+
+    def search(self, query_vector, k: int = 10, filenames=None, index_keys=None,
+               page_min=None, page_max=None, parser=None) -> list:
+        """Top-k (Document, L2 distance) across the archive, optionally filtered."""
+        query = np.asarray(query_vector, dtype=np.float32)
+        allowed = self._filtered_ids(filenames, index_keys, page_min, page_max, parser)
+        if allowed is not None:
+            shard_jobs = [(shard, ids) for shard, ids in allowed.items()]
+        else:
+            shard_jobs = [(shard, None) for shard in range(self.num_shards)]
+        if not shard_jobs:
+            return []
+
+        futures = [self._search_pool.submit(self._search_shard, shard, query, k, ids) for shard, ids in shard_jobs]
+        hits = sorted((hit for f in futures for hit in f.result()), key=lambda h: h[0])[:k]
+        if not hits:
+            return []
+
+        ids = [chunk_id for _, chunk_id in hits]
+        rows = {r[0]: r[1:] for r in self._conn().execute(
+            f"SELECT c.id, c.row, d.index_path, "
+            f"COALESCE((SELECT f.filename FROM files f WHERE f.file_hash = d.file_hash "
+            f"ORDER BY f.updated_at DESC LIMIT 1), d.filename), d.index_key FROM chunks c "
+            f"JOIN documents d ON d.index_key = c.index_key "
+            f"WHERE d.status = 'ready' AND c.id IN ({','.join('?' * len(ids))})", ids)}
+        results = []
+        for distance, chunk_id in hits:
+            if chunk_id not in rows:
+                continue
+            row, index_path, filename, index_key = rows[chunk_id]
+            doc = self._chunk_store(index_path).search(row)
+            doc.metadata.update({"filename": filename, "index_key": index_key})
+            results.append((doc, distance))
+        return results
+
+    def stats(self) -> dict:
+        conn = self._conn()
+        documents, chunks = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(chunk_count), 0) FROM documents WHERE status = 'ready'").fetchone()
+        shard_sizes = {}
+        for shard in range(self.num_shards):
+            index = self._load_shard(shard)
+            shard_sizes[shard] = index.ntotal if index is not None else 0
+        return {"documents": documents, "chunks": chunks, "shards": shard_sizes}
+
+
+_global_index = None
+_global_index_lock = threading.Lock()
+
+
+def get_global_index() -> GlobalIndex:
+    global _global_index
+    if _global_index is None:
+        with _global_index_lock:
+            if _global_index is None:
+                _global_index = GlobalIndex(GLOBAL_INDEX_DIR, GLOBAL_INDEX_SHARDS)
+    return _global_index
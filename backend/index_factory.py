@@ -0,0 +1,103 @@
+"""
+Selectable FAISS index types for per-tender indexes.
+
+Chunks are always embedded into an exact IndexFlatL2 while a build is streaming
+(checkpoints stay appendable). When the build completes, the final index is
+converted to the configured type:
+
+- "flat":  exact search, memory = n * d * 4 bytes
+- "hnsw":  HNSW graph over the full vectors - sub-linear search, ~1.1-1.5x flat memory
+- "ivfpq": inverted lists + product quantization - trained on a sample, ~16-32x
+           smaller than flat, approximate distances
+- "auto":  picks by chunk count (INDEX_AUTO_HNSW_MIN / INDEX_AUTO_IVFPQ_MIN)
+
+Search-time knobs (efSearch / nprobe) are stored in the index file.
+Run backend/bench_ann.py for recall@k and latency against flat.
+"""
+import math
+import os
+
+import faiss
+import numpy as np
+
+# Configuration
+INDEX_TYPE = os.getenv("INDEX_TYPE", "auto").lower()  # auto | flat | hnsw | ivfpq
+INDEX_AUTO_HNSW_MIN = int(os.getenv("INDEX_AUTO_HNSW_MIN", "5000"))
+INDEX_AUTO_IVFPQ_MIN = int(os.getenv("INDEX_AUTO_IVFPQ_MIN", "200000"))
+INDEX_HNSW_M = int(os.getenv("INDEX_HNSW_M", "32"))
+INDEX_HNSW_EF_CONSTRUCTION = int(os.getenv("INDEX_HNSW_EF_CONSTRUCTION", "80"))
+INDEX_HNSW_EF_SEARCH = int(os.getenv("INDEX_HNSW_EF_SEARCH", "128"))
+INDEX_IVF_NPROBE = int(os.getenv("INDEX_IVF_NPROBE", "16"))
+INDEX_TRAIN_SAMPLE = int(os.getenv("INDEX_TRAIN_SAMPLE", "65536"))  # max vectors used to train IVF-PQ
+
+INDEX_TYPES = ("flat", "hnsw", "ivfpq")
+
+
+def select_index_type(num_vectors: int, index_type: str = None) -> str:
+    index_type = (index_type or INDEX_TYPE).lower()
+    if index_type in INDEX_TYPES:
+        return index_type
+    if index_type != "auto":
+        raise ValueError(f"Unknown INDEX_TYPE {index_type!r}; expected auto, {', '.join(INDEX_TYPES)}")
+    if num_vectors >= INDEX_AUTO_IVFPQ_MIN:
+        return "ivfpq"
+    if num_vectors >= INDEX_AUTO_HNSW_MIN:
+        return "hnsw"
+    return "flat"
+
+
+def _pq_subquantizers(dim: int) -> int:
+    """Largest of 64/48/32/... sub-quantizers that divides dim with >= 8 dims each (48 for bge-small)."""
+    for m in (64, 48, 32, 24, 16, 12, 8, 4, 2, 1):
+        if dim % m == 0 and dim // m >= 8:
+            return m
+    return 1
+
+
+def build_index(vectors: np.ndarray, index_type: str, seed: int = 1234):
+    """Builds (and trains, for IVF-PQ) a FAISS index of `index_type` over `vectors`."""
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    n, dim = vectors.shape
+
+    if index_type == "flat":
+        index = faiss.IndexFlatL2(dim)
+    elif index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, INDEX_HNSW_M)
+        index.hnsw.efConstruction = INDEX_HNSW_EF_CONSTRUCTION
+        index.hnsw.efSearch = INDEX_HNSW_EF_SEARCH
+    elif index_type == "ivfpq":
+        nlist = max(1, min(int(4 * math.sqrt(n)), n // 39))  # >= 39 training points per centroid
+        index = faiss.IndexIVFPQ(faiss.IndexFlatL2(dim), dim, nlist, _pq_subquantizers(dim), 8)
+        sample_size = min(n, max(INDEX_TRAIN_SAMPLE, nlist * 39, 256))
+        sample = vectors[np.random.default_rng(seed).choice(n, sample_size, replace=False)] if sample_size < n else vectors
+        index.train(sample)
+        index.nprobe = min(INDEX_IVF_NPROBE, nlist)
+    else:
+        raise ValueError(f"Unknown index type {index_type!r}")
+
+    index.add(vectors)
+    return index
+
+
+def convert_index(index, index_type: str = None):
+    """
+    Rebuilds an exact flat index as the configured / auto-selected type.
+    Returns (index, chosen_type); the input is returned unchanged for "flat".
+    """
+    chosen = select_index_type(index.ntotal, index_type)
+    if chosen == "flat" or not isinstance(index, faiss.IndexFlat):
+        return index, chosen
+    if chosen == "ivfpq" and index.ntotal < 256 * 39:
+        chosen = "hnsw"  # too few vectors to train 256-centroid PQ codebooks
+    return build_index(index.reconstruct_n(0, index.ntotal), chosen), chosen
+
+
+def index_type_name(index) -> str:
+    """Reports the type of a loaded index (flat / hnsw / ivfpq / class name)."""
+    if isinstance(index, faiss.IndexHNSW):
+        return "hnsw"
+    if isinstance(index, faiss.IndexIVFPQ):
+        return "ivfpq"
+    if isinstance(index, faiss.IndexFlat):
+        return "flat"
+    return type(index).__name__
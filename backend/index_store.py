@@ -0,0 +1,196 @@
+"""
+Pickle-free, memory-mappable persistence for per-tender FAISS indexes.
+
+An index directory holds:
+- vectors.faiss:      the FAISS index, opened with IO_FLAG_MMAP_IFC (zero-copy mmap)
+- chunks.bin:         every chunk's text, UTF-8, concatenated
+- chunk_offsets.npy:  int64 byte offsets into chunks.bin (n + 1 entries)
+- chunk_meta.arrow:   Arrow IPC file with one metadata row per chunk
+
+Row i of the chunk store belongs to FAISS id i. Loading maps the files and reads
+nothing else, so it is O(1) in the number of chunks; chunks are materialized as
+Documents only when a search returns them. The OS page cache is shared, so worker
+processes serving the same index don't each hold a copy.
+
+Legacy directories (LangChain save_local: index.faiss + pickled index.pkl) are
+refused at runtime: loading them unpickles index.pkl. Convert them once, offline,
+with the migration command (from the repo root):
+    python backend/index_store.py migrate [INDEX_DIR]
+LEGACY_PICKLE_INDEXES=1 restores on-the-fly conversion for trusted directories.
+"""
+import json
+import mmap
+import os
+import sys
+from collections.abc import Mapping
+
+import faiss
+import numpy as np
+import pyarrow as pa
+import pyarrow.ipc as pa_ipc
+from langchain_community.docstore.base import Docstore
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+# Configuration
+LEGACY_PICKLE_INDEXES = os.getenv("LEGACY_PICKLE_INDEXES", "0") == "1"
+
+VECTORS_FILE = "vectors.faiss"
+TEXT_FILE = "chunks.bin"
+OFFSETS_FILE = "chunk_offsets.npy"
+META_FILE = "chunk_meta.arrow"
+LEGACY_FILES = ("index.faiss", "index.pkl")
+
+_MMAP_FLAGS = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+_JSON_META_COLUMN = "__metadata_json__"
+
+
+def has_store_files(index_dir: str) -> bool:
+    return os.path.exists(os.path.join(index_dir, VECTORS_FILE))
+
+
+def has_legacy_files(index_dir: str) -> bool:
+    return all(os.path.exists(os.path.join(index_dir, name)) for name in LEGACY_FILES)
+
+
+class _RowIdMap(Mapping):
+    """index_to_docstore_id for a chunk store: FAISS id i -> row i, without building a dict."""
+
+    def __init__(self, count: int):
+        self._count = count
+
+    def __getitem__(self, i):
+        if 0 <= i < self._count:
+            return int(i)
+        raise KeyError(i)
+
+    def __iter__(self):
+        return iter(range(self._count))
+
+    def __len__(self):
+        return self._count
+
+
+class ChunkStore(Docstore):
+    """Read-only, lazily decoded docstore over chunks.bin / chunk_offsets.npy / chunk_meta.arrow."""
+
+    def __init__(self, index_dir: str):
+        self.offsets = np.load(os.path.join(index_dir, OFFSETS_FILE), mmap_mode="r")
+        self._count = len(self.offsets) - 1
+        self._text_file = open(os.path.join(index_dir, TEXT_FILE), "rb")
+        size = os.fstat(self._text_file.fileno()).st_size
+        self._text = mmap.mmap(self._text_file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        # Arrow reads over a memory map are zero-copy; columns are decoded per row on access
+        self._meta = pa_ipc.open_file(pa.memory_map(os.path.join(index_dir, META_FILE), "r")).read_all()
+
+    def __len__(self):
+        return self._count
+
+    def _metadata(self, row: int) -> dict:
+        record = self._meta.slice(row, 1).to_pylist()[0]
+        if _JSON_META_COLUMN in record:
+            return json.loads(record[_JSON_META_COLUMN])
+        return {k: v for k, v in record.items() if v is not None}
+
+    def search(self, search):
+        row = int(search)
+        if not 0 <= row < self._count:
+            return f"ID {search} not found."
+        start, end = int(self.offsets[row]), int(self.offsets[row + 1])
+        return Document(page_content=self._text[start:end].decode("utf-8"), metadata=self._metadata(row))
+
+    def add(self, texts):
+        raise NotImplementedError("ChunkStore is read-only; rebuild the index to add chunks")
+
+    def documents(self) -> list:
+        return [self.search(i) for i in range(self._count)]
+
+
+def _metadata_table(metadatas: list) -> pa.Table:
+    """Columnar metadata; falls back to one JSON column if types differ between rows."""
+    keys = list(dict.fromkeys(k for m in metadatas for k in m))  # union, first-seen order
+    try:
+        return pa.table({k: [m.get(k) for m in metadatas] for k in keys}) if keys \
+            else pa.table({_JSON_META_COLUMN: ["{}"] * len(metadatas)})
+    except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError):
+        return pa.table({_JSON_META_COLUMN: [json.dumps(m, default=str) for m in metadatas]})
+
+
+def save_index(vectorstore: FAISS, index_dir: str):
+    """
+    Writes an in-memory LangChain FAISS store in this format. Files are written under
+    temp names and swapped in with the FAISS index LAST, so a reader never sees
+    vectors whose chunks are missing.
+    """
+    os.makedirs(index_dir, exist_ok=True)
+    count = vectorstore.index.ntotal
+    docs = [vectorstore.docstore.search(vectorstore.index_to_docstore_id[i]) for i in range(count)]
+
+    offsets = np.zeros(count + 1, dtype=np.int64)
+    tmp = lambda name: os.path.join(index_dir, f"{name}.tmp")
+    with open(tmp(TEXT_FILE), "wb") as f:
+        for i, doc in enumerate(docs):
+            encoded = doc.page_content.encode("utf-8")
+            f.write(encoded)
+            offsets[i + 1] = offsets[i] + len(encoded)
+    with open(tmp(OFFSETS_FILE), "wb") as f:
+        np.save(f, offsets)
+    with pa.OSFile(tmp(META_FILE), "wb") as sink:
+        table = _metadata_table([dict(doc.metadata) for doc in docs])
+        with pa_ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    faiss.write_index(vectorstore.index, tmp(VECTORS_FILE))
+
+    for name in (TEXT_FILE, OFFSETS_FILE, META_FILE, VECTORS_FILE):
+        os.replace(tmp(name), os.path.join(index_dir, name))
+
+
+def migrate_legacy_index(index_dir: str, embeddings):
+    """Converts a legacy pickle index in place. Unpickles index.pkl - trusted directories only."""
+    print(f"[INDEX-STORE] Converting legacy pickle index {index_dir} to the mmap format")
+    legacy = FAISS.load_local(index_dir, embeddings, allow_dangerous_deserialization=True)
+    save_index(legacy, index_dir)
+
+
+def _migrate_legacy(index_dir: str, embeddings):
+    if not LEGACY_PICKLE_INDEXES:
+        raise ValueError(f"{index_dir} uses the legacy pickle format; convert it with "
+                         f"'python backend/index_store.py migrate'")
+    migrate_legacy_index(index_dir, embeddings)
+
+
+def load_index(index_dir: str, embeddings) -> FAISS:
+    """Read-only vectorstore over the memory-mapped index and lazy chunk store (O(1) load)."""
+    if not has_store_files(index_dir) and has_legacy_files(index_dir):
+        _migrate_legacy(index_dir, embeddings)
+    index = faiss.read_index(os.path.join(index_dir, VECTORS_FILE), _MMAP_FLAGS)
+    docstore = ChunkStore(index_dir)
+    return FAISS(embeddings, index, docstore, _RowIdMap(len(docstore)))
+
+
+def load_index_for_append(index_dir: str, embeddings) -> FAISS:
+    """Fully in-memory, writable copy of a stored index (used to resume a checkpointed build)."""
+    if not has_store_files(index_dir) and has_legacy_files(index_dir):
+        _migrate_legacy(index_dir, embeddings)
+    index = faiss.read_index(os.path.join(index_dir, VECTORS_FILE))
+    docs = ChunkStore(index_dir).documents()
+    ids = [str(i) for i in range(len(docs))]
+    docstore = InMemoryDocstore(dict(zip(ids, docs)))
+    return FAISS(embeddings, index, docstore, dict(enumerate(ids)))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "migrate":
+        sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        from backend.embedding_engine import create_embeddings
+        root = sys.argv[2] if len(sys.argv) > 2 else "indices"  # rag_api.INDEX_DIR
+        legacy_dirs = [os.path.join(root, name) for name in sorted(os.listdir(root))
+                       if not has_store_files(os.path.join(root, name)) and has_legacy_files(os.path.join(root, name))]
+        print(f"[INDEX-STORE] {len(legacy_dirs)} legacy pickle indexes under {root}")
+        if legacy_dirs:
+            embeddings = create_embeddings()
+            for index_dir in legacy_dirs:
+                migrate_legacy_index(index_dir, embeddings)
+    else:
+        print("Usage: python backend/index_store.py migrate [INDEX_DIR]")
@@ -0,0 +1,197 @@
+"""
+Background job queue for long-running tender processing.
+
+Jobs run in a local process pool (no external broker). Each job's state lives in
+one JSON file under JOBS_DIR, written atomically by the worker, so the API
+process, every worker and a restarted server all read the same progress.
+
+A handler is referenced as "module:function" and called in the worker as
+handler(payload, progress), where progress(stage, **counters) records the
+current stage and counters such as pages_parsed / chunks_embedded.
+"""
+import importlib
+import json
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Configuration
+JOBS_DIR = os.getenv("JOBS_DIR", "jobs")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+PROGRESS_WRITE_INTERVAL = 0.5  # seconds between counter-only state writes
+os.makedirs(JOBS_DIR, exist_ok=True)
+
+FINISHED_STAGES = ("complete", "failed")
+
+_pool = None
+_pool_lock = threading.Lock()
+_active_jobs = {}  # dedupe_key -> job_id, for jobs submitted by this process
+_active_jobs_lock = threading.Lock()
+
+
+def _job_path(job_id: str) -> str:
+    return os.path.join(JOBS_DIR, f"{job_id}.json")
+
+
+def _write_state(state: dict):
+    path = _job_path(state["id"])
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(state, f)
+    os.replace(f"{path}.tmp", path)
+
+
+def _load_state(job_id: str):
+    # job ids are uuid hex - refuse anything that could escape JOBS_DIR
+    if not job_id.isalnum():
+        return None
+    try:
+        with open(_job_path(job_id), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _estimate_eta(state: dict):
+    """
+    Seconds left, extrapolated from throughput so far. Total chunks are estimated
+    from chunks-per-page of the pages split so far times the page count.
+    """
+    if state["stage"] in FINISHED_STAGES or not state.get("started_at"):
+        return None
+    total_pages = state.get("total_pages")
+    pages_parsed = state.get("pages_parsed", 0)
+    chunks_split = state.get("chunks_split", 0)
+    chunks_embedded = state.get("chunks_embedded", 0)
+    if not total_pages or not pages_parsed or not chunks_split or not chunks_embedded:
+        return None
+    est_total_chunks = chunks_split / pages_parsed * total_pages
+    fraction = min(chunks_embedded / est_total_chunks, 1.0)
+    elapsed = time.time() - state["started_at"]
+    return round(elapsed * (1 - fraction) / fraction, 1)
+
+
+def read_job(job_id: str):
+    """Returns the job state (with a fresh ETA) or None if unknown."""
+    state = _load_state(job_id)
+    if state is not None:
+        state["eta_seconds"] = _estimate_eta(state)
+    return state
+
+
+class JobProgress:
+    """Progress callback handed to job handlers inside the worker process."""
+
+    def __init__(self, job_id: str):
+        self.state = _load_state(job_id)
+        self._last_write = 0.0
+
+    def __call__(self, stage: str = None, **counters):
+        stage_changed = stage is not None and stage != self.state["stage"]
+        if stage is not None:
+            self.state["stage"] = stage
+        self.state.update(counters)
+        now = time.time()
+        if stage_changed or now - self._last_write >= PROGRESS_WRITE_INTERVAL:
+            self.state["updated_at"] = now
+            _write_state(self.state)
+            self._last_write = now
+
+    def finish(self, stage: str, **fields):
+        self.state.update(fields)
+        self.state["stage"] = stage
+        self.state["finished_at"] = self.state["updated_at"] = time.time()
+        _write_state(self.state)
+
+
+def _run_job(job_id: str, handler_path: str, payload: dict):
+    """Worker entry point: resolves the handler and records its result or error."""
+    progress = JobProgress(job_id)
+    progress.state["started_at"] = time.time()
+    progress("running")
+    try:
+        module_name, func_name = handler_path.split(":")
+        handler = getattr(importlib.import_module(module_name), func_name)
+        result = handler(payload, progress)
+        progress.finish("complete", result=result)
+    except Exception as e:
+        detail = getattr(e, "detail", None) or str(e)  # HTTPException carries its message in .detail
+        print(f"[JOBS] Job {job_id} failed: {detail}")
+        progress.finish("failed", error=detail)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Lazily starts the worker pool (spawn: workers don't inherit the server's threads)."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                ctx = multiprocessing.get_context("spawn")
+                _pool = ProcessPoolExecutor(max_workers=JOB_WORKERS, mp_context=ctx)
+                print(f"[JOBS] Started worker pool with {JOB_WORKERS} processes")
+    return _pool
+
+
+def submit_job(handler_path: str, payload: dict, kind: str, dedupe_key: str = None,
+               cleanup_path: str = None) -> str:
+    """
+    Queues `handler_path(payload, progress)` on the worker pool and returns the job id.
+    If a job with the same `dedupe_key` is still running, its id is returned instead
+    (and `cleanup_path`, the duplicate upload, is removed).
+    """
+    with _active_jobs_lock:
+        if dedupe_key and dedupe_key in _active_jobs:
+            existing = _load_state(_active_jobs[dedupe_key])
+            if existing and existing["stage"] not in FINISHED_STAGES:
+                if cleanup_path and os.path.exists(cleanup_path):
+                    os.remove(cleanup_path)
+                return existing["id"]
+
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        _write_state({
+            "id": job_id,
+            "kind": kind,
+            "stage": "queued",
+            "total_pages": None,
+            "pages_parsed": 0,
+            "chunks_split": 0,
+            "chunks_embedded": 0,
+            "created_at": now,
+            "started_at": None,
+            "updated_at": now,
+            "finished_at": None,
+            "result": None,
+            "error": None,
+        })
+        if dedupe_key:
+            _active_jobs[dedupe_key] = job_id
+
+    try:
+        future = _get_pool().submit(_run_job, job_id, handler_path, payload)
+    except BrokenProcessPool:
+        # A previous worker crash broke the pool - start a fresh one
+        global _pool
+        with _pool_lock:
+            _pool = None
+        future = _get_pool().submit(_run_job, job_id, handler_path, payload)
+
+    def _on_done(fut):
+        with _active_jobs_lock:
+            if dedupe_key and _active_jobs.get(dedupe_key) == job_id:
+                del _active_jobs[dedupe_key]
+        error = fut.exception()
+        if error is not None:
+            # The worker died before it could record anything (e.g. killed / OOM)
+            state = _load_state(job_id)
+            if state and state["stage"] not in FINISHED_STAGES:
+                state.update(stage="failed", error=f"Worker crashed: {error}", finished_at=time.time())
+                _write_state(state)
+            if cleanup_path and os.path.exists(cleanup_path):
+                os.remove(cleanup_path)
+
+    future.add_done_callback(_on_done)
+    return job_id
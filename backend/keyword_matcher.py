@@ -0,0 +1,111 @@
+"""
+Multi-pattern keyword matching (Aho-Corasick).
+
+Risk scoring, complexity scoring, BOQ item classification and the regulation feed
+all ask "which of these keywords occur in this text?" - and used to answer it with
+one `k in text` scan per keyword, per keyword list. KeywordMatcher compiles every
+keyword of every category into one automaton and reports all hits (overlapping
+ones included: "liquidated damages" also hits "damages") in a single pass over the
+lowercased text, so the cost is linear in the text length, not in the keyword count.
+
+Matching is plain substring matching, like the `in` checks it replaces ("indemn"
+matches "indemnity"). Uses the pyahocorasick C extension when installed, else an
+equivalent pure-Python automaton.
+"""
+from collections import deque
+
+try:
+    import ahocorasick
+except ImportError:  # optional C extension
+    ahocorasick = None
+
+
+class _PyAutomaton:
+    """Pure-Python Aho-Corasick automaton with the add_word / make_automaton / iter subset of pyahocorasick."""
+
+    def __init__(self):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+
+    def add_word(self, word: str, value):
+        state = 0
+        for ch in word:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append(value)
+
+    def make_automaton(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def iter(self, text: str):
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for value in out[state]:
+                yield i, value
+
+
+class KeywordMatcher:
+    """
+    Built from {category: [keyword, ...] or {keyword: weight, ...}}; list keywords weigh 1.
+    A keyword may appear in several categories.
+    """
+
+    def __init__(self, groups: dict):
+        entries = {}
+        for category, keywords in groups.items():
+            weighted = keywords.items() if isinstance(keywords, dict) else ((k, 1) for k in keywords)
+            for keyword, weight in weighted:
+                entries.setdefault(keyword.lower(), []).append((category, weight))
+        self.categories = list(groups)
+        self._automaton = ahocorasick.Automaton() if ahocorasick is not None else _PyAutomaton()
+        for keyword, targets in entries.items():
+            self._automaton.add_word(keyword, (keyword, tuple(targets)))
+        self._empty = not entries
+        if not self._empty:
+            self._automaton.make_automaton()
+
+    def iter_hits(self, text: str):
+        """Yields (start, keyword, category, weight) for every occurrence, in text order."""
+        if self._empty or not text:
+            return
+        for end, (keyword, targets) in self._automaton.iter(text.lower()):
+            for category, weight in targets:
+                yield end - len(keyword) + 1, keyword, category, weight
+
+    def match(self, text: str) -> dict:
+        """{category: {keyword: weight}} of the distinct keywords found; every category is present."""
+        found = {category: {} for category in self.categories}
+        for _, keyword, category, weight in self.iter_hits(text):
+            found[category][keyword] = weight
+        return found
+
+    def matched_categories(self, text: str) -> set:
+        return {category for _, _, category, _ in self.iter_hits(text)}
+
+    def any(self, text: str, category: str) -> bool:
+        """True as soon as one keyword of `category` occurs (stops scanning there)."""
+        return any(hit_category == category for _, _, hit_category, _ in self.iter_hits(text))
+
+    def score(self, text: str) -> dict:
+        """{category: summed weight of the distinct keywords found}."""
+        return {category: sum(hits.values()) for category, hits in self.match(text).items()}
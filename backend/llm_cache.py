@@ -0,0 +1,218 @@
+"""
+Persistent response cache backed by SQLite.
+
+Entries are keyed by a fingerprint of everything that determines the output
+(model, sampling params, prompt and the ids of the retrieved chunks), so a repeat
+request is served from disk instead of regenerating thousands of tokens.
+
+- TTL: entries older than ttl_seconds are ignored and purged
+- Size: once stored values exceed max_bytes, least recently used entries are evicted.
+  Each connection keeps a running byte total, so a write costs no SUM() scan; the
+  total is re-read from the table when it crosses the budget, after a TTL purge and
+  every LLM_CACHE_RESYNC_WRITES writes (other processes write to the same file)
+- Semantic reuse (optional): an entry can carry a query embedding and a scope
+  (e.g. index + output format); find_similar() returns the answer of the closest
+  prior query in that scope above a cosine-similarity threshold
+
+SQLite in WAL mode with one connection per thread makes the cache safe to share
+between request threads and the background job processes.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+# Configuration
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") == "1"
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite3")
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_HOURS", "168")) * 3600  # 7 days
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_MB", "256")) * 1024 * 1024
+LLM_CACHE_SIMILARITY = float(os.getenv("LLM_CACHE_SIMILARITY", "0.95"))  # >1 disables semantic reuse
+LLM_CACHE_RESYNC_WRITES = int(os.getenv("LLM_CACHE_RESYNC_WRITES", "500"))  # re-read the true size this often
+
+
+def fingerprint(*parts) -> str:
+    """Stable sha256 over JSON-serializable parts (dict key order does not matter)."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def chunk_ids(docs) -> list:
+    """Content ids of retrieved chunks (identical text -> identical id, across indexes)."""
+    return [hashlib.sha1(d.page_content.encode("utf-8")).hexdigest()[:16] for d in docs]
+
+
+class ResponseCache:
+    """SQLite key -> JSON value cache with TTL, LRU size eviction and optional semantic lookup."""
+
+    def __init__(self, path: str, ttl_seconds: int, max_bytes: int, log_tag: str = "LLM-CACHE"):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.log_tag = log_tag
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    scope TEXT,
+                    value TEXT NOT NULL,
+                    embedding BLOB,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_scope ON entries(scope)")
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_created ON entries(created_at)")
+            conn.commit()
+            self._local.conn = conn
+            self._local.total_bytes = None  # running size estimate, None = re-read
+            self._local.writes = 0
+        return conn
+
+    def _count(self, attr: str):
+        with self._stats_lock:
+            setattr(self, attr, getattr(self, attr) + 1)
+
+    def get(self, key: str):
+        """Returns the cached value, or None on a miss / expired entry."""
+        conn = self._conn()
+        now = time.time()
+        row = conn.execute("SELECT value, created_at FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None or now - row[1] > self.ttl_seconds:
+            if row is not None:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                conn.commit()
+            self._count("misses")
+            return None
+        conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+        conn.commit()
+        self._count("hits")
+        return json.loads(row[0])
+
+    def find_similar(self, scope: str, vector, threshold: float):
+        """
+        Value of the entry in `scope` whose stored embedding is most similar to
+        `vector`, if its cosine similarity is >= threshold. Otherwise None.
+        """
+        conn = self._conn()
+        cutoff = time.time() - self.ttl_seconds
+        rows = conn.execute(
+            "SELECT key, value, embedding FROM entries WHERE scope = ? AND created_at >= ? AND embedding IS NOT NULL",
+            (scope, cutoff),
+        ).fetchall()
+        if not rows:
+            return None
+        query = np.asarray(vector, dtype=np.float32)
+        query /= (np.linalg.norm(query) or 1.0)
+        matrix = np.stack([np.frombuffer(r[2], dtype=np.float32) for r in rows])
+        matrix = matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+        scores = matrix @ query
+        best = int(np.argmax(scores))
+        if scores[best] < threshold:
+            return None
+        conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (time.time(), rows[best][0]))
+        conn.commit()
+        self._count("semantic_hits")
+        print(f"[{self.log_tag}] Semantic hit (similarity {scores[best]:.3f})")
+        return json.loads(rows[best][1])
+
+    def values(self, scope: str) -> list:
+        """Values of every unexpired entry in `scope` (does not count as access for LRU)."""
+        cutoff = time.time() - self.ttl_seconds
+        rows = self._conn().execute(
+            "SELECT value FROM entries WHERE scope = ? AND created_at >= ?", (scope, cutoff)
+        ).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def count_scope(self, scope: str) -> int:
+        cutoff = time.time() - self.ttl_seconds
+        return self._conn().execute(
+            "SELECT COUNT(*) FROM entries WHERE scope = ? AND created_at >= ?", (scope, cutoff)
+        ).fetchone()[0]
+
+    def put(self, key: str, value, scope: str = None, vector=None):
+        """Stores `value` (JSON-serializable), then enforces TTL and the size budget."""
+        self._store([self._row(key, value, scope, vector)])
+
+    def put_many(self, items, scope: str = None):
+        """Stores (key, value) pairs in one transaction, with a single TTL purge and eviction pass."""
+        self._store([self._row(key, value, scope) for key, value in items])
+
+    @staticmethod
+    def _row(key: str, value, scope: str = None, vector=None) -> tuple:
+        payload = json.dumps(value, ensure_ascii=False)
+        blob = np.asarray(vector, dtype=np.float32).tobytes() if vector is not None else None
+        return key, scope, payload, blob, len(payload) + (len(blob) if blob else 0)
+
+    def _store(self, rows: list):
+        if not rows:
+            return
+        conn = self._conn()
+        now = time.time()
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO entries (key, scope, value, embedding, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [row + (now, now) for row in rows],
+            )
+            purged = conn.execute("DELETE FROM entries WHERE created_at < ?", (now - self.ttl_seconds,)).rowcount
+            if purged:
+                self._local.total_bytes = None
+            self._evict(conn, added=sum(row[4] for row in rows))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    def _evict(self, conn: sqlite3.Connection, added: int):
+        # OPTIMIZATION: running total instead of SUM(size) per write. It over-counts replaced
+        # keys (re-read before evicting) and misses other processes' writes (periodic re-read).
+        self._local.writes += 1
+        total = self._local.total_bytes
+        if total is not None:
+            total += added
+        if total is None or total > self.max_bytes or self._local.writes % LLM_CACHE_RESYNC_WRITES == 0:
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total > self.max_bytes:
+            evicted = 0
+            for key, size in conn.execute("SELECT key, size FROM entries ORDER BY accessed_at ASC").fetchall():
+                if total <= self.max_bytes:
+                    break
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                total -= size
+                evicted += 1
+            print(f"[{self.log_tag}] Evicted {evicted} least recently used entries")
+        self._local.total_bytes = total
+
+    def stats(self) -> dict:
+        conn = self._conn()
+        entries, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        lookups = self.hits + self.misses  # semantic hits are a subset of exact-key misses
+        return {
+            "entries": entries,
+            "bytes": total,
+            "hits": self.hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.semantic_hits) / lookups, 3) if lookups else None,
+        }
+
+
+llm_response_cache = ResponseCache(LLM_CACHE_PATH, LLM_CACHE_TTL_SECONDS, LLM_CACHE_MAX_BYTES)
@@ -0,0 +1,122 @@
+"""
+Process-pool PDF text extraction with PyMuPDF.
+
+A fitz.Document is not thread-safe, so instead of sharing one handle across
+threads, page ranges are sharded across worker processes and every worker opens
+its own handle. Results come back in page order. Small files skip the pool
+entirely since process start-up would cost more than the extraction.
+"""
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import fitz  # PyMuPDF
+
+# Configuration
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "32"))  # below this: serial
+PDF_PAGES_PER_SHARD = int(os.getenv("PDF_PAGES_PER_SHARD", "16"))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _extract_page_range(file_path: str, start: int, stop: int, with_images: bool) -> list:
+    """
+    Worker: opens its own PyMuPDF handle and extracts pages [start, stop).
+    Returns plain dicts so results pickle cheaply back to the parent.
+    """
+    records = []
+    pdf_document = fitz.open(file_path)
+    try:
+        for page_num in range(start, stop):
+            try:
+                page = pdf_document[page_num]
+                text = page.get_text("text", sort=True)
+                has_images = len(page.get_images(full=True)) > 0 if with_images else False
+                records.append({"page_num": page_num, "text": text, "has_images": has_images, "error": None})
+            except Exception as e:
+                records.append({"page_num": page_num, "text": "", "has_images": False, "error": str(e)})
+    finally:
+        pdf_document.close()
+    return records
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Lazily starts the shared extraction pool (spawn: safe alongside uvicorn/ONNX threads)."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                ctx = multiprocessing.get_context("spawn")
+                _pool = ProcessPoolExecutor(max_workers=PDF_EXTRACT_WORKERS, mp_context=ctx)
+                print(f"[PDF-EXTRACT] Started process pool with {PDF_EXTRACT_WORKERS} workers")
+    return _pool
+
+
+def shutdown_pool():
+    """Stops the worker processes (called at interpreter exit)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+atexit.register(shutdown_pool)
+
+
+def count_pages(file_path: str) -> int:
+    pdf_document = fitz.open(file_path)
+    try:
+        return len(pdf_document)
+    finally:
+        pdf_document.close()
+
+
+def iter_page_records(file_path: str, with_images: bool = False, workers: int = None):
+    """
+    Yields one record per page, in page order:
+    {"page_num": 0-based, "text": str, "has_images": bool, "error": str | None}
+
+    Shards are submitted to the process pool with at most 2 x workers in flight,
+    so a slow consumer never buffers the whole document.
+    """
+    workers = PDF_EXTRACT_WORKERS if workers is None else workers
+    total_pages = count_pages(file_path)
+
+    if workers <= 1 or total_pages < PDF_PARALLEL_MIN_PAGES:
+        yield from _extract_page_range(file_path, 0, total_pages, with_images)
+        return
+
+    shards = [(s, min(s + PDF_PAGES_PER_SHARD, total_pages)) for s in range(0, total_pages, PDF_PAGES_PER_SHARD)]
+    max_in_flight = workers * 2
+    next_page = 0  # first page not yet yielded, so a serial fallback can resume from it
+    try:
+        pool = _get_pool()
+        in_flight = []
+        shard_iter = iter(shards)
+        for start, stop in shard_iter:
+            in_flight.append(pool.submit(_extract_page_range, file_path, start, stop, with_images))
+            if len(in_flight) >= max_in_flight:
+                break
+        while in_flight:
+            records = in_flight.pop(0).result()
+            nxt = next(shard_iter, None)
+            if nxt is not None:
+                in_flight.append(pool.submit(_extract_page_range, file_path, nxt[0], nxt[1], with_images))
+            for record in records:
+                next_page = record["page_num"] + 1
+                yield record
+    except BrokenProcessPool as e:
+        print(f"[PDF-EXTRACT] Process pool failed ({e}); continuing serially from page {next_page + 1}")
+        shutdown_pool()
+        yield from _extract_page_range(file_path, next_page, total_pages, with_images)
+
+
+def extract_pages(file_path: str, with_images: bool = False, workers: int = None) -> list:
+    """List form of iter_page_records."""
+    return list(iter_page_records(file_path, with_images=with_images, workers=workers))
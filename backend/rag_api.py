@@ -1,34 +1,48 @@
 from fastapi import FastAPI, File, UploadFile, Form, HTTPException
 from typing import Optional, List as _List
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 import os
+import asyncio
+import functools
 import tempfile
 import shutil
+import hashlib
+import threading
+import uuid
+import queue
+from collections import OrderedDict
+from contextlib import ExitStack
 from dotenv import load_dotenv
-from flashrank import Ranker
-from groq import Groq
+from flashrank import Ranker, RerankRequest
+from groq import Groq, AsyncGroq
 from llama_parse import LlamaParse
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.embeddings import FastEmbedEmbeddings
 from langchain_community.vectorstores import FAISS
-from langchain_classic.retrievers import ContextualCompressionRetriever
-from langchain_classic.retrievers.document_compressors import FlashrankRerank
 from langchain_community.document_loaders import PyPDFLoader
 from langchain_core.documents import Document
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import math
-import nest_asyncio
+import itertools
 import fitz  # PyMuPDF - 15-21x faster than PyPDF
 import gc
 from ml.trainModel import train_model
+from backend.pdf_extract import iter_page_records, extract_pages, count_pages, PDF_EXTRACT_WORKERS
+from backend.jobs import submit_job, read_job
+from backend.index_store import save_index, load_index, load_index_for_append, has_store_files, has_legacy_files
+from backend.global_index import get_global_index, GLOBAL_INDEX_ENABLED
+from backend.index_factory import convert_index
+from backend.sparse_index import SparseIndex, build_sparse_index, has_sparse_files, hybrid_search
+from backend.chunking import make_text_splitter, chunker_id
+from backend.amount_extract import extract_tender_amounts
+from backend.context_packing import pack_context, CONTEXT_TOKENS_SECTION, CONTEXT_TOKENS_SUMMARY
+from backend.embedding_engine import create_embeddings, engine_id
+from backend.embedding_cache import EmbeddingCache, CachedEmbeddings, EMBEDDING_CACHE_ENABLED, EMBEDDING_CACHE_DIR, exclusive_file_lock
+from backend.llm_cache import llm_response_cache, fingerprint, chunk_ids, LLM_CACHE_ENABLED, LLM_CACHE_SIMILARITY
 import pandas as pd
 import xgboost as xgb
 import json
 from pydantic import BaseModel
 
-# Prevent event loop errors in async contexts
-nest_asyncio.apply()
-
 load_dotenv()
 
 app = FastAPI()
@@ -42,8 +56,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-embeddings = FastEmbedEmbeddings(model_name="BAAI/bge-small-en-v1.5")
+groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"))  # sync: worker threads / job processes
+async_groq_client = AsyncGroq(api_key=os.getenv("GROQ_API_KEY"))  # async: awaited from request handlers
+# Model, batch size, threads, parallelism and quantization come from EMBEDDING_* env vars
+embeddings = create_embeddings()
+if EMBEDDING_CACHE_ENABLED:
+    # OPTIMIZATION: chunk-text hash -> vector cache on disk, so boilerplate shared across
+    # tenders (GCC clauses, forms, declarations) is embedded once, not once per upload
+    embeddings = CachedEmbeddings(embeddings, EmbeddingCache(EMBEDDING_CACHE_DIR, engine_id()))
+
+# --- BLOCKING WORK EXECUTOR ---
+# Handlers are async, so PyMuPDF / FastEmbed / FAISS / XGBoost calls must never run on
+# the event loop thread. They run here instead: these libraries release the GIL in their
+# native code, and threads share the in-process vectorstore LRU and reranker pool
+# (page extraction itself already fans out to the process pool in backend/pdf_extract.py).
+BLOCKING_WORKERS = int(os.getenv("BLOCKING_WORKERS", str(min(8, (os.cpu_count() or 1) + 2))))
+_blocking_executor = ThreadPoolExecutor(max_workers=BLOCKING_WORKERS, thread_name_prefix="blocking")
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Runs a blocking call on the dedicated executor without stalling the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_blocking_executor, functools.partial(func, *args, **kwargs))
 
 # --- CORE LOGIC FUNCTIONS ---
 
@@ -51,51 +85,51 @@ embeddings = FastEmbedEmbeddings(model_name="BAAI/bge-small-en-v1.5")
 INDEX_DIR = "indices"
 os.makedirs(INDEX_DIR, exist_ok=True)
 
-def parse_pdf_fast_quality(file_path: str) -> list:
+def iter_pdf_pages_fast_quality(file_path: str):
     """
-    HIGH-SPEED QUALITY PDF PARSING using PyMuPDF (fitz).
+    HIGH-SPEED QUALITY PDF PARSING using PyMuPDF (fitz), as a page generator.
     - 15-21x faster than PyPDF
     - Superior text extraction with layout awareness
-    - Parallel page processing for maximum speed
-    - Returns list of LangChain Document objects
+    - Page ranges are sharded across a process pool (own fitz handle per worker),
+      small files are extracted serially (see backend/pdf_extract.py)
+    - Yields one LangChain Document per non-empty page, in page order, as soon as
+      its shard is done, so splitting/embedding can start before the last page
     """
-    docs = []
-    
     try:
-        # Open PDF with PyMuPDF
-        pdf_document = fitz.open(file_path)
-        total_pages = len(pdf_document)
-        print(f"[FAST-QUALITY] Parsing {total_pages} pages with PyMuPDF...")
-        
-        # Process pages sequentially because PyMuPDF (fitz) is NOT thread-safe.
-        # Concurrent access to pdf_document can corrupt C++ pointers and cause SWIG to return NotImplementedType.
-        for page_num in range(total_pages):
-            try:
-                page = pdf_document[page_num]
-                text = page.get_text("text", sort=True)
-                if text.strip():
-                    docs.append(Document(
-                        page_content=text,
-                        metadata={
-                            "source": file_path,
-                            "page": page_num + 1,
-                            "parser": "pymupdf_fast_quality"
-                        }
-                    ))
-            except Exception as e:
-                print(f"[FAST-QUALITY] Page {page_num} extraction error: {e}")
-        
-        pdf_document.close()
-        print(f"[FAST-QUALITY] Successfully extracted {len(docs)} documents")
-        
+        records = iter_page_records(file_path)
+        first = next(records, None)
     except Exception as e:
         print(f"[FAST-QUALITY] Error parsing PDF: {e}")
         # Fallback to PyPDFLoader if PyMuPDF fails
         print("[FAST-QUALITY] Falling back to PyPDFLoader...")
-        loader = PyPDFLoader(file_path)
-        docs = loader.load()
-    
-    return docs
+        yield from PyPDFLoader(file_path).lazy_load()
+        return
+
+    print(f"[FAST-QUALITY] Parsing with PyMuPDF ({PDF_EXTRACT_WORKERS} workers for large files)...")
+    extracted = 0
+    for record in itertools.chain([first] if first else [], records):
+        if record["error"]:
+            print(f"[FAST-QUALITY] Page {record['page_num']} extraction error: {record['error']}")
+            continue
+        if record["text"].strip():
+            extracted += 1
+            yield Document(
+                page_content=record["text"],
+                metadata={
+                    "source": file_path,
+                    "page": record["page_num"] + 1,
+                    "parser": "pymupdf_fast_quality"
+                }
+            )
+    print(f"[FAST-QUALITY] Successfully extracted {extracted} documents")
+
+
+def parse_pdf_fast_quality(file_path: str) -> list:
+    """
+    HIGH-SPEED QUALITY PDF PARSING using PyMuPDF (fitz).
+    Returns list of LangChain Document objects (see iter_pdf_pages_fast_quality).
+    """
+    return list(iter_pdf_pages_fast_quality(file_path))
 
 def parse_pdf_hybrid_quality(file_path: str) -> list:
     """
@@ -118,44 +152,15 @@ def parse_pdf_hybrid_quality(file_path: str) -> list:
     pages_needing_ocr = []
     
     try:
-        # Step 1: Fast extraction with PyMuPDF (Parallel)
-        pdf_document = fitz.open(file_path)
-        total_pages = len(pdf_document)
-        print(f"[HYBRID] Phase 1: Fast extraction of {total_pages} pages with PyMuPDF...")
-        
+        # Step 1: Fast extraction with PyMuPDF (process pool, one fitz handle per worker)
         MIN_TEXT_THRESHOLD = 50  # Minimum characters to consider page as "text-based"
         
-        # Helper function for parallel processing
-        def analyze_page(page_num):
-            # Re-open doc in thread if needed (PyMuPDF isn't thread-safe for same doc object)
-            # But get_text is generally safe if read-only. Safer to use fresh handle if issues arise.
-            # For now, we'll try shared handle as it's usually fine for read
-            page = pdf_document[page_num]
-            text = page.get_text("text", sort=True)
-            
-            # Check if page has images
-            image_list = page.get_images(full=True)
-            has_images = len(image_list) > 0
-            text_length = len(text.strip())
-            
-            return {
-                "page_num": page_num,
-                "text": text,
-                "text_length": text_length,
-                "has_images": has_images
-            }
-
-        # Process pages in parallel
-        # Process pages in parallel
-        # OPTIMIZATION: Limit workers to prevent system freeze
-        max_workers = min(4, os.cpu_count() or 4)
-        print(f"[HYBRID] Using {max_workers} workers for page analysis")
-        
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            results = list(executor.map(analyze_page, range(total_pages)))
-        
-        # Sort results by page number
-        results.sort(key=lambda x: x["page_num"])
+        print(f"[HYBRID] Phase 1: Fast extraction with PyMuPDF ({PDF_EXTRACT_WORKERS} workers for large files)...")
+        results = extract_pages(file_path, with_images=True)
+        for res in results:
+            if res["error"]:
+                print(f"[HYBRID] Page {res['page_num']} extraction error: {res['error']}")
+            res["text_length"] = len(res["text"].strip())
         
         for res in results:
             page_num = res["page_num"]
@@ -188,8 +193,6 @@ def parse_pdf_hybrid_quality(file_path: str) -> list:
                     }
                 ))
         
-        pdf_document.close()
-        
         phase1_time = time.time() - start_time
         print(f"[HYBRID] Phase 1 complete in {phase1_time:.2f}s - {len(all_docs) - len(pages_needing_ocr)} text pages, {len(pages_needing_ocr)} need OCR")
         
@@ -515,15 +518,417 @@ SECTION_PROMPTS = {
     """
 }
 
+# --- CONTENT-ADDRESSED INDEX CACHE ---
+# Indexes are keyed by the PDF bytes + parser mode + chunking params, so a renamed
+# copy of the same tender reuses its index and a corrigendum that reuses the old
+# filename gets a fresh one. The manifest maps uploaded filenames to index keys.
+INDEX_MANIFEST_PATH = os.path.join(INDEX_DIR, "manifest.json")
+_manifest_lock = threading.Lock()
+
+# Chunking params per endpoint (part of the cache key, with the chunker - backend/chunking.py)
+UPLOAD_CHUNK_SIZE, UPLOAD_CHUNK_OVERLAP = 1000, 100
+ANALYZE_CHUNK_SIZE, ANALYZE_CHUNK_OVERLAP = 2000, 200
+
+HASH_BLOCK_SIZE = 1024 * 1024  # 1 MB reads keep hashing memory flat on large PDFs
+
+
+def save_upload_with_hash(src_file, dest_path: str) -> str:
+    """
+    Copies an uploaded file to disk and hashes it in the same pass.
+    Returns the SHA-256 hex digest of the file bytes.
+    """
+    sha = hashlib.sha256()
+    with open(dest_path, "wb") as buffer:
+        while True:
+            block = src_file.read(HASH_BLOCK_SIZE)
+            if not block:
+                break
+            sha.update(block)
+            buffer.write(block)
+    return sha.hexdigest()
+
+
+def _new_temp_path(prefix: str, filename: str) -> str:
+    """Unique temp name: concurrent uploads of the same filename must not clobber each other."""
+    return f"{prefix}_{uuid.uuid4().hex[:8]}_{filename}"
+
+
+def _no_progress(stage=None, **counters):
+    """Default progress callback for inline (non-job) requests."""
+
+
+def get_content_index_key(file_hash: str, parsing_mode: str, chunk_size: int, chunk_overlap: int) -> str:
+    """Builds the cache key for an index from the file hash and the ingestion config."""
+    config = f"{file_hash}|{parsing_mode}|{chunk_size}|{chunk_overlap}"
+    if chunker_id() != "recursive":
+        # Clause-aware chunks differ from the character splitter's (see backend/chunking.py)
+        config += f"|{chunker_id()}"
+    if engine_id() != "BAAI/bge-small-en-v1.5":
+        # Vectors from another model / quantization can't share an index with the default
+        # (the default is left out so indexes built before this option stay valid)
+        config += f"|{engine_id()}"
+    return hashlib.sha256(config.encode("utf-8")).hexdigest()[:32]
+
+
+def get_content_index_path(index_key: str) -> str:
+    """Returns the path for a content-addressed FAISS index."""
+    return os.path.join(INDEX_DIR, index_key)
+
+
+def load_index_manifest() -> dict:
+    """Reads the filename -> index key manifest. Returns an empty manifest if missing/corrupt."""
+    try:
+        with open(INDEX_MANIFEST_PATH, "r") as f:
+            manifest = json.load(f)
+        if isinstance(manifest, dict) and isinstance(manifest.get("files"), dict):
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {"files": {}}
+
+
+def record_index_in_manifest(filename: str, index_key: str, file_hash: str,
+                             parsing_mode: str, chunk_size: int, chunk_overlap: int):
+    """Points `filename` at `index_key`. Written atomically so readers never see a partial file."""
+    import time
+    with _manifest_lock:
+        manifest = load_index_manifest()
+        manifest["files"][filename] = {
+            "index_key": index_key,
+            "file_hash": file_hash,
+            "parsing_mode": parsing_mode,
+            "chunk_size": chunk_size,
+            "chunk_overlap": chunk_overlap,
+            "chunker": chunker_id(),
+            "updated_at": time.time(),
+        }
+        tmp_path = f"{INDEX_MANIFEST_PATH}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, INDEX_MANIFEST_PATH)
+
+
 def get_index_path(filename: str):
-    """Returns the path for the FAISS index of a specific file."""
+    """
+    Returns the path for the FAISS index of a specific file.
+    Resolves through the manifest (latest upload under this name wins),
+    falling back to the legacy filename-keyed directory for old indexes.
+    """
+    entry = load_index_manifest()["files"].get(filename)
+    if entry:
+        return get_content_index_path(entry["index_key"])
     # Sanitize filename to be safe for directory names
     safe_name = "".join(x for x in filename if x.isalnum() or x in "._-")
     return os.path.join(INDEX_DIR, safe_name)
 
-def generate_summary_with_groq(user_query, retrieved_chunks, output_format):
-    """Generates the final summary using Groq."""
-    context_text = "\n\n".join([doc.page_content for doc in retrieved_chunks])
+# --- CHECKPOINTED (PARTIAL) INDEXES ---
+# While an index is being built, the vectorstore is saved periodically and
+# progress.json records how far it got. A restarted build resumes from the
+# checkpoint, and /generate-section can already query the partial index.
+# Each save rewrites the whole index, so saves are spaced in time rather than done
+# per batch (per-batch saves made a large build's I/O quadratic in its chunk count).
+INDEX_PROGRESS_FILE = "progress.json"
+INDEX_CHECKPOINT_SECONDS = float(os.getenv("INDEX_CHECKPOINT_SECONDS", "30"))  # min seconds between saves
+INDEX_CHECKPOINT_EVERY = int(os.getenv("INDEX_CHECKPOINT_EVERY", "0"))  # also save every N batches; 0 = off
+_indexes_in_progress = {}  # index_path -> ExitStack holding its build lock file
+_indexes_in_progress_lock = threading.Lock()
+
+
+def read_index_progress(index_path: str):
+    """Returns the progress record of an index, or None for legacy/missing indexes."""
+    try:
+        with open(os.path.join(index_path, INDEX_PROGRESS_FILE), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_index_progress(index_path: str, status: str, chunks_indexed: int, pages_parsed: int,
+                         parse_pass: str = None):
+    """
+    Atomically records build progress ("building" or "complete"). `parse_pass` names the
+    page stream that produced the chunks; a checkpoint is only resumed by the same pass.
+    """
+    import time
+    os.makedirs(index_path, exist_ok=True)
+    progress_path = os.path.join(index_path, INDEX_PROGRESS_FILE)
+    with open(f"{progress_path}.tmp", "w") as f:
+        json.dump({
+            "status": status,
+            "chunks_indexed": chunks_indexed,
+            "pages_parsed": pages_parsed,
+            "pass": parse_pass,
+            "updated_at": time.time(),
+        }, f)
+    os.replace(f"{progress_path}.tmp", progress_path)
+
+
+def has_index_files(index_path: str) -> bool:
+    # mmap format (backend/index_store.py), or a legacy pickle index converted on first load
+    return has_store_files(index_path) or has_legacy_files(index_path)
+
+
+def get_index_status(index_path: str):
+    """
+    "complete" - fully built (or a legacy index without progress.json)
+    "building" - build in progress or interrupted; may hold a searchable partial index
+    None       - no index
+    """
+    if not os.path.isdir(index_path):
+        return None
+    progress = read_index_progress(index_path)
+    if progress:
+        return progress.get("status", "building")
+    return "complete" if has_index_files(index_path) else None
+
+
+def save_index_checkpoint(vectorstore, index_path: str):
+    """
+    Saves the vectorstore without exposing a half-written index: the chunk store is
+    swapped in before the FAISS index, so a reader never sees vectors whose chunks
+    are missing (see backend/index_store.py).
+    """
+    save_index(vectorstore, index_path)
+
+
+def claim_index_build(index_path: str, wait: bool = False) -> bool:
+    """
+    Takes the build lock of an index (`index_path`.lock, held until release_index_build).
+    It is a file lock, so job workers, request threads and the API process never append
+    to the same checkpoint at once. Returns False if another build holds it (with
+    wait=True: blocks until it is released), or if the index is complete once the lock
+    is taken - nothing left to build.
+    """
+    lock = ExitStack()
+    try:
+        lock.enter_context(exclusive_file_lock(f"{index_path}.lock", blocking=wait))
+    except BlockingIOError:
+        lock.close()
+        return False
+    if get_index_status(index_path) == "complete":
+        lock.close()
+        return False
+    with _indexes_in_progress_lock:
+        _indexes_in_progress[index_path] = lock
+    return True
+
+
+def release_index_build(index_path: str):
+    with _indexes_in_progress_lock:
+        lock = _indexes_in_progress.pop(index_path, None)
+    if lock is not None:
+        lock.close()
+
+
+# --- IN-PROCESS VECTORSTORE CACHE ---
+# /generate-section is called five times back-to-back for the same tender, and each
+# call used to unpickle index.pkl + read index.faiss. Loaded stores are kept in a
+# byte-bounded LRU and invalidated when any file in the index directory changes.
+VECTORSTORE_CACHE_MAX_BYTES = int(os.getenv("VECTORSTORE_CACHE_MAX_MB", "512")) * 1024 * 1024
+_vectorstore_cache = OrderedDict()  # index_path -> (signature, size_bytes, vectorstore)
+_vectorstore_cache_lock = threading.Lock()
+_vectorstore_load_locks = {}  # index_path -> Lock: one disk load per index at a time
+_path_locks_guard = threading.Lock()  # creates / evicts the per-index locks of both caches
+
+
+def _path_lock(locks: dict, index_path: str) -> threading.Lock:
+    """Per-index lock from `locks`, created under a guard so concurrent first callers share one."""
+    with _path_locks_guard:
+        lock = locks.get(index_path)
+        if lock is None:
+            lock = locks[index_path] = threading.Lock()
+        return lock
+
+
+def _drop_path_lock(locks: dict, index_path: str):
+    """Forgets the lock of an evicted index (kept while someone still holds it)."""
+    with _path_locks_guard:
+        lock = locks.get(index_path)
+        if lock is not None and not lock.locked():
+            del locks[index_path]
+
+
+def _index_dir_signature(index_path: str) -> tuple:
+    """(name, mtime_ns, size) of every file in the index dir - changes whenever the index is rewritten."""
+    signature = []
+    for name in sorted(os.listdir(index_path)):
+        try:
+            stat = os.stat(os.path.join(index_path, name))
+        except FileNotFoundError:
+            continue  # checkpoint temp file replaced mid-listing
+        signature.append((name, stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+def _estimate_vectorstore_bytes(vectorstore, signature: tuple) -> int:
+    """Approximates resident size from the on-disk files (the .faiss size tracks flat / HNSW / IVF-PQ memory)."""
+    return sum(size for _, _, size in signature)
+
+
+def cache_vectorstore(index_path: str, vectorstore):
+    """Puts a freshly built/saved vectorstore into the LRU and evicts by total byte size."""
+    signature = _index_dir_signature(index_path)
+    size = _estimate_vectorstore_bytes(vectorstore, signature)
+    with _vectorstore_cache_lock:
+        _vectorstore_cache[index_path] = (signature, size, vectorstore)
+        _vectorstore_cache.move_to_end(index_path)
+        total = sum(entry[1] for entry in _vectorstore_cache.values())
+        # Always keep the most recent entry, even if it alone exceeds the budget
+        while total > VECTORSTORE_CACHE_MAX_BYTES and len(_vectorstore_cache) > 1:
+            evicted_path, (_, evicted_size, _) = _vectorstore_cache.popitem(last=False)
+            _drop_path_lock(_vectorstore_load_locks, evicted_path)
+            total -= evicted_size
+            print(f"[VS-CACHE] Evicted {evicted_path} ({evicted_size / 1e6:.1f} MB)")
+
+
+def invalidate_vectorstore(index_path: str):
+    """Drops a cached vectorstore (e.g. after the index directory is rebuilt)."""
+    with _vectorstore_cache_lock:
+        _vectorstore_cache.pop(index_path, None)
+    _drop_path_lock(_vectorstore_load_locks, index_path)
+
+
+def load_vectorstore(index_path: str):
+    """
+    Returns the FAISS vectorstore for `index_path`, from memory when the on-disk
+    index is unchanged, otherwise loading it from disk and caching it.
+    """
+    with _path_lock(_vectorstore_load_locks, index_path):
+        signature = _index_dir_signature(index_path)
+        with _vectorstore_cache_lock:
+            entry = _vectorstore_cache.get(index_path)
+            if entry and entry[0] == signature:
+                _vectorstore_cache.move_to_end(index_path)
+                return entry[2]
+
+        # OPTIMIZATION: mmap'd FAISS + lazy chunk store - O(1) load, no unpickling
+        vectorstore = load_index(index_path, embeddings)
+        cache_vectorstore(index_path, vectorstore)
+        return vectorstore
+
+# --- HYBRID (BM25 + VECTOR) RETRIEVAL ---
+# Clause numbers, amounts and rule ids are matched exactly by a per-tender BM25 index
+# (backend/sparse_index.py) and fused with the dense ranking (RRF), so sections get
+# the same or better context from fewer chunks - fewer Groq input tokens.
+HYBRID_RETRIEVAL_ENABLED = os.getenv("HYBRID_RETRIEVAL_ENABLED", "1") == "1"
+SECTION_CONTEXT_K = int(os.getenv("SECTION_CONTEXT_K", "15" if HYBRID_RETRIEVAL_ENABLED else "30"))
+HYBRID_FETCH_K = int(os.getenv("HYBRID_FETCH_K", "50"))  # candidates per ranking before fusion
+SPARSE_CACHE_MAX_ENTRIES = int(os.getenv("SPARSE_CACHE_MAX_ENTRIES", "64"))
+_sparse_cache = OrderedDict()  # index_path -> (signature, SparseIndex), LRU
+_sparse_cache_lock = threading.Lock()
+_sparse_build_locks = {}  # index_path -> Lock: one BM25 build per index at a time
+
+
+def vectorstore_texts(vectorstore) -> list:
+    """Chunk texts in FAISS row order."""
+    return [vectorstore.docstore.search(vectorstore.index_to_docstore_id[i]).page_content
+            for i in range(vectorstore.index.ntotal)]
+
+
+def load_sparse_index(index_path: str):
+    """
+    BM25 index of a completed per-tender index, or None (hybrid disabled / still building).
+    Indexes built before hybrid retrieval get their BM25 files on first use.
+    """
+    if not HYBRID_RETRIEVAL_ENABLED:
+        return None
+    if not has_sparse_files(index_path):
+        if get_index_status(index_path) != "complete":
+            return None
+        with _path_lock(_sparse_build_locks, index_path):
+            if not has_sparse_files(index_path):
+                print(f"[HYBRID] Building BM25 index for {index_path}")
+                build_sparse_index(index_path, vectorstore_texts(load_vectorstore(index_path)))
+
+    signature = _index_dir_signature(index_path)
+    with _sparse_cache_lock:
+        entry = _sparse_cache.get(index_path)
+        if entry and entry[0] == signature:
+            _sparse_cache.move_to_end(index_path)
+            return entry[1]
+    sparse = SparseIndex(index_path)
+    with _sparse_cache_lock:
+        _sparse_cache[index_path] = (signature, sparse)
+        _sparse_cache.move_to_end(index_path)
+        while len(_sparse_cache) > SPARSE_CACHE_MAX_ENTRIES:
+            evicted_path, _ = _sparse_cache.popitem(last=False)
+            _drop_path_lock(_sparse_build_locks, evicted_path)
+    return sparse
+
+
+def hybrid_retrieve(index_path: str, query: str, query_vector: list, k: int) -> list:
+    """Top-k chunks by RRF(dense, BM25); dense-only when no BM25 index is available."""
+    vectorstore = load_vectorstore(index_path)
+    try:
+        sparse = load_sparse_index(index_path)
+    except Exception as e:
+        print(f"[HYBRID] BM25 index unavailable for {index_path}, using dense retrieval: {e}")
+        sparse = None
+    if sparse is None or len(sparse) != vectorstore.index.ntotal:
+        return vectorstore.similarity_search_by_vector(query_vector, k=k)
+    return hybrid_search(vectorstore, sparse, query, query_vector, k, HYBRID_FETCH_K)
+
+# --- SHARED RERANKER POOL ---
+# FlashrankRerank used to be constructed per request, reloading the ONNX model each
+# time. A small pool of Ranker instances is created once and checked out per call,
+# so concurrent requests never share a tokenizer/session mid-inference.
+RERANK_MODEL = "ms-marco-MultiBERT-L-12"
+RERANKER_POOL_SIZE = int(os.getenv("RERANKER_POOL_SIZE", "2"))
+_reranker_pool = None
+_reranker_pool_lock = threading.Lock()
+
+
+def get_reranker_pool() -> queue.Queue:
+    """Lazily builds the process-wide pool of FlashRank rankers."""
+    global _reranker_pool
+    if _reranker_pool is None:
+        with _reranker_pool_lock:
+            if _reranker_pool is None:
+                pool = queue.Queue()
+                for _ in range(max(1, RERANKER_POOL_SIZE)):
+                    pool.put(Ranker(model_name=RERANK_MODEL))
+                _reranker_pool = pool
+                print(f"[RERANKER] Loaded {RERANKER_POOL_SIZE} x {RERANK_MODEL}")
+    return _reranker_pool
+
+
+def rerank_documents(query: str, docs: list, top_n: int) -> list:
+    """
+    Reorders `docs` by FlashRank relevance to `query` and returns the top_n.
+    Scores are stored in metadata["relevance_score"] (same key FlashrankRerank used).
+    """
+    if not docs:
+        return []
+    pool = get_reranker_pool()
+    ranker = pool.get()
+    try:
+        passages = [{"id": i, "text": doc.page_content} for i, doc in enumerate(docs)]
+        results = ranker.rerank(RerankRequest(query=query, passages=passages))
+    finally:
+        pool.put(ranker)
+
+    reranked = []
+    for res in results[:top_n]:
+        doc = docs[res["id"]]
+        doc.metadata["relevance_score"] = float(res["score"])
+        reranked.append(doc)
+    return reranked
+
+
+@app.on_event("startup")
+def warm_up_reranker():
+    """Loads the reranker pool at startup so the first request only pays for inference."""
+    try:
+        rerank_documents("warm up", [Document(page_content="warm up")], top_n=1)
+    except Exception as e:
+        print(f"[RERANKER] Warm-up failed (will retry lazily): {e}")
+
+def _summary_messages(user_query, retrieved_chunks, output_format) -> list:
+    """Builds the chat messages for a tender summary."""
+    # OPTIMIZATION: deduped / merged chunks packed to a token budget (backend/context_packing.py)
+    context_text, _, stats = pack_context(retrieved_chunks, CONTEXT_TOKENS_SUMMARY)
+    print(f"[CONTEXT] Summary: {stats['chunks']} chunks -> {stats['blocks']} blocks, "
+          f"{stats['tokens']}/{stats['budget']} tokens")
     
     system_instruction = f"""
     You are an expert Tender Analyst. Use the provided Context to answer the user's Request.
@@ -551,6 +956,50 @@ def generate_summary_with_groq(user_query, retrieved_chunks, output_format):
         {"role": "system", "content": system_instruction},
         {"role": "user", "content": f"Context:\n{context_text}\n\nRequest: {user_query}. Please provide a very detailed analysis."}
     ]
+    return messages
+
+# --- LLM RESPONSE CACHE ---
+# Persistent SQLite cache (backend/llm_cache.py) keyed on model + sampling params +
+# prompt + retrieved chunk ids. Summaries also store the query embedding under a scope
+# (index + output format + depth) so near-duplicate queries can reuse a prior answer.
+
+def llm_cache_key(messages: list, docs: list, temperature: float, max_tokens: int) -> str:
+    return fingerprint("llama-3.3-70b-versatile", temperature, max_tokens, messages, chunk_ids(docs))
+
+def summary_cache_scope(index_key: str, output_format: str, depth: str) -> str:
+    """Near-duplicate summary queries may only share answers within the same index/format/depth."""
+    return f"summary:{index_key}:{output_format}:{depth}"
+
+def get_cached_llm_response(key: str, query: str = None, scope: str = None):
+    """Exact-key hit, else (summaries only) a semantic near-duplicate in `scope`. Blocking."""
+    if not LLM_CACHE_ENABLED:
+        return None
+    try:
+        content = llm_response_cache.get(key)
+        if content is None and scope and query and LLM_CACHE_SIMILARITY <= 1.0:
+            content = llm_response_cache.find_similar(scope, embeddings.embed_query(query), LLM_CACHE_SIMILARITY)
+        return content
+    except Exception as e:
+        print(f"[LLM-CACHE] Lookup failed (treating as miss): {e}")
+        return None
+
+def store_llm_response(key: str, content: str, query: str = None, scope: str = None):
+    """Persists a generated response (and the query embedding for semantic reuse). Blocking."""
+    if not LLM_CACHE_ENABLED or not content:
+        return
+    try:
+        vector = embeddings.embed_query(query) if scope and query else None
+        llm_response_cache.put(key, content, scope=scope, vector=vector)
+    except Exception as e:
+        print(f"[LLM-CACHE] Store failed: {e}")
+
+def generate_summary_with_groq(user_query, retrieved_chunks, output_format, cache_scope=None):
+    """Generates the final summary using Groq (served from the response cache when possible)."""
+    messages = _summary_messages(user_query, retrieved_chunks, output_format)
+    cache_key = llm_cache_key(messages, retrieved_chunks, 0.3, 4500)
+    cached = get_cached_llm_response(cache_key, user_query, cache_scope)
+    if cached is not None:
+        return cached
     
     response = groq_client.chat.completions.create(
         model="llama-3.3-70b-versatile",
@@ -559,7 +1008,51 @@ def generate_summary_with_groq(user_query, retrieved_chunks, output_format):
         max_tokens=4500
     )
     
-    return response.choices[0].message.content
+    content = response.choices[0].message.content
+    store_llm_response(cache_key, content, user_query, cache_scope)
+    return content
+
+# --- SERVER-SENT EVENTS ---
+# Streaming endpoints emit `event: <name>` + JSON `data:` frames:
+#   progress {stage, ...counters} -> meta {...} -> delta {"text"} ... -> done {...}  (or error {"message"})
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}  # no proxy buffering
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def stream_groq_deltas(messages: list, temperature: float, max_tokens: int):
+    """Yields Groq completion text deltas as they arrive."""
+    stream = await async_groq_client.chat.completions.create(
+        model="llama-3.3-70b-versatile",
+        messages=messages,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        stream=True
+    )
+    async for chunk in stream:
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if delta:
+            yield delta
+
+async def generate_summary_with_groq_async(user_query, retrieved_chunks, output_format, cache_scope=None):
+    """Async variant of generate_summary_with_groq for request handlers."""
+    # Token packing (tiktoken) runs on the blocking executor
+    messages = await run_blocking(_summary_messages, user_query, retrieved_chunks, output_format)
+    cache_key = llm_cache_key(messages, retrieved_chunks, 0.3, 4500)
+    cached = await run_blocking(get_cached_llm_response, cache_key, user_query, cache_scope)
+    if cached is not None:
+        return cached
+    
+    response = await async_groq_client.chat.completions.create(
+        model="llama-3.3-70b-versatile",
+        messages=messages,
+        temperature=0.3,
+        max_tokens=4500
+    )
+    
+    content = response.choices[0].message.content
+    await run_blocking(store_llm_response, cache_key, content, user_query, cache_scope)
+    return content
 
 def process_rag_pipeline(pdf_path, query, output_format, depth):
     """
@@ -576,7 +1069,7 @@ def process_rag_pipeline(pdf_path, query, output_format, depth):
     docs = [Document(page_content=d.text, metadata=d.metadata or {}) for d in llama_docs]
     
     # 2. Split Text
-    text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=100)
+    text_splitter = make_text_splitter(1000, 100)
     split_docs = text_splitter.split_documents(docs)
     
     # 3. Create FRESH Vector Store (Local Scope)
@@ -587,192 +1080,573 @@ def process_rag_pipeline(pdf_path, query, output_format, depth):
     retriever = vectorstore.as_retriever(search_kwargs={"k": 30}) # Fetch broad context
     
     # 5. Rerank (Optional but recommended)
+    # Use the USER QUERY, not a hardcoded one
+    print(f"--- Searching for: {query} ---")
+    candidates = retriever.invoke(query)
     try:
-        compressor = FlashrankRerank(model="ms-marco-MultiBERT-L-12")
-        compression_retriever = ContextualCompressionRetriever(
-            base_compressor=compressor, 
-            base_retriever=retriever
-        )
-        # Use the USER QUERY, not a hardcoded one
-        print(f"--- Searching for: {query} ---")
-        compressed_docs = compression_retriever.invoke(query)[:15]
+        compressed_docs = rerank_documents(query, candidates, top_n=15)
     except Exception as e:
         print(f"Rerank failed, falling back to standard retrieval: {e}")
-        compressed_docs = retriever.invoke(query)[:15]
+        compressed_docs = candidates[:15]
 
     # 6. Generate
     return generate_summary_with_groq(query, compressed_docs, output_format)
 
+# --- STREAMING INGESTION PIPELINE ---
+# parse -> split -> embed run as concurrent stages joined by bounded queues, so
+# embedding starts with the first pages and only a few pages/batches are in flight.
+EMBED_BATCH_SIZE = int(os.getenv("INGEST_EMBED_BATCH", "100"))  # chunks per embed call; raise with EMBEDDING_PARALLEL
+INGEST_QUEUE_SIZE = 8  # max pages (and chunk batches) buffered between stages
+_PIPELINE_DONE = object()
+
+
+def _pipeline_put(q: queue.Queue, item, stop_event: threading.Event) -> bool:
+    """Blocking put that gives up once the pipeline is stopped. Returns False if stopped."""
+    while not stop_event.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _pipeline_get(q: queue.Queue, stop_event: threading.Event):
+    """Blocking get that returns the end-of-stream marker once the pipeline is stopped."""
+    while not stop_event.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return _PIPELINE_DONE
+
+
+def _stored_chunk_text(vectorstore, row: int) -> str:
+    return vectorstore.docstore.search(vectorstore.index_to_docstore_id[row]).page_content
+
+
+def _truncate_checkpoint(vectorstore, count: int):
+    """Keeps the first `count` rows of a resumed (flat, in-memory) checkpoint; None if count is 0."""
+    import faiss
+    ntotal = vectorstore.index.ntotal
+    if count == 0:
+        return None
+    vectorstore.index.remove_ids(faiss.IDSelectorRange(count, ntotal))
+    for row in range(count, ntotal):
+        vectorstore.docstore.delete([vectorstore.index_to_docstore_id.pop(row)])
+    return vectorstore
+
+
+def build_index_streaming(page_iter, text_splitter, log_tag: str, batch_size: int = EMBED_BATCH_SIZE,
+                          checkpoint_path: str = None, progress=None, parse_pass: str = None):
+    """
+    Builds a FAISS vectorstore from a page iterator with parsing, splitting and
+    embedding overlapped in separate stages.
+
+    With `checkpoint_path`, the index is saved there every INDEX_CHECKPOINT_SECONDS
+    (or INDEX_CHECKPOINT_EVERY batches, if set) and marked complete at the end. An interrupted build found at that path is
+    resumed when it was written by the same `parse_pass` (e.g. "fast" vs "ocr" pages
+    of the same upload): the re-split chunks are compared with the checkpointed ones
+    and only chunks past the checkpoint are embedded. If the stream diverges from the
+    checkpoint or ends before reaching it, the checkpoint is cut back to the matching
+    prefix. A checkpoint of another pass is left alone until this pass has chunks to
+    replace it with.
+    `progress(stage, **counters)` is called after every embedded batch (job status).
+    Returns (vectorstore or None if no chunks, {"pages": n, "chunks": n}).
+    """
+    import time
+    progress = progress or _no_progress
+    page_queue = queue.Queue(maxsize=INGEST_QUEUE_SIZE)
+    batch_queue = queue.Queue(maxsize=INGEST_QUEUE_SIZE)
+    stop_event = threading.Event()
+    errors = []
+    stats = {"pages": 0, "chunks": 0, "chunks_split": 0}
+
+    def parse_stage():
+        try:
+            for doc in page_iter:
+                if not _pipeline_put(page_queue, doc, stop_event):
+                    return
+        except Exception as e:
+            errors.append(e)
+        finally:
+            _pipeline_put(page_queue, _PIPELINE_DONE, stop_event)
+
+    def split_stage():
+        pending = []
+        try:
+            while True:
+                doc = _pipeline_get(page_queue, stop_event)
+                if doc is _PIPELINE_DONE:
+                    break
+                stats["pages"] += 1
+                page_chunks = text_splitter.split_documents([doc])
+                stats["chunks_split"] += len(page_chunks)
+                pending.extend(page_chunks)
+                while len(pending) >= batch_size:
+                    if not _pipeline_put(batch_queue, pending[:batch_size], stop_event):
+                        return
+                    pending = pending[batch_size:]
+            if pending:
+                _pipeline_put(batch_queue, pending, stop_event)
+        except Exception as e:
+            errors.append(e)
+            stop_event.set()
+        finally:
+            _pipeline_put(batch_queue, _PIPELINE_DONE, stop_event)
+
+    stages = [
+        threading.Thread(target=parse_stage, name=f"{log_tag}-parse", daemon=True),
+        threading.Thread(target=split_stage, name=f"{log_tag}-split", daemon=True),
+    ]
+    for t in stages:
+        t.start()
+
+    # Embed stage runs on the calling thread
+    vectorstore = None
+    skip_chunks = 0  # checkpointed chunks not yet matched against the re-split stream
+    verified_chunks = 0
+    owns_checkpoint = True  # False while the directory still holds another pass's checkpoint
+    batches_since_checkpoint = 0
+    last_checkpoint = time.time()
+    try:
+        if checkpoint_path:
+            saved_progress = read_index_progress(checkpoint_path) or {}
+            if saved_progress.get("status") == "building" and has_index_files(checkpoint_path):
+                if saved_progress.get("pass") == parse_pass:
+                    vectorstore = load_index_for_append(checkpoint_path, embeddings)
+                    skip_chunks = vectorstore.index.ntotal
+                    print(f"[{log_tag}] Resuming from checkpoint: {skip_chunks} chunks already indexed")
+                else:
+                    owns_checkpoint = False
+                    print(f"[{log_tag}] Checkpoint belongs to the '{saved_progress.get('pass')}' pass; not resuming it")
+            if owns_checkpoint:
+                write_index_progress(checkpoint_path, "building", skip_chunks, 0, parse_pass)
+
+        while True:
+            batch = _pipeline_get(batch_queue, stop_event)
+            if batch is _PIPELINE_DONE:
+                break
+            stats["chunks"] += len(batch)
+            if skip_chunks:
+                matched = 0
+                while matched < min(skip_chunks, len(batch)) and \
+                        batch[matched].page_content == _stored_chunk_text(vectorstore, verified_chunks + matched):
+                    matched += 1
+                verified_chunks += matched
+                skip_chunks -= matched
+                batch = batch[matched:]
+                if batch and skip_chunks:
+                    print(f"[{log_tag}] Re-split chunks diverge from the checkpoint at chunk "
+                          f"{verified_chunks + 1}; re-indexing from there")
+                    vectorstore = _truncate_checkpoint(vectorstore, verified_chunks)
+                    skip_chunks = 0
+                if not batch:
+                    continue
+            print(f"[{log_tag}] Indexing chunks {stats['chunks'] - len(batch) + 1}-{stats['chunks']} "
+                  f"({stats['pages']} pages parsed so far)...")
+            if vectorstore is None:
+                vectorstore = FAISS.from_documents(batch, embeddings)
+            else:
+                vectorstore.add_documents(batch)
+            gc.collect()
+            progress("embedding", pages_parsed=stats["pages"], chunks_split=stats["chunks_split"],
+                     chunks_embedded=stats["chunks"])
+
+            if checkpoint_path:
+                batches_since_checkpoint += 1
+                if (INDEX_CHECKPOINT_EVERY and batches_since_checkpoint >= INDEX_CHECKPOINT_EVERY) or \
+                        time.time() - last_checkpoint >= INDEX_CHECKPOINT_SECONDS:
+                    save_index_checkpoint(vectorstore, checkpoint_path)
+                    write_index_progress(checkpoint_path, "building", vectorstore.index.ntotal, stats["pages"],
+                                         parse_pass)
+                    owns_checkpoint = True
+                    batches_since_checkpoint = 0
+                    last_checkpoint = time.time()
+    finally:
+        stop_event.set()
+        for t in stages:
+            t.join()
+
+    if errors:
+        raise errors[0]
+
+    if skip_chunks:
+        # The stream ended before reaching the checkpoint - its tail is not part of this document
+        print(f"[{log_tag}] Stream ended after {verified_chunks} of {verified_chunks + skip_chunks} "
+              f"checkpointed chunks; dropping the rest")
+        vectorstore = _truncate_checkpoint(vectorstore, verified_chunks)
+
+    if vectorstore is not None:
+        # OPTIMIZATION: large documents are re-indexed as HNSW / IVF-PQ (backend/index_factory.py);
+        # checkpoints stay flat so an interrupted build can still be appended to
+        start = time.time()
+        vectorstore.index, index_type = convert_index(vectorstore.index)
+        if index_type != "flat":
+            print(f"[{log_tag}] Built {index_type} index over {vectorstore.index.ntotal} chunks "
+                  f"in {time.time() - start:.2f}s")
+
+    if checkpoint_path:
+        if vectorstore is None:
+            # Nothing extracted - don't leave an empty "building" index behind (another
+            # pass's checkpoint stays for that pass to resume, e.g. the OCR fallback)
+            if owns_checkpoint:
+                shutil.rmtree(checkpoint_path, ignore_errors=True)
+        else:
+            save_index_checkpoint(vectorstore, checkpoint_path)
+            if HYBRID_RETRIEVAL_ENABLED:
+                build_sparse_index(checkpoint_path, vectorstore_texts(vectorstore))
+            write_index_progress(checkpoint_path, "complete", vectorstore.index.ntotal, stats["pages"],
+                                 parse_pass)
+    return vectorstore, stats
+
+
+# --- CROSS-TENDER ARCHIVE INDEX ---
+# Completed per-tender indexes are also added to one sharded HNSW index
+# (backend/global_index.py) so questions can span the whole archive.
+
+def publish_to_global_index(index_key: str, index_path: str, filename: str, file_hash: str, parsing_mode: str):
+    """Adds a completed per-tender index to the archive index. Failures never fail the upload."""
+    if not GLOBAL_INDEX_ENABLED:
+        return
+    try:
+        get_global_index().add_document(index_key, index_path, filename, file_hash, parsing_mode,
+                                        embed_fn=embeddings.embed_documents)
+    except Exception as e:
+        print(f"[GLOBAL-INDEX] Could not add {filename}: {e}")
+
+
 # --- API ENDPOINTS ---
 
-@app.post("/upload-tender")
-async def upload_tender(
-    file: UploadFile = File(...),
-    parsing_mode: str = Form("Fast") # Options: "Fast", "High-Quality"
-):
+def ingest_tender_file(temp_path: str, filename: str, file_hash: str, parsing_mode: str, progress=None) -> dict:
     """
-    Ingests a PDF: Parses -> Chunks -> Indexes -> Saves Index to Disk.
-    parsing_mode: "Fast" (PyMuPDF/PyPDF) or "High-Quality" (LlamaParse Vision with parallelism)
-    
-    Performance optimizations for large files:
-    - Page-Level Parallelism: Splits PDF into 5-page batches for concurrent processing
-    - Partial Indexing: Saves index after each batch so generation can start early
+    Ingests a saved PDF: Parses -> Chunks -> Indexes -> Saves Index to Disk.
+    Shared by /upload-tender (inline) and the background ingestion job.
+    Always removes `temp_path`. Raises HTTPException when no text can be extracted.
     """
-    index_path = get_index_path(file.filename)
-    
-    # optimization: check if index already exists
-    if os.path.exists(index_path):
+    import time
+    progress = progress or _no_progress
+    index_key = get_content_index_key(file_hash, parsing_mode, UPLOAD_CHUNK_SIZE, UPLOAD_CHUNK_OVERLAP)
+    index_path = get_content_index_path(index_key)
+
+    # optimization: identical bytes + config already indexed -> skip parse/embed
+    # (re-checked when the claim fails: another process may have just completed it)
+    claimed = get_index_status(index_path) != "complete" and claim_index_build(index_path)
+    if not claimed and get_index_status(index_path) == "complete":
+        os.remove(temp_path)
+        record_index_in_manifest(filename, index_key, file_hash, parsing_mode,
+                                 UPLOAD_CHUNK_SIZE, UPLOAD_CHUNK_OVERLAP)
+        publish_to_global_index(index_key, index_path, filename, file_hash, parsing_mode)
         return {
-            "status": "success", 
+            "status": "success",
             "message": "File already indexed.",
-            "filename": file.filename,
+            "filename": filename,
+            "index_key": index_key,
             "cached": True
         }
 
+    if not claimed:
+        os.remove(temp_path)
+        return {
+            "status": "success",
+            "message": "File is already being indexed; partial results are available.",
+            "filename": filename,
+            "index_key": index_key,
+            "cached": False,
+            "partial": True
+        }
+
     try:
-        # 1. Save locally for parsing
-        temp_path = f"temp_{file.filename}"
-        with open(temp_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        docs = []
-        text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=100)
+        # Register the filename up front so /generate-section can query the partial index
+        record_index_in_manifest(filename, index_key, file_hash, parsing_mode,
+                                 UPLOAD_CHUNK_SIZE, UPLOAD_CHUNK_OVERLAP)
+
+        start_time = time.time()
+        text_splitter = make_text_splitter(UPLOAD_CHUNK_SIZE, UPLOAD_CHUNK_OVERLAP)
+        progress("parsing")
         
         if parsing_mode == "High-Quality":
             # HYBRID HIGH-QUALITY PARSING
             # Combines PyMuPDF speed with LlamaParse quality for scanned pages
-            import time
-            start_time = time.time()
-            
-            print(f"[HIGH-QUALITY HYBRID] Parsing {file.filename}...")
-            print("[HIGH-QUALITY HYBRID] Phase 1: Fast extraction with PyMuPDF")
-            print("[HIGH-QUALITY HYBRID] Phase 2: OCR for image-heavy pages with LlamaParse")
+            log_tag = "HIGH-QUALITY HYBRID"
+            print(f"[{log_tag}] Parsing {filename}...")
+            print(f"[{log_tag}] Phase 1: Fast extraction with PyMuPDF")
+            print(f"[{log_tag}] Phase 2: OCR for image-heavy pages with LlamaParse")
             
-            # Use the hybrid parser
+            # OCR batching needs the full page list, but split + embed still stream
             docs = parse_pdf_hybrid_quality(temp_path)
-            
-            parse_time = time.time() - start_time
-            print(f"[HIGH-QUALITY HYBRID] Parsing complete in {parse_time:.2f}s ({len(docs)} pages)")
-            
-            # Split and index
-            split_docs = text_splitter.split_documents(docs)
-            total_chunks = len(split_docs)
-            print(f"[HIGH-QUALITY HYBRID] Creating vector store with {total_chunks} chunks...")
-            
-            # BATCHED INDEXING to prevent memory exhaustion AND optimize speed
-            # OPTIMIZATION: Use add_documents instead of merge_from for O(N) performance vs O(N^2)
-            EMBED_BATCH_SIZE = 100 # Increased batch size
-            vectorstore = None
-            
-            for i in range(0, total_chunks, EMBED_BATCH_SIZE):
-                batch = split_docs[i:i + EMBED_BATCH_SIZE]
-                print(f"[HIGH-QUALITY HYBRID] Indexing chunks {i+1}-{min(i+EMBED_BATCH_SIZE, total_chunks)}/{total_chunks}...")
-                
-                if vectorstore is None:
-                    vectorstore = FAISS.from_documents(batch, embeddings)
-                else:
-                    vectorstore.add_documents(batch)
-                
-                # Aggressive GC to prevent freeze
-                if i % (EMBED_BATCH_SIZE * 2) == 0:
-                    gc.collect()
-            
-            if vectorstore is not None:
-                vectorstore.save_local(index_path)
-                total_time = time.time() - start_time
-                print(f"[HIGH-QUALITY HYBRID COMPLETE] Index saved with {total_chunks} chunks in {total_time:.2f}s")
-            else:
-                total_time = time.time() - start_time
-                print(f"[HIGH-QUALITY HYBRID] WARNING: No chunks extracted, index not saved")
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
-                raise HTTPException(status_code=500, detail="No text could be extracted from the PDF. The document may be image-only or corrupted.")
-            
+            print(f"[{log_tag}] Parsing complete in {time.time() - start_time:.2f}s ({len(docs)} pages)")
+            vectorstore, stats = build_index_streaming(iter(docs), text_splitter, log_tag,
+                                                       checkpoint_path=index_path, progress=progress)
+            del docs
         else:
-            # FAST-QUALITY MODE: Parse PDF with PyMuPDF (15-21x faster than PyPDF)
-            import time
-            start_time = time.time()
-            
-            print(f"[FAST-QUALITY MODE] Parsing {file.filename} with PyMuPDF...")
-            docs = parse_pdf_fast_quality(temp_path)
-            
-            parse_time = time.time() - start_time
-            print(f"[FAST-QUALITY MODE] Parsing complete in {parse_time:.2f}s ({len(docs)} pages)")
-            
-            # 3. Split
-            split_docs = text_splitter.split_documents(docs)
-            total_chunks = len(split_docs)
-            
-            # 4. BATCHED Index & Save to prevent memory exhaustion
-            print(f"[FAST-QUALITY MODE] Creating Vector Store with {total_chunks} chunks...")
-            # OPTIMIZATION: Use add_documents instead of merge_from
-            EMBED_BATCH_SIZE = 100 
-            vectorstore = None
-            
-            for i in range(0, total_chunks, EMBED_BATCH_SIZE):
-                batch = split_docs[i:i + EMBED_BATCH_SIZE]
-                print(f"[FAST-QUALITY MODE] Indexing chunks {i+1}-{min(i+EMBED_BATCH_SIZE, total_chunks)}/{total_chunks}...")
-                
-                if vectorstore is None:
-                    vectorstore = FAISS.from_documents(batch, embeddings)
-                else:
-                    vectorstore.add_documents(batch)
-                
-                if i % (EMBED_BATCH_SIZE * 2) == 0:
-                    gc.collect()
-                
-                gc.collect()
-            
-            if vectorstore is not None:
-                vectorstore.save_local(index_path)
-                total_time = time.time() - start_time
-                print(f"[FAST-QUALITY MODE COMPLETE] Index saved with {total_chunks} chunks in {total_time:.2f}s")
-            else:
+            # FAST-QUALITY MODE: PyMuPDF pages stream straight into the splitter/embedder
+            log_tag = "FAST-QUALITY MODE"
+            print(f"[{log_tag}] Streaming {filename} through parse -> split -> embed...")
+            vectorstore, stats = build_index_streaming(iter_pdf_pages_fast_quality(temp_path), text_splitter, log_tag,
+                                                       checkpoint_path=index_path, progress=progress, parse_pass="fast")
+
+            if vectorstore is None:
                 # AUTO-FALLBACK: Fast mode yielded 0 chunks → retry with OCR
-                print(f"[FAST-QUALITY MODE] WARNING: No text extracted via PyMuPDF. Auto-falling back to High-Quality OCR...")
-                
-                docs = parse_pdf_hybrid_quality(temp_path)
-                split_docs = text_splitter.split_documents(docs)
-                total_chunks = len(split_docs)
-                print(f"[FALLBACK OCR] Got {total_chunks} chunks from OCR parsing")
-                
-                EMBED_BATCH_SIZE_FB = 100
-                vectorstore = None
-                for i in range(0, total_chunks, EMBED_BATCH_SIZE_FB):
-                    batch = split_docs[i:i + EMBED_BATCH_SIZE_FB]
-                    if vectorstore is None:
-                        vectorstore = FAISS.from_documents(batch, embeddings)
-                    else:
-                        vectorstore.add_documents(batch)
-                    if i % (EMBED_BATCH_SIZE_FB * 2) == 0:
-                        gc.collect()
-                
-                if vectorstore is not None:
-                    vectorstore.save_local(index_path)
-                    total_time = time.time() - start_time
-                    print(f"[FALLBACK OCR COMPLETE] Index saved with {total_chunks} chunks in {total_time:.2f}s")
-                else:
-                    total_time = time.time() - start_time
-                    print(f"[FALLBACK OCR] FAILED: Still no text extracted after OCR")
-                    if os.path.exists(temp_path):
-                        os.remove(temp_path)
-                    raise HTTPException(status_code=500, detail="No text could be extracted from the PDF even with OCR. The document may be corrupted.")
-        
-        # Cleanup
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
+                print(f"[{log_tag}] WARNING: No text extracted via PyMuPDF. Auto-falling back to High-Quality OCR...")
+                log_tag = "FALLBACK OCR"
+                progress("ocr_fallback")
+                vectorstore, stats = build_index_streaming(iter(parse_pdf_hybrid_quality(temp_path)), text_splitter, log_tag,
+                                                           checkpoint_path=index_path, progress=progress, parse_pass="ocr")
+                print(f"[{log_tag}] Got {stats['chunks']} chunks from OCR parsing")
+
+        total_time = time.time() - start_time
+        if vectorstore is None:
+            print(f"[{log_tag}] FAILED: No chunks extracted, index not saved")
+            if parsing_mode == "High-Quality":
+                raise HTTPException(status_code=500, detail="No text could be extracted from the PDF. The document may be image-only or corrupted.")
+            raise HTTPException(status_code=500, detail="No text could be extracted from the PDF even with OCR. The document may be corrupted.")
+
+        cache_vectorstore(index_path, vectorstore)
+        publish_to_global_index(index_key, index_path, filename, file_hash, parsing_mode)
+        print(f"[{log_tag} COMPLETE] Index saved with {stats['chunks']} chunks from {stats['pages']} pages in {total_time:.2f}s")
         
         return {
             "status": "success", 
-            "message": f"File indexed successfully ({len(docs)} documents).",
-            "filename": file.filename,
+            "message": f"File indexed successfully ({stats['pages']} documents).",
+            "filename": filename,
+            "index_key": index_key,
             "cached": False
         }
+    finally:
+        release_index_build(index_path)
+        # Cleanup
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
 
+
+@app.post("/upload-tender")
+async def upload_tender(
+    file: UploadFile = File(...),
+    parsing_mode: str = Form("Fast") # Options: "Fast", "High-Quality"
+):
+    """
+    Ingests a PDF: Parses -> Chunks -> Indexes -> Saves Index to Disk.
+    parsing_mode: "Fast" (PyMuPDF/PyPDF) or "High-Quality" (LlamaParse Vision with parallelism)
+    For large files prefer POST /jobs/upload-tender, which returns a job id immediately.
+    
+    Performance optimizations for large files:
+    - Page-Level Parallelism: Splits PDF into 5-page batches for concurrent processing
+    - Partial Indexing: Saves index after each batch so generation can start early;
+      an interrupted build resumes from its last checkpoint on re-upload
+    - Content-Addressed Cache: Identical bytes (any filename) reuse the existing index
+    """
+    try:
+        # 1. Save locally for parsing (hashing in the same pass)
+        temp_path = _new_temp_path("temp", file.filename)
+        file_hash = await run_blocking(save_upload_with_hash, file.file, temp_path)
+        # 2. Parse -> chunk -> embed off the event loop
+        return await run_blocking(ingest_tender_file, temp_path, file.filename, file_hash, parsing_mode)
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"ERROR in upload_tender: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def pack_section_context(docs: list) -> str:
+    """Section context: chunks deduped, merged per page and packed to CONTEXT_TOKENS_SECTION."""
+    context_text, _, stats = pack_context(docs, CONTEXT_TOKENS_SECTION, separator="\n\n---\n\n")
+    print(f"[CONTEXT] Section: {stats['chunks']} chunks -> {stats['blocks']} blocks "
+          f"({stats['duplicates']} duplicates, {stats['dropped_blocks']} over budget), "
+          f"{stats['tokens']}/{stats['budget']} tokens")
+    return context_text
+
+def build_section_messages(section_type: str, context_text: str, tone: str,
+                           compliance_mode: bool, company_context: str) -> list:
+    """Chat messages for drafting one bid section from retrieved tender context."""
+    # Build BIDDER PROFILE with SMART CONTEXT & PRIVACY PROTECTION
+    # DEBUG: Log received company context
+    print(f"[BACKEND DEBUG] Received company_context: '{company_context}'")
+    print(f"[BACKEND DEBUG] company_context length: {len(company_context) if company_context else 0}")
+
+    # PRIVACY PROTECTION: Mask sensitive information (if not already hashed by frontend)
+    import re
+    masked_context = company_context
+    if company_context:
+        # Mask bank account numbers (show only last 4 digits)
+        masked_context = re.sub(
+            r'(Bank Account|Account Number):\s*(\d+)',
+            lambda m: f"{m.group(1)}: XXXX-XXXX-{m.group(2)[-4:] if len(m.group(2))>=4 else m.group(2)}",
+            masked_context
+        )
+        # Mask PAN numbers (show only last 4 characters)
+        masked_context = re.sub(
+            r'PAN Number:\s*([A-Z0-9]{5}\d{4}[A-Z])',
+            lambda m: f"PAN Number: XXXXX{m.group(1)[-4:]}",
+            masked_context
+        )
+        # Mask IFSC codes partially
+        masked_context = re.sub(
+            r'IFSC Code:\s*([A-Z]{4}0[A-Z0-9]{6})',
+            lambda m: f"IFSC Code: {m.group(1)[:4]}XXXXX",
+            masked_context
+        )
+
+    # SECTION-SPECIFIC RELEVANCE RULES - Aligned with frontend field names
+    section_relevance = {
+        "Eligibility Response": ["Company Name", "Average Annual Turnover", "FY-wise Turnover", "GST Number", "Past Projects"],
+        "Technical Proposal": ["Company Name", "Registered Address", "Past Projects"],
+        "Financial Statements": ["Company Name", "Average Annual Turnover", "FY-wise Turnover", "GST Number", "Bank Account", "IFSC Code"],
+        "Declarations & Forms": ["Company Name", "Authorized Signatory", "Signatory Designation", "GST Number", "PAN Number", "Registered Address", "Contact Email"],
+        "Annexures": ["Company Name", "Past Projects", "Registered Address"]
+    }
+
+    relevant_fields = section_relevance.get(section_type, ["Company Name"])
+
+    bidder_profile_section = ""
+    if masked_context and masked_context.strip():
+        bidder_profile_section = f"""
+    ### BIDDER COMPANY PROFILE (Reference Only)
+    PROFILE DATA:
+    {masked_context}
+
+    ### SMART USAGE RULES FOR BIDDER DATA:
+    1. **MINIMALISM (CRITICAL)**: ONLY use profile data if the tender specifically asks for bidder details (e.g., "Company Name", "Financial Capacity", "Signatory").
+    2. **SECTION RELEVANCE**: For '{section_type}', typically focus ONLY on: {', '.join(relevant_fields)}. Ignore other fields.
+    3. **NO REPETITION**: NEVER repeat the company name or details in every paragraph. Mention once in formal headers or compliance tables only.
+    4. **MASKING AWARENESS**: If a detail is masked with '*' or 'X' (e.g., Bank Account: ************3456), write exactly that value or "[As per submitted documents]" in the tender body. NEVER try to guess or hallucinate the full number.
+    5. **PROFESSIONAL PLACEMENT**: Use company details primarily in the 'COMPLIANCE MATRIX' and 'SUMMARY' tables where identifying information is mandatory.
+    6. **PRIVACY**: Never include sensitive banking or tax details in descriptive technical paragraphs - keep them restricted to structured tables if required.
+    """
+
+    # SENIOR BID ARCHITECT PROMPT
+    system_instruction = f"""
+    You are a SENIOR BID ARCHITECT specializing in government tender responses, procurement law, and enterprise proposals.
+    Task: Draft the '{section_type}' section for a formal bid response document.
+    {bidder_profile_section}
+    CRITICAL CITATION RULES:
+    - Extract and cite ACTUAL clause/article/section numbers from the tender text.
+    - Use proper legal citation format: [Article X, Clause Y.Z] or [Section X.Y.Z] or [Clause X.Y]
+    - Look for patterns like "Clause 5.2", "Article III", "Section 4.1.3", "Para 6(a)" in the text.
+    - If a specific clause number is visible in the text, cite it exactly (e.g., [Clause 5.2.1]).
+    - If no clause number is found but content exists, use: [Tender Document - Page/Section Reference]
+    - NEVER use generic references like "[Document 1]" or "[Document 5]" - these are invalid.
+
+    CRITICAL GROUNDING RULES (FACT-CHECKING):
+    - Use STRICTLY the provided context. Do not invent or assume information.
+    - If specific information is not found in the context, use placeholder: [DATA NOT FOUND]
+    - If amounts or dates are missing, use: [TO BE VERIFIED FROM TENDER DOCUMENT]
+    - NEVER hallucinate requirements, clauses, or specifications.
+
+    MANDATORY OUTPUT STRUCTURE:
+
+    1. **COMPLIANCE MATRIX** (Start every section with this):
+       | Clause | Requirement | Compliance Status | Source Reference |
+       |--------|-------------|-------------------|------------------|
+       Note: "Source Reference" column must contain actual tender clause numbers like [Clause 5.2.1]
+
+    2. **HIERARCHICAL NUMBERING** throughout:
+       - Use 1.0, 1.1, 1.1.1, 1.1.2, 1.2, 2.0, etc.
+       - Main sections: ### 1.0 Section Title
+       - Subsections: #### 1.1 Subsection Title
+       - Sub-subsections: ##### 1.1.1 Detail
+
+    3. **RISK ASSESSMENT TABLE** (Include in every section):
+       | Potential Risk | Impact Level | Mitigation Strategy | Owner |
+       |----------------|--------------|---------------------|-------|
+
+    4. **IMPLEMENTATION TIMELINE** (When applicable):
+       | Phase | Activity | Start Date | End Date | Deliverable | Status |
+       |-------|----------|------------|----------|-------------|--------|
+
+    5. **SUMMARY TABLE OF KEY DELIVERABLES** (End every section with this):
+       | S.No | Deliverable | Specification | Deadline | Responsibility |
+       |------|-------------|---------------|----------|----------------|
+
+    FORMATTING REQUIREMENTS:
+    - Output strictly in Markdown format
+    - Use H3 (###) for main sections (1.0), H4 (####) for subsections (1.1)
+    - Use Markdown Tables (|---|---|) for ALL structured data
+    - Use **bold** for requirement headers, amounts, percentages, deadlines
+    - Every fact must have a proper citation like [Clause 4.2] or [Section III.5]
+
+    TONE: {tone} / Legal / Government-Standard
+    - Write in formal, precise legal language
+    - Avoid contractions and colloquialisms
+    - Be unambiguous and defensible
+
+    COMPLIANCE MODE: {'STRICT - Every requirement must have explicit compliance statement' if compliance_mode else 'FLEXIBLE - General compliance overview'}
+
+    CRITICAL LENGTH REQUIREMENTS (MANDATORY):
+    - Generate EXTREMELY DETAILED and COMPREHENSIVE content.
+    - Target output: 5000-8000 words per section (approximately 3-4 pages per section).
+    - The complete tender document across all 5 sections should total 18-20 pages.
+    - DO NOT summarize or be brief. EXPAND on every point with full explanations.
+    - Include detailed sub-clauses, explanatory notes, and implementation details.
+    - For each requirement, provide: (a) requirement statement, (b) compliance approach, (c) evidence/documentation reference, (d) implementation timeline.
+    - Quote specific tender clauses verbatim where available.
+    - Add detailed methodology descriptions, step-by-step procedures, and comprehensive explanations.
+    - Never leave any section sparse. If content seems short, elaborate further with relevant context.
+    - Include executive summaries, detailed breakdowns, cross-references, and dependency mappings.
+    - Add explanatory paragraphs before and after each table to provide context.
+    """
+
+    return [
+        {"role": "system", "content": system_instruction},
+        {"role": "user", "content": f"TENDER DOCUMENT CONTENT (extracted from uploaded PDF):\n\n{context_text}\n\n---\n\nBased on the above tender content, draft the '{section_type}' section. Remember to cite actual clause/article numbers from the text, NOT generic document references."}
+    ]
+
+def embed_queries(queries: list) -> list:
+    """
+    Embeds several queries in ONE FastEmbed call (same vectors as embed_query),
+    instead of one model invocation per query.
+    """
+    base = getattr(embeddings, "underlying", embeddings)  # unwrap CachedEmbeddings (queries aren't cached)
+    model = getattr(base, "model", None) or getattr(base, "_model", None)
+    if model is None or not hasattr(model, "query_embed"):
+        return [embeddings.embed_query(q) for q in queries]
+    return [vector.tolist() for vector in model.query_embed(queries, batch_size=base.batch_size)]
+
+def retrieve_sections_context(index_path: str, queries: list, k: int = SECTION_CONTEXT_K) -> list:
+    """
+    Blocking half of /generate-document: one index load, one batched query embedding,
+    hybrid search per query. Returns [(docs, packed context text)] in query order.
+    """
+    vectors = embed_queries(queries)
+    results = []
+    for query, vector in zip(queries, vectors):
+        docs = hybrid_retrieve(index_path, query, vector, k)
+        results.append((docs, pack_section_context(docs)))
+    return results
+
+def retrieve_section_context(index_path: str, query: str, k: int = SECTION_CONTEXT_K) -> tuple:
+    """
+    Blocking half of /generate-section: load the index, run the hybrid search and pack
+    the hits (tiktoken counting stays off the event loop). Returns (docs, context text).
+    """
+    # DEEP RESEARCH: Increased k to 15 for comprehensive context
+    # ENHANCED: Increased k to 30 for comprehensive context (18-20 page output)
+    # OPTIMIZATION: BM25 + vector fusion finds exact clause / amount matches, so 15 fused
+    # chunks replace 30 dense ones (SECTION_CONTEXT_K; 30 when HYBRID_RETRIEVAL_ENABLED=0)
+    docs = hybrid_retrieve(index_path, query, embeddings.embed_query(query), k)
+    return docs, pack_section_context(docs)
+
+async def generate_section_content(messages: list, docs: list, store: bool = True):
+    """
+    Section text for `messages`, from the response cache or Groq.
+    Returns (content, served_from_cache). Responses built on a partial index are not stored.
+    """
+    cache_key = llm_cache_key(messages, docs, 0.2, 8000)
+    cached = await run_blocking(get_cached_llm_response, cache_key)
+    if cached is not None:
+        return cached, True
+    
+    response = await async_groq_client.chat.completions.create(
+        model="llama-3.3-70b-versatile",
+        messages=messages,
+        temperature=0.2,  # Lower temperature for more precise legal output
+        max_tokens=8000   # Extended for 18-20 page tender sections
+    )
+    content = response.choices[0].message.content
+    if store:
+        await run_blocking(store_llm_response, cache_key, content)
+    return content, False
+
 @app.post("/generate-section")
 async def generate_section(
     filename: str = Form(...),
@@ -786,177 +1660,305 @@ async def generate_section(
     Enhanced with Deep Research (k=15) and Senior Legal Counsel grounding.
     Now includes company-specific context for personalized tender responses.
     """
-    index_path = get_index_path(filename)
+    index_path = await run_blocking(get_index_path, filename)
+    index_status = await run_blocking(get_index_status, index_path)
     
-    if not os.path.exists(index_path):
+    if index_status is None:
         raise HTTPException(status_code=404, detail="Tender document not found. Please upload first.")
+    if not has_index_files(index_path):
+        raise HTTPException(status_code=409, detail="Tender document is still being indexed. Please retry shortly.")
     
     try:
-        # 1. Load Index
-        vectorstore = FAISS.load_local(index_path, embeddings, allow_dangerous_deserialization=True)
-        
-        # DEEP RESEARCH: Increased k to 15 for comprehensive context
-        # ENHANCED: Increased k to 30 for comprehensive context (18-20 page output)
-        retriever = vectorstore.as_retriever(search_kwargs={"k": 30})
-        
-        # 2. Select Query based on Section
+        # 1. Select Query based on Section
         query = SECTION_PROMPTS.get(section_type, f"Summarize information relevant to {section_type}")
         
-        # 3. Retrieve Context (Long-Context approach)
+        # 2-3. Load Index (served from the in-process LRU after the first section) and
+        # retrieve context (Long-Context approach) on the blocking executor
         # NOTE: We don't use "[Document X]" labels as LLM incorrectly cites them
         # Instead, we present raw text and instruct LLM to find actual clause references
-        docs = retriever.invoke(query)
-        context_text = "\n\n---\n\n".join([d.page_content for d in docs])
-        
-        # 4. Build BIDDER PROFILE with SMART CONTEXT & PRIVACY PROTECTION
-        # DEBUG: Log received company context
-        print(f"[BACKEND DEBUG] Received company_context: '{company_context}'")
-        print(f"[BACKEND DEBUG] company_context length: {len(company_context) if company_context else 0}")
-        
-        # PRIVACY PROTECTION: Mask sensitive information (if not already hashed by frontend)
-        import re
-        masked_context = company_context
-        if company_context:
-            # Mask bank account numbers (show only last 4 digits)
-            masked_context = re.sub(
-                r'(Bank Account|Account Number):\s*(\d+)',
-                lambda m: f"{m.group(1)}: XXXX-XXXX-{m.group(2)[-4:] if len(m.group(2))>=4 else m.group(2)}",
-                masked_context
-            )
-            # Mask PAN numbers (show only last 4 characters)
-            masked_context = re.sub(
-                r'PAN Number:\s*([A-Z0-9]{5}\d{4}[A-Z])',
-                lambda m: f"PAN Number: XXXXX{m.group(1)[-4:]}",
-                masked_context
-            )
-            # Mask IFSC codes partially
-            masked_context = re.sub(
-                r'IFSC Code:\s*([A-Z]{4}0[A-Z0-9]{6})',
-                lambda m: f"IFSC Code: {m.group(1)[:4]}XXXXX",
-                masked_context
-            )
+        docs, context_text = await run_blocking(retrieve_section_context, index_path, query)
         
-        # SECTION-SPECIFIC RELEVANCE RULES - Aligned with frontend field names
-        section_relevance = {
-            "Eligibility Response": ["Company Name", "Average Annual Turnover", "FY-wise Turnover", "GST Number", "Past Projects"],
-            "Technical Proposal": ["Company Name", "Registered Address", "Past Projects"],
-            "Financial Statements": ["Company Name", "Average Annual Turnover", "FY-wise Turnover", "GST Number", "Bank Account", "IFSC Code"],
-            "Declarations & Forms": ["Company Name", "Authorized Signatory", "Signatory Designation", "GST Number", "PAN Number", "Registered Address", "Contact Email"],
-            "Annexures": ["Company Name", "Past Projects", "Registered Address"]
-        }
-        
-        relevant_fields = section_relevance.get(section_type, ["Company Name"])
-        
-        bidder_profile_section = ""
-        if masked_context and masked_context.strip():
-            bidder_profile_section = f"""
-        ### BIDDER COMPANY PROFILE (Reference Only)
-        PROFILE DATA:
-        {masked_context}
-        
-        ### SMART USAGE RULES FOR BIDDER DATA:
-        1. **MINIMALISM (CRITICAL)**: ONLY use profile data if the tender specifically asks for bidder details (e.g., "Company Name", "Financial Capacity", "Signatory").
-        2. **SECTION RELEVANCE**: For '{section_type}', typically focus ONLY on: {', '.join(relevant_fields)}. Ignore other fields.
-        3. **NO REPETITION**: NEVER repeat the company name or details in every paragraph. Mention once in formal headers or compliance tables only.
-        4. **MASKING AWARENESS**: If a detail is masked with '*' or 'X' (e.g., Bank Account: ************3456), write exactly that value or "[As per submitted documents]" in the tender body. NEVER try to guess or hallucinate the full number.
-        5. **PROFESSIONAL PLACEMENT**: Use company details primarily in the 'COMPLIANCE MATRIX' and 'SUMMARY' tables where identifying information is mandatory.
-        6. **PRIVACY**: Never include sensitive banking or tax details in descriptive technical paragraphs - keep them restricted to structured tables if required.
-        """
-        
-        # 5. Generate with LLM - SENIOR BID ARCHITECT PROMPT
-        system_instruction = f"""
-        You are a SENIOR BID ARCHITECT specializing in government tender responses, procurement law, and enterprise proposals.
-        Task: Draft the '{section_type}' section for a formal bid response document.
-        {bidder_profile_section}
-        CRITICAL CITATION RULES:
-        - Extract and cite ACTUAL clause/article/section numbers from the tender text.
-        - Use proper legal citation format: [Article X, Clause Y.Z] or [Section X.Y.Z] or [Clause X.Y]
-        - Look for patterns like "Clause 5.2", "Article III", "Section 4.1.3", "Para 6(a)" in the text.
-        - If a specific clause number is visible in the text, cite it exactly (e.g., [Clause 5.2.1]).
-        - If no clause number is found but content exists, use: [Tender Document - Page/Section Reference]
-        - NEVER use generic references like "[Document 1]" or "[Document 5]" - these are invalid.
-        
-        CRITICAL GROUNDING RULES (FACT-CHECKING):
-        - Use STRICTLY the provided context. Do not invent or assume information.
-        - If specific information is not found in the context, use placeholder: [DATA NOT FOUND]
-        - If amounts or dates are missing, use: [TO BE VERIFIED FROM TENDER DOCUMENT]
-        - NEVER hallucinate requirements, clauses, or specifications.
-        
-        MANDATORY OUTPUT STRUCTURE:
-        
-        1. **COMPLIANCE MATRIX** (Start every section with this):
-           | Clause | Requirement | Compliance Status | Source Reference |
-           |--------|-------------|-------------------|------------------|
-           Note: "Source Reference" column must contain actual tender clause numbers like [Clause 5.2.1]
-        
-        2. **HIERARCHICAL NUMBERING** throughout:
-           - Use 1.0, 1.1, 1.1.1, 1.1.2, 1.2, 2.0, etc.
-           - Main sections: ### 1.0 Section Title
-           - Subsections: #### 1.1 Subsection Title
-           - Sub-subsections: ##### 1.1.1 Detail
-        
-        3. **RISK ASSESSMENT TABLE** (Include in every section):
-           | Potential Risk | Impact Level | Mitigation Strategy | Owner |
-           |----------------|--------------|---------------------|-------|
-        
-        4. **IMPLEMENTATION TIMELINE** (When applicable):
-           | Phase | Activity | Start Date | End Date | Deliverable | Status |
-           |-------|----------|------------|----------|-------------|--------|
-        
-        5. **SUMMARY TABLE OF KEY DELIVERABLES** (End every section with this):
-           | S.No | Deliverable | Specification | Deadline | Responsibility |
-           |------|-------------|---------------|----------|----------------|
-        
-        FORMATTING REQUIREMENTS:
-        - Output strictly in Markdown format
-        - Use H3 (###) for main sections (1.0), H4 (####) for subsections (1.1)
-        - Use Markdown Tables (|---|---|) for ALL structured data
-        - Use **bold** for requirement headers, amounts, percentages, deadlines
-        - Every fact must have a proper citation like [Clause 4.2] or [Section III.5]
-        
-        TONE: {tone} / Legal / Government-Standard
-        - Write in formal, precise legal language
-        - Avoid contractions and colloquialisms
-        - Be unambiguous and defensible
-        
-        COMPLIANCE MODE: {'STRICT - Every requirement must have explicit compliance statement' if compliance_mode else 'FLEXIBLE - General compliance overview'}
-        
-        CRITICAL LENGTH REQUIREMENTS (MANDATORY):
-        - Generate EXTREMELY DETAILED and COMPREHENSIVE content.
-        - Target output: 5000-8000 words per section (approximately 3-4 pages per section).
-        - The complete tender document across all 5 sections should total 18-20 pages.
-        - DO NOT summarize or be brief. EXPAND on every point with full explanations.
-        - Include detailed sub-clauses, explanatory notes, and implementation details.
-        - For each requirement, provide: (a) requirement statement, (b) compliance approach, (c) evidence/documentation reference, (d) implementation timeline.
-        - Quote specific tender clauses verbatim where available.
-        - Add detailed methodology descriptions, step-by-step procedures, and comprehensive explanations.
-        - Never leave any section sparse. If content seems short, elaborate further with relevant context.
-        - Include executive summaries, detailed breakdowns, cross-references, and dependency mappings.
-        - Add explanatory paragraphs before and after each table to provide context.
-        """
-        
-        response = groq_client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
-                {"role": "system", "content": system_instruction},
-                {"role": "user", "content": f"TENDER DOCUMENT CONTENT (extracted from uploaded PDF):\n\n{context_text}\n\n---\n\nBased on the above tender content, draft the '{section_type}' section. Remember to cite actual clause/article numbers from the text, NOT generic document references."}
-            ],
-            temperature=0.2,  # Lower temperature for more precise legal output
-            max_tokens=8000   # Extended for 18-20 page tender sections
-        )
+        # 4. Build bidder profile + SENIOR BID ARCHITECT prompt, then generate with LLM
+        messages = build_section_messages(section_type, context_text, tone, compliance_mode, company_context)
+        content, response_cached = await generate_section_content(messages, docs, store=index_status == "complete")
         
         return {
             "status": "success",
             "section": section_type,
-            "content": response.choices[0].message.content,
-            "chunks_used": len(docs)
+            "content": content,
+            "chunks_used": len(docs),
+            "response_cached": response_cached,
+            # True while the upload is still indexing: only the pages embedded so far were searched
+            "partial": index_status != "complete"
         }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/generate-section/stream")
+async def generate_section_stream(
+    filename: str = Form(...),
+    section_type: str = Form(...),
+    tone: str = Form("Formal"),
+    compliance_mode: bool = Form(True),
+    company_context: str = Form("")
+):
+    """
+    Server-sent-events variant of /generate-section: forwards Groq tokens as they
+    are generated instead of returning after the full (up to 8000 token) section.
+    Events: meta {section, chunks_used, partial} -> delta {text}* -> done {processing_time}.
+    """
+    import time
+    start_time = time.time()
+    index_path = await run_blocking(get_index_path, filename)
+    index_status = await run_blocking(get_index_status, index_path)
+    
+    if index_status is None:
+        raise HTTPException(status_code=404, detail="Tender document not found. Please upload first.")
+    if not has_index_files(index_path):
+        raise HTTPException(status_code=409, detail="Tender document is still being indexed. Please retry shortly.")
+    
+    query = SECTION_PROMPTS.get(section_type, f"Summarize information relevant to {section_type}")
+    try:
+        docs, context_text = await run_blocking(retrieve_section_context, index_path, query)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    messages = build_section_messages(section_type, context_text, tone, compliance_mode, company_context)
+    cache_key = llm_cache_key(messages, docs, 0.2, 8000)
+    cached_content = await run_blocking(get_cached_llm_response, cache_key)
+    
+    async def _events():
+        yield sse_event("meta", {"section": section_type, "chunks_used": len(docs),
+                                 "partial": index_status != "complete",
+                                 "response_cached": cached_content is not None})
+        try:
+            if cached_content is not None:
+                yield sse_event("delta", {"text": cached_content})
+            else:
+                parts = []
+                async for delta in stream_groq_deltas(messages, temperature=0.2, max_tokens=8000):
+                    parts.append(delta)
+                    yield sse_event("delta", {"text": delta})
+                if index_status == "complete":
+                    await run_blocking(store_llm_response, cache_key, "".join(parts))
+        except Exception as e:
+            print(f"[GENERATE-SECTION STREAM] Error: {e}")
+            yield sse_event("error", {"message": str(e)})
+            return
+        yield sse_event("done", {"processing_time": f"{time.time() - start_time:.2f}s"})
+    
+    return StreamingResponse(_events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+# Max Groq section calls in flight per /generate-document request
+GENERATE_DOCUMENT_CONCURRENCY = int(os.getenv("GENERATE_DOCUMENT_CONCURRENCY", "5"))
+
+@app.post("/generate-document")
+async def generate_document(
+    filename: str = Form(...),
+    sections: str = Form(""),  # comma-separated section names; empty = all SECTION_PROMPTS
+    tone: str = Form("Formal"),
+    compliance_mode: bool = Form(True),
+    company_context: str = Form(""),
+    concurrency: int = Form(GENERATE_DOCUMENT_CONCURRENCY),
+    stream: bool = Form(False)
+):
+    """
+    Generates several bid sections in one request.
+    
+    OPTIMIZATION vs. one /generate-section call per section:
+    - Index is loaded once and all section queries are embedded in a single batch
+    - Groq calls run concurrently (at most `concurrency` at a time), so total latency
+      is roughly the slowest section instead of the sum of all of them
+    
+    stream=False: returns all sections (in requested order) once every one is done.
+    stream=True: NDJSON response, one section object per line as each one completes.
+    """
+    import time
+    start_time = time.time()
+    
+    section_types = [s.strip() for s in sections.split(",") if s.strip()] or list(SECTION_PROMPTS.keys())
+    index_path = await run_blocking(get_index_path, filename)
+    index_status = await run_blocking(get_index_status, index_path)
+    
+    if index_status is None:
+        raise HTTPException(status_code=404, detail="Tender document not found. Please upload first.")
+    if not has_index_files(index_path):
+        raise HTTPException(status_code=409, detail="Tender document is still being indexed. Please retry shortly.")
+    
+    # 1-3. Shared retrieval: one index load + one batched embedding for every section query
+    queries = [SECTION_PROMPTS.get(st, f"Summarize information relevant to {st}") for st in section_types]
+    try:
+        contexts = await run_blocking(retrieve_sections_context, index_path, queries)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    print(f"[GENERATE-DOCUMENT] Retrieved context for {len(section_types)} sections in {time.time() - start_time:.2f}s")
+    
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    partial = index_status != "complete"
+    
+    async def _generate(section_type: str, docs: list, context_text: str) -> dict:
+        async with semaphore:
+            section_start = time.time()
+            try:
+                messages = build_section_messages(section_type, context_text, tone, compliance_mode, company_context)
+                content, response_cached = await generate_section_content(messages, docs, store=not partial)
+                print(f"[GENERATE-DOCUMENT] '{section_type}' done in {time.time() - section_start:.2f}s")
+                return {
+                    "status": "success",
+                    "section": section_type,
+                    "content": content,
+                    "chunks_used": len(docs),
+                    "response_cached": response_cached,
+                    "generation_time": f"{time.time() - section_start:.2f}s",
+                    "partial": partial
+                }
+            except Exception as e:
+                print(f"[GENERATE-DOCUMENT] '{section_type}' failed: {e}")
+                return {"status": "error", "section": section_type, "message": str(e)}
+    
+    # 4. Fan the LLM calls out concurrently
+    tasks = [asyncio.create_task(_generate(st, docs, context_text))
+             for st, (docs, context_text) in zip(section_types, contexts)]
+    
+    if stream:
+        async def _ndjson_sections():
+            for next_done in asyncio.as_completed(tasks):
+                yield json.dumps(await next_done) + "\n"
+        return StreamingResponse(_ndjson_sections(), media_type="application/x-ndjson")
+    
+    results = await asyncio.gather(*tasks)
+    total_time = time.time() - start_time
+    print(f"[GENERATE-DOCUMENT COMPLETE] {len(results)} sections in {total_time:.2f}s")
+    return {
+        "status": "success" if all(r["status"] == "success" for r in results) else "partial_failure",
+        "sections": results,
+        "processing_time": f"{total_time:.2f}s",
+        "partial": partial
+    }
+
 # --- API ENDPOINTS ---
 
+def index_tender_for_analysis(temp_path: str, filename: str, file_hash: str,
+                              parsing_mode: str, progress=None) -> dict:
+    """
+    Index (or reuse the cached index of) a saved PDF with the analysis chunk size.
+    Always removes `temp_path`. Returns {"index_key": str, "index_path": str, "cached": bool}.
+    """
+    import time
+    start_time = time.time()
+    progress = progress or _no_progress
+
+    try:
+        # 1. Check for cached index first (content-addressed: hash of bytes + config)
+        index_key = get_content_index_key(file_hash, parsing_mode, ANALYZE_CHUNK_SIZE, ANALYZE_CHUNK_OVERLAP)
+        index_path = get_content_index_path(index_key)
+        # A concurrent build of the same index (another job / request) is waited for, then reused
+        claimed = get_index_status(index_path) != "complete" and claim_index_build(index_path, wait=True)
+        was_cached = not claimed and get_index_status(index_path) == "complete"
+
+        if was_cached:
+            print(f"[ANALYZE-TENDER] Using cached index for {filename} ({index_key})")
+            vectorstore = load_vectorstore(index_path)
+        else:
+            if not claimed:
+                raise ValueError("This document is already being indexed. Please retry shortly.")
+            try:
+                # 2. Parse -> split -> embed as a streaming pipeline (same as /upload-tender)
+                # OPTIMIZATION: Chunk size 2000 (~400-500 tokens) is the sweet spot for speed/quality
+                text_splitter = make_text_splitter(ANALYZE_CHUNK_SIZE, ANALYZE_CHUNK_OVERLAP)
+                progress("parsing")
+                if parsing_mode == "High-Quality":
+                    print(f"[ANALYZE-TENDER HIGH-QUALITY] Parsing {filename}...")
+                    page_iter = iter(parse_pdf_hybrid_quality(temp_path))
+                else:
+                    print(f"[ANALYZE-TENDER FAST] Streaming {filename} with PyMuPDF...")
+                    page_iter = iter_pdf_pages_fast_quality(temp_path)
+
+                vectorstore, stats = build_index_streaming(page_iter, text_splitter, "ANALYZE-TENDER",
+                                                           checkpoint_path=index_path, progress=progress)
+                if vectorstore is None:
+                    raise ValueError("No text could be extracted from the PDF. The document may be image-only or corrupted.")
+                print(f"[ANALYZE-TENDER] Indexed {stats['chunks']} chunks from {stats['pages']} pages in {time.time() - start_time:.2f}s")
+            finally:
+                release_index_build(index_path)
+
+            # 3. Cache the index for future use (already persisted by the checkpointed build)
+            cache_vectorstore(index_path, vectorstore)
+            print(f"[ANALYZE-TENDER] Index cached at {index_path}")
+
+        # Also for cached indexes: the archive records every filename the bytes were uploaded under
+        publish_to_global_index(index_key, index_path, filename, file_hash, parsing_mode)
+        record_index_in_manifest(filename, index_key, file_hash, parsing_mode,
+                                 ANALYZE_CHUNK_SIZE, ANALYZE_CHUNK_OVERLAP)
+        return {"index_key": index_key, "index_path": index_path, "cached": was_cached}
+    finally:
+        # Cleanup temp file
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def retrieve_analysis_context(index_path: str, query: str, depth: str) -> list:
+    """Hybrid retrieval + rerank of the top chunks for a summary. Blocking."""
+    # 4. Retrieve context (same strategy as /generate-section)
+    k_value = 15 if depth == "Deep Dive" else 10
+    candidates = hybrid_retrieve(index_path, query, embeddings.embed_query(query), k_value)
+    
+    # 5. Optional reranking (shared, pre-warmed reranker pool)
+    try:
+        return rerank_documents(query, candidates, top_n=5)
+    except Exception as e:
+        print(f"[ANALYZE-TENDER] Rerank failed, using standard retrieval: {e}")
+        return candidates[:5]
+
+
+def prepare_tender_analysis(temp_path: str, filename: str, file_hash: str, query: str,
+                            depth: str, parsing_mode: str, progress=None) -> dict:
+    """
+    Index (or reuse the cached index of) a saved PDF, then retrieve + rerank.
+    This is the blocking (CPU / disk) half of an analysis; the Groq summary is
+    generated separately so async callers can await it. Always removes `temp_path`.
+    Returns {"docs": reranked chunks, "cached": bool, "index_key": str}.
+    """
+    progress = progress or _no_progress
+    indexed = index_tender_for_analysis(temp_path, filename, file_hash, parsing_mode, progress)
+    progress("generating")
+    docs = retrieve_analysis_context(indexed["index_path"], query, depth)
+    return {"docs": docs, "cached": indexed["cached"], "index_key": indexed["index_key"]}
+
+
+def prepare_indexed_analysis(index_key: str, query: str, depth: str, progress=None) -> dict:
+    """prepare_tender_analysis for an index that is already built (no upload, no parsing)."""
+    (progress or _no_progress)("generating")
+    docs = retrieve_analysis_context(get_content_index_path(index_key), query, depth)
+    return {"docs": docs, "cached": True, "index_key": index_key}
+
+
+def analyze_tender_file(temp_path: str, filename: str, file_hash: str, query: str, output_format: str,
+                        depth: str, parsing_mode: str, progress=None) -> dict:
+    """
+    Full synchronous analysis (index + retrieve + summarize), used by the background
+    analysis job. /analyze-tender runs the same steps without blocking the event loop.
+    Always removes `temp_path`.
+    """
+    import time
+    start_time = time.time()
+    prepared = prepare_tender_analysis(temp_path, filename, file_hash, query, depth, parsing_mode, progress)
+    
+    # 6. Generate summary with Groq
+    result = generate_summary_with_groq(query, prepared["docs"], output_format,
+                                        cache_scope=summary_cache_scope(prepared["index_key"], output_format, depth))
+    
+    total_time = time.time() - start_time
+    print(f"[ANALYZE-TENDER COMPLETE] Total time: {total_time:.2f}s")
+    
+    return {
+        "status": "success",
+        "summary": result,
+        "processing_time": f"{total_time:.2f}s",
+        "cached": prepared["cached"]
+    }
+
+
 @app.post("/analyze-tender")
 async def analyze_tender(
     file: UploadFile = File(...),
@@ -967,6 +1969,7 @@ async def analyze_tender(
 ):
     """
     OPTIMIZED: Uses the same fast parsing + caching strategy as /upload-tender.
+    For large files prefer POST /jobs/analyze-tender, which returns a job id immediately.
     
     parsing_mode:
     - "Fast": PyMuPDF local parsing (15-21x faster)
@@ -974,101 +1977,17 @@ async def analyze_tender(
     """
     import time
     start_time = time.time()
-    
     try:
-        # 1. Check for cached index first
-        index_path = get_index_path(file.filename)
-        temp_path = None
+        # Parsing, embedding and retrieval run on the blocking executor; the LLM call is awaited
+        temp_path = _new_temp_path("temp_analyze", file.filename)
+        file_hash = await run_blocking(save_upload_with_hash, file.file, temp_path)
+        prepared = await run_blocking(prepare_tender_analysis, temp_path, file.filename, file_hash,
+                                      query, depth, parsing_mode)
         
-        if os.path.exists(index_path):
-            print(f"[ANALYZE-TENDER] Using cached index for {file.filename}")
-            vectorstore = FAISS.load_local(index_path, embeddings, allow_dangerous_deserialization=True)
-        else:
-            # 2. Save file temporarily for parsing
-            temp_path = f"temp_analyze_{file.filename}"
-            content = await file.read()
-            with open(temp_path, "wb") as buffer:
-                buffer.write(content)
-            
-            # 3. Parse based on mode (same as /upload-tender)
-            if parsing_mode == "High-Quality":
-                print(f"[ANALYZE-TENDER HIGH-QUALITY] Parsing {file.filename}...")
-                docs = parse_pdf_hybrid_quality(temp_path)
-            else:
-                print(f"[ANALYZE-TENDER FAST] Parsing {file.filename} with PyMuPDF...")
-                docs = parse_pdf_fast_quality(temp_path)
-            
-            parse_time = time.time() - start_time
-            print(f"[ANALYZE-TENDER] Parsing complete in {parse_time:.2f}s ({len(docs)} pages)")
-            
-            # OPTIMIZATION: Chunk size 2000 (~400-500 tokens) is the sweet spot for speed/quality
-            # Parallelize splitting to utilize multi-core CPU
-            chunk_size = 2000
-            text_splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=200)
-            
-            # Helper for parallel splitting
-            def split_doc_batch(batch_docs):
-                splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=200)
-                return splitter.split_documents(batch_docs)
-            
-            # Split docs into batches for workers
-            import itertools
-            split_workers = min(4, os.cpu_count() or 4)
-            # Create sub-lists of documents
-            doc_batches = [docs[i::split_workers] for i in range(split_workers)]
-            doc_batches = [b for b in doc_batches if b] # Remove empty
-            
-            print(f"[ANALYZE-TENDER] Splitting {len(docs)} pages using {len(doc_batches)} threads...")
-            split_docs = []
-            
-            with ThreadPoolExecutor(max_workers=split_workers) as executor:
-                results = executor.map(split_doc_batch, doc_batches)
-                for res in results:
-                    split_docs.extend(res)
-                    
-            print(f"[ANALYZE-TENDER] Split into {len(split_docs)} chunks")
-            
-            # 5. Create VectorStore (Batched)
-            # Increased batch size to 100 for faster parallel embedding
-            batch_size = 100 
-            vectorstore = FAISS.from_documents(split_docs[:batch_size], embeddings)
-            if len(split_docs) > batch_size:
-                for i in range(batch_size, len(split_docs), batch_size):
-                    batch = split_docs[i:i + batch_size]
-                    # OPTIMIZATION: Use add_documents instead of add_documents loop
-                    vectorstore.add_documents(batch)
-                    print(f"  - Processed batch {i//batch_size} of {len(split_docs)//batch_size}")
-                    
-                    if i % (batch_size * 2) == 0:
-                        gc.collect()
-            gc.collect() # Ensure memory is cleared after large operations
-            
-            # 6. Cache the index for future use
-            vectorstore.save_local(index_path)
-            print(f"[ANALYZE-TENDER] Index cached at {index_path}")
-        
-        # 7. Retrieve context (same strategy as /generate-section)
-        k_value = 15 if depth == "Deep Dive" else 10
-        retriever = vectorstore.as_retriever(search_kwargs={"k": k_value})
-        
-        # 8. Optional reranking
-        try:
-            compressor = FlashrankRerank(model="ms-marco-MultiBERT-L-12")
-            compression_retriever = ContextualCompressionRetriever(
-                base_compressor=compressor,
-                base_retriever=retriever
-            )
-            compressed_docs = compression_retriever.invoke(query)[:5]
-        except Exception as e:
-            print(f"[ANALYZE-TENDER] Rerank failed, using standard retrieval: {e}")
-            compressed_docs = retriever.invoke(query)[:5]
-        
-        # 9. Generate summary with Groq
-        result = generate_summary_with_groq(query, compressed_docs, output_format)
-        
-        # Cleanup temp file
-        if temp_path and os.path.exists(temp_path):
-            os.remove(temp_path)
+        # 6. Generate summary with Groq
+        result = await generate_summary_with_groq_async(
+            query, prepared["docs"], output_format,
+            cache_scope=summary_cache_scope(prepared["index_key"], output_format, depth))
         
         total_time = time.time() - start_time
         print(f"[ANALYZE-TENDER COMPLETE] Total time: {total_time:.2f}s")
@@ -1077,9 +1996,8 @@ async def analyze_tender(
             "status": "success",
             "summary": result,
             "processing_time": f"{total_time:.2f}s",
-            "cached": os.path.exists(index_path)
+            "cached": prepared["cached"]
         }
-        
     except Exception as e:
         print(f"[ANALYZE-TENDER ERROR] {str(e)}")
         import traceback
@@ -1089,6 +2007,245 @@ async def analyze_tender(
             "message": str(e)
         }
 
+
+@app.post("/analyze-tender/stream")
+async def analyze_tender_stream(
+    file: Optional[UploadFile] = File(None),
+    query: str = Form("Provide a comprehensive summary of this tender document"),
+    output_format: str = Form("Executive Bullets"),
+    depth: str = Form("Standard"),
+    parsing_mode: str = Form("Fast"),
+    index_key: Optional[str] = Form(None)
+):
+    """
+    Server-sent-events variant of /analyze-tender.
+    Events: progress {stage, pages_parsed, chunks_embedded, ...}* while indexing ->
+    meta {cached, chunks_used} -> delta {text}* -> done {processing_time, cached}.
+    
+    Pass `index_key` instead of `file` to summarize an index that is already built,
+    e.g. by POST /jobs/analyze-tender with summarize=false: the request then only
+    covers retrieval and the LLM, not the minutes of parsing and embedding.
+    """
+    import time
+    start_time = time.time()
+    if index_key is not None:
+        # index keys are hex digests - refuse anything that could escape INDEX_DIR
+        if not index_key.isalnum():
+            raise HTTPException(status_code=400, detail="Invalid index_key")
+        if await run_blocking(get_index_status, get_content_index_path(index_key)) != "complete":
+            raise HTTPException(status_code=409, detail="Index is not built yet. Wait for its job to complete.")
+        prepare_call = (prepare_indexed_analysis, index_key, query, depth)
+    elif file is not None:
+        # Save before returning: the upload is closed once the response starts streaming
+        temp_path = _new_temp_path("temp_analyze", file.filename)
+        file_hash = await run_blocking(save_upload_with_hash, file.file, temp_path)
+        prepare_call = (prepare_tender_analysis, temp_path, file.filename, file_hash, query, depth, parsing_mode)
+    else:
+        raise HTTPException(status_code=422, detail="Either file or index_key is required")
+    
+    async def _events():
+        loop = asyncio.get_running_loop()
+        updates = asyncio.Queue()
+        
+        def progress(stage=None, **counters):
+            # Called from the executor thread - hand the update to the event loop
+            loop.call_soon_threadsafe(updates.put_nowait, {"stage": stage, **counters})
+        
+        prepare = asyncio.ensure_future(run_blocking(*prepare_call, progress))
+        try:
+            while not prepare.done():
+                get_update = asyncio.ensure_future(updates.get())
+                await asyncio.wait({prepare, get_update}, return_when=asyncio.FIRST_COMPLETED)
+                if get_update.done():
+                    yield sse_event("progress", get_update.result())
+                else:
+                    get_update.cancel()
+            prepared = prepare.result()
+            
+            messages = await run_blocking(_summary_messages, query, prepared["docs"], output_format)
+            cache_key = llm_cache_key(messages, prepared["docs"], 0.3, 4500)
+            cache_scope = summary_cache_scope(prepared["index_key"], output_format, depth)
+            cached_summary = await run_blocking(get_cached_llm_response, cache_key, query, cache_scope)
+            yield sse_event("meta", {"cached": prepared["cached"], "chunks_used": len(prepared["docs"]),
+                                     "response_cached": cached_summary is not None})
+            if cached_summary is not None:
+                yield sse_event("delta", {"text": cached_summary})
+            else:
+                parts = []
+                async for delta in stream_groq_deltas(messages, temperature=0.3, max_tokens=4500):
+                    parts.append(delta)
+                    yield sse_event("delta", {"text": delta})
+                await run_blocking(store_llm_response, cache_key, "".join(parts), query, cache_scope)
+        except Exception as e:
+            print(f"[ANALYZE-TENDER STREAM ERROR] {str(e)}")
+            yield sse_event("error", {"message": str(e)})
+            return
+        
+        total_time = time.time() - start_time
+        print(f"[ANALYZE-TENDER STREAM COMPLETE] Total time: {total_time:.2f}s")
+        yield sse_event("done", {"processing_time": f"{total_time:.2f}s", "cached": prepared["cached"]})
+    
+    return StreamingResponse(_events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+# --- BACKGROUND JOBS ---
+# Parsing, embedding and LLM work run in a local process pool (backend/jobs.py);
+# submit endpoints return a job id straight away and /jobs/{id} reports progress.
+
+def run_ingest_job(payload: dict, progress) -> dict:
+    """Job handler (runs in a worker process) for POST /jobs/upload-tender."""
+    progress("starting", total_pages=_safe_count_pages(payload["temp_path"]))
+    return ingest_tender_file(payload["temp_path"], payload["filename"], payload["file_hash"],
+                              payload["parsing_mode"], progress=progress)
+
+
+def run_analyze_job(payload: dict, progress) -> dict:
+    """Job handler (runs in a worker process) for POST /jobs/analyze-tender."""
+    progress("starting", total_pages=_safe_count_pages(payload["temp_path"]))
+    if not payload.get("summarize", True):
+        indexed = index_tender_for_analysis(payload["temp_path"], payload["filename"], payload["file_hash"],
+                                            payload["parsing_mode"], progress=progress)
+        return {"status": "success", "index_key": indexed["index_key"], "cached": indexed["cached"]}
+    return analyze_tender_file(payload["temp_path"], payload["filename"], payload["file_hash"],
+                               payload["query"], payload["output_format"], payload["depth"],
+                               payload["parsing_mode"], progress=progress)
+
+
+def _safe_count_pages(file_path: str):
+    try:
+        return count_pages(file_path)
+    except Exception:
+        return None
+
+
+@app.post("/jobs/upload-tender")
+async def submit_upload_job(
+    file: UploadFile = File(...),
+    parsing_mode: str = Form("Fast")
+):
+    """Queues ingestion of a PDF. Returns {"job_id"} immediately; poll GET /jobs/{job_id}."""
+    temp_path = _new_temp_path("temp_job", file.filename)
+    file_hash = await run_blocking(save_upload_with_hash, file.file, temp_path)
+    index_key = get_content_index_key(file_hash, parsing_mode, UPLOAD_CHUNK_SIZE, UPLOAD_CHUNK_OVERLAP)
+    job_id = submit_job(
+        "backend.rag_api:run_ingest_job",
+        {"temp_path": temp_path, "filename": file.filename, "file_hash": file_hash, "parsing_mode": parsing_mode},
+        kind="upload-tender",
+        dedupe_key=f"ingest:{index_key}",
+        cleanup_path=temp_path,
+    )
+    return {"status": "queued", "job_id": job_id, "filename": file.filename, "index_key": index_key}
+
+
+@app.post("/jobs/analyze-tender")
+async def submit_analyze_job(
+    file: UploadFile = File(...),
+    query: str = Form("Provide a comprehensive summary of this tender document"),
+    output_format: str = Form("Executive Bullets"),
+    depth: str = Form("Standard"),
+    parsing_mode: str = Form("Fast"),
+    summarize: bool = Form(True)
+):
+    """
+    Queues a full /analyze-tender run. Returns {"job_id"} immediately; poll GET /jobs/{job_id}.
+    summarize=false stops after indexing; the job result carries the index_key to pass
+    to POST /analyze-tender/stream, which then streams the summary.
+    """
+    temp_path = _new_temp_path("temp_job", file.filename)
+    file_hash = await run_blocking(save_upload_with_hash, file.file, temp_path)
+    index_key = get_content_index_key(file_hash, parsing_mode, ANALYZE_CHUNK_SIZE, ANALYZE_CHUNK_OVERLAP)
+    job_id = submit_job(
+        "backend.rag_api:run_analyze_job",
+        {"temp_path": temp_path, "filename": file.filename, "file_hash": file_hash, "query": query,
+         "output_format": output_format, "depth": depth, "parsing_mode": parsing_mode, "summarize": summarize},
+        kind="analyze-tender",
+        # same index (+ same question when summarizing) -> same job; others wait for the index build lock
+        dedupe_key=f"ingest:{index_key}:{fingerprint(query, output_format, depth)}" if summarize else f"ingest:{index_key}",
+        cleanup_path=temp_path,
+    )
+    return {"status": "queued", "job_id": job_id, "filename": file.filename}
+
+
+@app.get("/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    """Stage, pages parsed, chunks embedded, ETA and (when done) the result of a job."""
+    job = await run_blocking(read_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/cache/stats")
+async def get_cache_stats():
+    """Entry count, size and hit rate of the LLM response cache and the embedding cache."""
+    stats = {"llm_responses": await run_blocking(llm_response_cache.stats)}
+    if isinstance(embeddings, CachedEmbeddings):
+        stats["embeddings"] = await run_blocking(embeddings.stats)
+    return stats
+
+def _csv_list(value: str) -> list:
+    return [v.strip() for v in (value or "").split(",") if v.strip()]
+
+
+def search_archive_sync(query: str, k: int, filenames: list, page_min, page_max, parser) -> list:
+    vector = embeddings.embed_query(query)
+    hits = get_global_index().search(vector, k=k, filenames=filenames or None,
+                                     page_min=page_min, page_max=page_max, parser=parser or None)
+    return [{
+        "filename": doc.metadata.get("filename"),
+        "page": doc.metadata.get("page"),
+        "parser": doc.metadata.get("parser"),
+        "distance": distance,
+        "content": doc.page_content,
+    } for doc, distance in hits]
+
+
+@app.post("/search-archive")
+async def search_archive(
+    query: str = Form(...),
+    k: int = Form(10),
+    filenames: str = Form(""),  # comma-separated; empty = whole archive
+    page_min: Optional[int] = Form(None),
+    page_max: Optional[int] = Form(None),
+    parser: str = Form("")
+):
+    """
+    Semantic search across every ingested tender (the archive index).
+    Filter by filename(s), page range and parser; a single filename reproduces
+    the per-tender search as a filtered query.
+    """
+    if not GLOBAL_INDEX_ENABLED:
+        raise HTTPException(status_code=404, detail="Archive index is disabled (GLOBAL_INDEX_ENABLED=0)")
+    try:
+        hits = await run_blocking(search_archive_sync, query, k, _csv_list(filenames), page_min, page_max, parser)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"status": "success", "query": query, "results": hits}
+
+
+def backfill_global_index() -> dict:
+    """Adds every completed index in the manifest that the archive index doesn't have yet."""
+    added, failed = 0, []
+    for filename, entry in load_index_manifest()["files"].items():
+        index_path = get_content_index_path(entry["index_key"])
+        if get_index_status(index_path) != "complete":
+            continue
+        try:
+            if not has_store_files(index_path):
+                load_index(index_path, embeddings)  # converts a legacy pickle index first
+            added += get_global_index().add_document(entry["index_key"], index_path, filename, entry["file_hash"],
+                                                     entry.get("parsing_mode"), embed_fn=embeddings.embed_documents)
+        except Exception as e:
+            failed.append({"filename": filename, "error": str(e)})
+    return {"chunks_added": added, "failed": failed, **get_global_index().stats()}
+
+
+@app.post("/global-index/backfill")
+async def backfill_global_index_endpoint():
+    """Adds tenders indexed before the archive index existed."""
+    if not GLOBAL_INDEX_ENABLED:
+        raise HTTPException(status_code=404, detail="Archive index is disabled (GLOBAL_INDEX_ENABLED=0)")
+    return await run_blocking(backfill_global_index)
+
 # --- AI MODEL SERVING ---
 model = None
 feature_columns = None
@@ -1116,6 +2273,10 @@ class PredictRequest(BaseModel):
 
 @app.post("/predict-win")
 async def predict_win(data: PredictRequest):
+    # Model loading and XGBoost inference are blocking - keep them off the event loop
+    return await run_blocking(predict_win_sync, data)
+
+def predict_win_sync(data: PredictRequest) -> dict:
     global model, feature_columns
     
     if not model:
@@ -1162,11 +2323,11 @@ async def predict_win(data: PredictRequest):
 async def retrain_model_endpoint():
     """Trigger the XGBoost model retraining process using latest Supabase data"""
     try:
-        # Run training synchronously (can be background task for scalability)
-        success = train_model()
+        # Training is blocking - run it on the executor so other requests keep being served
+        success = await run_blocking(train_model)
         if success:
             # RELOAD MODEL IN MEMORY
-            load_ai_model()
+            await run_blocking(load_ai_model)
             return {"status": "success", "message": "Model retrained and reloaded successfully"}
         else:
             raise HTTPException(status_code=500, detail="Training returned False")
@@ -1178,78 +2339,8 @@ async def retrain_model_endpoint():
 # ══════════════════════════════════════════════════════════════════
 # PAST PROPOSAL ANALYZER  –  Multi-tender analysis endpoint
 # ══════════════════════════════════════════════════════════════════
-import re as _re
 from typing import List as _List
 
-def _extract_budget_from_text(text: str) -> float:
-    """
-    Extract estimated budget (in absolute Rs.) from tender text.
-    Handles: ₹ symbol, Rs./INR prefix, Lakh/Crore multipliers.
-    Returns 0.0 if nothing found.
-    """
-    # ── 1. Patterns that capture value AND optional unit (lakh/crore) ──────────────
-    # Each pattern must have group(1) = numeric string, optional group(2) = unit
-    labeled_patterns = [
-        # ₹ symbol directly after label
-        r"(?:Estimated\s+(?:Cost|Amount|Value)|Tender\s+(?:Value|Amount)|Approximate\s+(?:Cost|Value)|Total\s+(?:Estimated|Amount))[^\n]{0,80}₹\s*([\d,\.]+)\s*(Lakh|Lakhs|Lac|Lacs|L|Crore|Crores|Cr|CR|C)?",
-        # Rs./INR after label
-        r"(?:Estimated\s+(?:Cost|Amount|Value)|Tender\s+(?:Value|Amount)|Approximate\s+(?:Cost|Value)|Total\s+(?:Estimated|Amount))[^\n]{0,80}(?:Rs\.?|INR)\s*([\d,\.]+)\s*(Lakh|Lakhs|Lac|Lacs|L|Crore|Crores|Cr|CR|C)?",
-        # Value in parentheses with unit label
-        r"(?:Rs\.?|INR|₹)\s*([\d,\.]+)\s*(Lakh|Lakhs|Lac|Lacs|Crore|Crores|Cr)\b",
-        # Plain ₹ amount with unit nearby
-        r"₹\s*([\d,\.]+)\s*(Lakh|Lakhs|Lac|Lacs|L|Crore|Crores|Cr|CR)?",
-        # Number followed by Crore/Lakh (written as words) near cost keywords
-        r"(?:cost|value|amount|budget)[^\n]{0,60}([\d,\.]+)\s*(Lakh|Lakhs|Lac|Lacs|Crore|Crores)",
-        # Fallback: any Rs./INR amount >= 4 digits
-        r"(?:Rs\.?|INR)\s*([\d,\.]{5,})",
-    ]
-
-    for pat in labeled_patterns:
-        m = _re.search(pat, text, _re.IGNORECASE)
-        if m:
-            try:
-                val_str = m.group(1).replace(",", "")
-                val = float(val_str)
-                if val == 0:
-                    continue
-                # Apply multiplier
-                unit = (m.group(2) or "").strip().lower() if m.lastindex and m.lastindex >= 2 else ""
-                if unit in ("lakh", "lakhs", "lac", "lacs", "l"):
-                    val *= 100_000
-                elif unit in ("crore", "crores", "cr", "c"):
-                    val *= 10_000_000
-                if val > 1_000:  # sanity: must be at least ₹1000
-                    return val
-            except (ValueError, IndexError, AttributeError):
-                continue
-    return 0.0
-
-
-def _extract_emd_from_text(text: str) -> float:
-    """Extract EMD/Earnest Money amount from tender text."""
-    patterns = [
-        r"(?:EMD|Earnest\s+Money(?:\s+Deposit)?)[^\n₹]{0,80}₹\s*([\d,\.]+)\s*(Lakh|Lakhs|Lac|Crore|Crores|Cr)?",
-        r"(?:EMD|Earnest\s+Money(?:\s+Deposit)?)[^\n]{0,80}(?:Rs\.?|INR)\s*([\d,\.]+)\s*(Lakh|Lakhs|Lac|Crore|Crores|Cr)?",
-        r"(?:Rs\.?|INR|₹)\s*([\d,\.]+)[^\n]{0,40}(?:EMD|Earnest\s+Money)",
-    ]
-    for pat in patterns:
-        m = _re.search(pat, text, _re.IGNORECASE)
-        if m:
-            try:
-                val = float(m.group(1).replace(",", ""))
-                if val == 0:
-                    continue
-                unit = (m.group(2) or "").strip().lower() if m.lastindex and m.lastindex >= 2 else ""
-                if unit in ("lakh", "lakhs", "lac"):
-                    val *= 100_000
-                elif unit in ("crore", "crores", "cr"):
-                    val *= 10_000_000
-                return val
-            except (ValueError, IndexError, AttributeError):
-                continue
-    return 0.0
-
-
 @app.post("/analyze-past-tenders")
 async def analyze_past_tenders(
     files: Optional[_List[UploadFile]] = File(None),
@@ -1288,14 +2379,10 @@ async def analyze_sample_tenders():
     for fname in pdf_files:
         fpath = os.path.join(sample_dir, fname)
         try:
-            doc = fitz.open(fpath)
-            text = ""
-            for page in doc:
-                text += page.get_text() + "\n"
-            doc.close()
-
-            budget = _extract_budget_from_text(text)
-            emd = _extract_emd_from_text(text)
+            # OPTIMIZATION: budget + EMD from one precompiled scan (backend/amount_extract.py),
+            # run with the PDF read on the blocking executor
+            text, amounts = await run_blocking(_read_pdf_text_and_amounts, fpath)
+            budget, emd = amounts["estimated_budget"], amounts["emd"]
 
             results.append({
                 "filename": fname,
@@ -1310,25 +2397,36 @@ async def analyze_sample_tenders():
     return await _build_analysis_response(results, all_text)
 
 
+def _read_pdf_text(path: str) -> str:
+    """Plain text of every page (blocking - call via run_blocking)."""
+    doc = fitz.open(path)
+    try:
+        return "".join(page.get_text() + "\n" for page in doc)
+    finally:
+        doc.close()
+
+
+def _read_pdf_text_and_amounts(path: str) -> tuple:
+    """(text, extract_tender_amounts(text)) of a PDF (blocking - call via run_blocking)."""
+    text = _read_pdf_text(path)
+    return text, extract_tender_amounts(text)
+
+
 async def _predict_budget_from_text(text: str) -> float:
     try:
         groq_key = os.environ.get("GROQ_API_KEY", "")
         if not groq_key or not text.strip(): return 0.0
-        import asyncio, re
+        import re
         
-        def call_groq():
-            client = Groq(api_key=groq_key)
-            prompt = f"Estimate or extract the total budget/estimated cost of this project in Indian Rupees (INR) from the text. Reply ONLY with the raw number (e.g. 15000000). If you cannot find or estimate it, reply with 0. No explanation, no symbols.\n\n{text[:8000]}"
-            resp = client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.0,
-                max_tokens=20
-            )
-            return resp.choices[0].message.content.strip()
-            
-        loop = asyncio.get_event_loop()
-        reply = await loop.run_in_executor(None, call_groq)
+        client = AsyncGroq(api_key=groq_key)
+        prompt = f"Estimate or extract the total budget/estimated cost of this project in Indian Rupees (INR) from the text. Reply ONLY with the raw number (e.g. 15000000). If you cannot find or estimate it, reply with 0. No explanation, no symbols.\n\n{text[:8000]}"
+        resp = await client.chat.completions.create(
+            model="llama-3.3-70b-versatile",
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.0,
+            max_tokens=20
+        )
+        reply = resp.choices[0].message.content.strip()
         val_str = re.sub(r'[^\d\.]', '', reply)
         return float(val_str) if val_str else 0.0
     except Exception as e:
@@ -1350,16 +2448,10 @@ async def _run_tender_analysis_on_files(files: _List[UploadFile], include_sample
             tmp.write(content)
             tmp.close()
 
-            doc = fitz.open(tmp.name)
-            text = ""
-            for page in doc:
-                text += page.get_text() + "\n"
-            doc.close()
-
-            budget = _extract_budget_from_text(text)
+            text, amounts = await run_blocking(_read_pdf_text_and_amounts, tmp.name)
+            budget, emd = amounts["estimated_budget"], amounts["emd"]
             if budget == 0.0:
                 budget = await _predict_budget_from_text(text)
-            emd = _extract_emd_from_text(text)
 
             results.append({
                 "filename": f.filename,
@@ -1383,16 +2475,10 @@ async def _run_tender_analysis_on_files(files: _List[UploadFile], include_sample
             for fname in pdf_files:
                 fpath = os.path.join(sample_dir, fname)
                 try:
-                    doc = fitz.open(fpath)
-                    text = ""
-                    for page in doc:
-                        text += page.get_text() + "\n"
-                    doc.close()
-
-                    budget = _extract_budget_from_text(text)
+                    text, amounts = await run_blocking(_read_pdf_text_and_amounts, fpath)
+                    budget, emd = amounts["estimated_budget"], amounts["emd"]
                     if budget == 0.0:
                         budget = await _predict_budget_from_text(text)
-                    emd = _extract_emd_from_text(text)
 
                     results.append({
                         "filename": fname,
@@ -1420,7 +2506,7 @@ async def _build_analysis_response(results: list, all_text: str) -> dict:
     try:
         groq_key = os.environ.get("GROQ_API_KEY", "")
         if groq_key and all_text.strip():
-            client = Groq(api_key=groq_key)
+            client = AsyncGroq(api_key=groq_key)
             prompt = f"""Analyze these {len(results)} Indian government tender documents and provide:
 
 1. QUALIFICATION_CRITERIA: List the 5 most common qualification/eligibility requirements across all tenders (one per line, concise, realistic).
@@ -1438,7 +2524,7 @@ COMMON_BOQ_ITEMS:
 Tender excerpts:
 {all_text[:7000]}"""
 
-            response = client.chat.completions.create(
+            response = await client.chat.completions.create(
                 model="llama-3.3-70b-versatile",
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.3,
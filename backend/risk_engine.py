@@ -1,14 +1,39 @@
 import json
 import os
-import pdfplumber
 import re
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from dotenv import load_dotenv
 from groq import Groq
 
+from backend.clause_classifier import clause_hash, local_classify
+from backend.keyword_matcher import KeywordMatcher
+from backend.llm_cache import ResponseCache, fingerprint
+
 load_dotenv()
 
 LABELS = ["Financial", "Legal", "Payment", "Timeline", "Resource"]
 
+# PDF text extraction backend: pymupdf (process-pool, see pdf_extract.py) | pdfplumber
+RISK_PDF_EXTRACTOR = os.getenv("RISK_PDF_EXTRACTOR", "pymupdf").lower()
+
+# Batched classification: clauses per Groq prompt, prompts in flight, request rate cap
+# (a rolling-minute cap: a 150-clause tender's ~19 prompts go out at once, not 2 s apart)
+RISK_CLASSIFY_BATCH = int(os.getenv("RISK_CLASSIFY_BATCH", "8"))
+RISK_CLASSIFY_CONCURRENCY = int(os.getenv("RISK_CLASSIFY_CONCURRENCY", "8"))
+RISK_GROQ_RPM = int(os.getenv("RISK_GROQ_RPM", "30"))
+GROQ_CLASSIFY_MODEL = "llama-3.3-70b-versatile"
+
+# Clause label cache: Groq answers per normalized clause, shared across uploads and reruns
+CLAUSE_CACHE_ENABLED = os.getenv("CLAUSE_CACHE_ENABLED", "1") == "1"
+CLAUSE_CACHE_PATH = os.getenv("CLAUSE_CACHE_PATH", "clause_cache.sqlite3")
+CLAUSE_CACHE_TTL_SECONDS = int(os.getenv("CLAUSE_CACHE_TTL_DAYS", "90")) * 86400
+CLAUSE_CACHE_MAX_BYTES = int(os.getenv("CLAUSE_CACHE_MAX_MB", "64")) * 1024 * 1024
+
 # Initialize Groq client
 _groq_client = None
 
@@ -23,19 +48,58 @@ def get_groq_client():
 
 # TEXT EXTRACTION
 def clean_extracted_text(text: str) -> str:
+    """Drops (cid:N) glyph codes and collapses spaces, keeping one line per non-empty line."""
     text = re.sub(r"\(cid:\d+\)", " ", text)
-    text = re.sub(r"\s+", " ", text)
-    return text.strip()
+    lines = (re.sub(r"[^\S\n]+", " ", line).strip() for line in text.split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def extract_pages_pymupdf(pdf_path: str) -> list:
+    # OPTIMIZATION: PyMuPDF, page shards across the shared process pool for large files
+    from backend.pdf_extract import extract_pages
+    return [record["text"] for record in extract_pages(pdf_path)]
+
+
+def extract_pages_pdfplumber(pdf_path: str) -> list:
+    import pdfplumber
+    with pdfplumber.open(pdf_path) as pdf:
+        return [page.extract_text() or "" for page in pdf.pages]
+
+
+PDF_EXTRACTORS = {
+    "pymupdf": extract_pages_pymupdf,
+    "pdfplumber": extract_pages_pdfplumber,
+}
+
+
+@contextmanager
+def _pdf_path(source):
+    """Path of `source` (a path, or an uploaded file-like object spooled to a temp file)."""
+    if isinstance(source, (str, os.PathLike)):
+        yield os.fspath(source)
+        return
+    data = source.getvalue() if hasattr(source, "getvalue") else source.read()
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        yield path
+    finally:
+        os.remove(path)
 
 
-def extract_text(uploaded_file):
-    text = ""
-    with pdfplumber.open(uploaded_file) as pdf:
-        for page in pdf.pages:
-            t = page.extract_text()
-            if t:
-                text += t + "\n"
-    return clean_extracted_text(text)
+def extract_text(uploaded_file, extractor: str = None):
+    """
+    Document text with line breaks preserved (split_clauses needs them).
+    `extractor` names an entry of PDF_EXTRACTORS (default RISK_PDF_EXTRACTOR).
+    """
+    name = extractor or RISK_PDF_EXTRACTOR
+    if name not in PDF_EXTRACTORS:
+        raise ValueError(f"Unknown PDF extractor {name!r}. Supported: {', '.join(PDF_EXTRACTORS)}")
+    extract_pages = PDF_EXTRACTORS[name]
+    with _pdf_path(uploaded_file) as path:
+        pages = extract_pages(path)
+    return clean_extracted_text("\n".join(pages))
 
 
 # CLAUSE SPLITTING
@@ -44,7 +108,7 @@ def split_clauses(text):
     clauses = []
 
     for c in raw:
-        c = c.strip()
+        c = re.sub(r"\s+", " ", c).strip()  # line breaks only matter for the split
         if len(c) < 80:
             continue
         if not re.search(r"[a-zA-Z]{4,}", c):
@@ -64,17 +128,132 @@ HARD_KEYWORDS = [
     "fsi", "tdr", "premium"
 ]
 
+# keyword_classify: one point per distinct keyword (dict order breaks ties)
+CLASSIFY_KEYWORDS = {
+    "Payment": ["payment", "compensation", "fees", "charges", "corpus fund", "gst", "stamp duty", "premium", "paid", "payable"],
+    "Financial": ["liquidated", "penalty", "damages", "cost", "expense", "fsi", "tdr", "fungible"],
+    "Timeline": ["delay", "time", "completion", "schedule", "milestone", "months", "days", "handover", "deadline"],
+    "Legal": ["terminate", "termination", "indemn", "liability", "arbitration", "court", "litigation"],
+    "Resource": ["manpower", "staff", "labour", "equipment", "machinery"],
+}
+
+# expand_related_risks: any term adds its category
+RELATED_RISK_TERMS = {
+    "Payment": [
+        "payment", "payments", "paid", "payable",
+        "compensation", "hardship", "displacement",
+        "corpus fund", "fees", "charges",
+        "gst", "stamp duty", "premium"
+    ],
+    "Timeline": [
+        "time schedule", "completion period",
+        "completion time", "within", "months",
+        "days", "delay", "milestone", "handover"
+    ],
+    "Financial": [
+        "liquidated", "penalty", "damages",
+        "cost", "expense", "fsi", "tdr", "fungible"
+    ],
+    "Legal": [
+        "terminate", "termination",
+        "indemn", "liability",
+        "arbitration", "court", "litigation"
+    ],
+    "Resource": [
+        "manpower", "staff", "labour",
+        "equipment", "machinery"
+    ],
+}
+
+# severity_from_confidence: (terms, boost) - each group adds its boost once
+SEVERITY_BOOSTS = [
+    (["liquidated", "penalty"], 30),
+    (["delay"], 20),
+    (["terminate"], 25),
+    (["compensation", "payment"], 15),
+]
+
+# OPTIMIZATION: every keyword table above in one automaton, one pass per text
+RISK_KEYWORDS = KeywordMatcher({
+    "ai_gate": HARD_KEYWORDS,
+    **{f"classify:{category}": terms for category, terms in CLASSIFY_KEYWORDS.items()},
+    **{f"related:{category}": terms for category, terms in RELATED_RISK_TERMS.items()},
+    **{f"severity:{i}": {term: boost for term in terms} for i, (terms, boost) in enumerate(SEVERITY_BOOSTS)},
+})
+
 
 def requires_ai_analysis(text: str) -> bool:
-    t = text.lower()
-    return any(k in t for k in HARD_KEYWORDS)
+    return RISK_KEYWORDS.any(text, "ai_gate")
+
+
+# CLAUSE CACHE (PERFORMANCE)
+# Groq labels also train the local classifier (clause_classifier.train reads this scope)
+CLAUSE_LABEL_SCOPE = "clause-label"
+clause_label_cache = ResponseCache(CLAUSE_CACHE_PATH, CLAUSE_CACHE_TTL_SECONDS, CLAUSE_CACHE_MAX_BYTES,
+                                   log_tag="CLAUSE-CACHE")
+_latency_saved_s = 0.0
+_latency_lock = threading.Lock()
+
+
+def _clause_cache_key(text: str) -> str:
+    return fingerprint("clause-label", GROQ_CLASSIFY_MODEL, clause_hash(text))
+
+
+def cached_labels(texts):
+    """Cached Groq labels: (category, confidence) per clause, None on a miss."""
+    global _latency_saved_s
+    if not CLAUSE_CACHE_ENABLED:
+        return [None] * len(texts)
+    results = []
+    for text in texts:
+        try:
+            entry = clause_label_cache.get(_clause_cache_key(text))
+        except Exception as e:
+            print(f"[CLAUSE-CACHE] Lookup failed: {e}")
+            entry = None
+        if entry is None:
+            results.append(None)
+            continue
+        with _latency_lock:
+            _latency_saved_s += entry.get("latency_s", 0.0)
+        results.append((entry["category"], entry["confidence"]))
+    return results
+
+
+def remember_labels(texts, labels, seconds: float):
+    """Caches Groq labels (with their share of the call's latency and the clause text to train on)."""
+    if not CLAUSE_CACHE_ENABLED or not texts:
+        return
+    latency = seconds / len(texts)
+    try:
+        clause_label_cache.put_many([
+            (_clause_cache_key(text), {
+                "category": category, "confidence": confidence, "text": text[:800],
+                "model": GROQ_CLASSIFY_MODEL, "latency_s": round(latency, 4),
+            })
+            for text, (category, confidence) in zip(texts, labels)
+        ], scope=CLAUSE_LABEL_SCOPE)
+    except Exception as e:
+        print(f"[CLAUSE-CACHE] Store failed: {e}")
+
+
+def clause_cache_stats() -> dict:
+    """Entries, hit rate and the Groq time saved by cache hits in this process."""
+    stats = clause_label_cache.stats()
+    stats["latency_saved_s"] = round(_latency_saved_s, 2)
+    return stats
 
 
 def classify_clause_groq(text: str):
     """
     Uses Groq API (llama-3.3-70b-versatile) to classify clauses.
+    Answers are cached per normalized clause text.
     Returns: (category, confidence)
     """
+    cached = cached_labels([text])[0]
+    if cached is not None:
+        return cached
+
     client = get_groq_client()
     if not client:
         # Fallback to keyword classification
@@ -98,8 +277,9 @@ Clause:
 """
 
     try:
+        started = time.time()
         response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
+            model=GROQ_CLASSIFY_MODEL,
             messages=[{"role": "user", "content": prompt}],
             temperature=0,
             max_tokens=100
@@ -119,8 +299,8 @@ Clause:
         confidence = float(data.get("confidence", 0.0))
 
         if category == "None" or category not in LABELS:
-            return None, confidence
-
+            category = None
+        remember_labels([text], [(category, confidence)], time.time() - started)
         return category, confidence
 
     except Exception as e:
@@ -133,15 +313,8 @@ def keyword_classify(text: str):
     Pure keyword-based fallback classifier.
     Returns (category, confidence).
     """
-    t = text.lower()
-
-    scores = {
-        "Payment": sum(1 for k in ["payment", "compensation", "fees", "charges", "corpus fund", "gst", "stamp duty", "premium", "paid", "payable"] if k in t),
-        "Financial": sum(1 for k in ["liquidated", "penalty", "damages", "cost", "expense", "fsi", "tdr", "fungible"] if k in t),
-        "Timeline": sum(1 for k in ["delay", "time", "completion", "schedule", "milestone", "months", "days", "handover", "deadline"] if k in t),
-        "Legal": sum(1 for k in ["terminate", "termination", "indemn", "liability", "arbitration", "court", "litigation"] if k in t),
-        "Resource": sum(1 for k in ["manpower", "staff", "labour", "equipment", "machinery"] if k in t),
-    }
+    hits = RISK_KEYWORDS.match(text)
+    scores = {category: len(hits[f"classify:{category}"]) for category in CLASSIFY_KEYWORDS}
 
     best_cat = max(scores, key=scores.get)
     best_score = scores[best_cat]
@@ -154,16 +327,137 @@ def keyword_classify(text: str):
     return best_cat, confidence
 
 
-def classify_clauses_batch(texts, threshold=0.12, batch_size=8):
+# BATCHED CLASSIFICATION (PERFORMANCE)
+class _RateLimiter:
     """
-    Classifies a list of clauses.
-    Returns: [(text, category, confidence), ...]
+    At most `per_minute` request starts in any rolling 60 s window. Requests under the
+    cap start immediately (a whole document's batches can burst); only the request
+    that would exceed it waits for the oldest start to leave the window.
     """
+
+    def __init__(self, per_minute: int, window: float = 60.0):
+        self.per_minute = per_minute
+        self.window = window
+        self._starts = deque()  # reserved start times, ascending
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if self.per_minute <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            while self._starts and self._starts[0] <= now - self.window:
+                self._starts.popleft()
+            start = now
+            if len(self._starts) >= self.per_minute:
+                start = self._starts[-self.per_minute] + self.window
+            self._starts.append(start)
+        if start > now:
+            time.sleep(start - now)
+
+
+_groq_rate_limiter = _RateLimiter(RISK_GROQ_RPM)
+
+
+def classify_clauses_groq(texts):
+    """
+    Classifies several clauses with ONE Groq call (JSON array answer).
+    Returns [(category, confidence), ...] in input order; clauses the model skipped
+    or answered with a malformed item fall back to keyword_classify.
+    Raises on API / parse errors so the caller can fall back for the whole batch.
+    """
+    client = get_groq_client()
+    if not client:
+        return [keyword_classify(t) for t in texts]
+
+    numbered = "\n\n".join(f'{i}. """{t[:800]}"""' for i, t in enumerate(texts, start=1))
+    prompt = f"""You are a contract risk classifier.
+
+Classify EACH of the numbered clauses below into ONLY ONE category from:
+Financial, Legal, Payment, Timeline, Resource
+
+Return output strictly as a JSON array with one object per clause, like:
+[
+  {{"id": 1, "category": "Financial|Legal|Payment|Timeline|Resource|None", "confidence": 0.85}}
+]
+
+Do NOT include any explanation. Only return the JSON array.
+
+Clauses:
+{numbered}
+"""
+
+    _groq_rate_limiter.wait()
+    started = time.time()
+    response = client.chat.completions.create(
+        model=GROQ_CLASSIFY_MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        temperature=0,
+        max_tokens=40 * len(texts) + 50
+    )
+    content = response.choices[0].message.content.strip()
+    seconds = time.time() - started
+
+    start = content.find("[")
+    end = content.rfind("]")
+    if start == -1 or end == -1:
+        raise ValueError("no JSON array in response")
+    by_id = {}
+    for item in json.loads(content[start:end + 1]):
+        try:
+            by_id[int(item["id"])] = (item.get("category"), float(item.get("confidence", 0.0)))
+        except (KeyError, TypeError, ValueError):
+            continue
+
     results = []
+    for i, text in enumerate(texts, start=1):
+        if i not in by_id:
+            results.append(keyword_classify(text))
+            continue
+        category, confidence = by_id[i]
+        results.append((category, confidence) if category in LABELS else (None, confidence))
+    answered = [i - 1 for i in by_id if 1 <= i <= len(texts)]
+    remember_labels([texts[i] for i in answered], [results[i] for i in answered], seconds)
+    return results
 
-    for text in texts:
-        category, confidence = classify_clause_groq(text)
 
+def classify_clauses_batch(texts, threshold=0.12, batch_size=RISK_CLASSIFY_BATCH):
+    """
+    Classifies a list of clauses.
+    Cached Groq labels are reused; the local classifier answers the uncached clauses it
+    is confident about; the rest go to Groq, `batch_size` clauses per prompt, RISK_CLASSIFY_CONCURRENCY prompts at a
+    time under the RISK_GROQ_RPM rolling-minute limit. A failed batch falls back to
+    keyword_classify for each of its clauses.
+    Returns: [(text, category, confidence), ...]
+    """
+    labels = cached_labels(texts)
+    uncached = [i for i, label in enumerate(labels) if label is None]
+    for i, label in zip(uncached, local_classify([texts[i] for i in uncached])):
+        labels[i] = label
+    pending = [i for i, label in enumerate(labels) if label is None]
+    if len(pending) < len(texts):
+        print(f"[risk_engine] {len(texts) - len(uncached)} cached, {len(uncached) - len(pending)} local, "
+              f"{len(pending)} Groq of {len(texts)} clauses")
+    pending_texts = [texts[i] for i in pending]
+    batches = [pending_texts[i:i + batch_size] for i in range(0, len(pending_texts), max(1, batch_size))]
+
+    def run(batch):
+        try:
+            return classify_clauses_groq(batch)
+        except Exception as e:
+            print(f"[risk_engine] Groq batch classify failed ({len(batch)} clauses): {e}. Using keyword fallback.")
+            return [keyword_classify(t) for t in batch]
+
+    if len(batches) > 1 and get_groq_client():
+        with ThreadPoolExecutor(max_workers=max(1, RISK_CLASSIFY_CONCURRENCY)) as pool:
+            remote = [label for batch_labels in pool.map(run, batches) for label in batch_labels]
+    else:
+        remote = [label for batch in batches for label in run(batch)]
+    for i, label in zip(pending, remote):
+        labels[i] = label
+
+    results = []
+    for text, (category, confidence) in zip(texts, labels):
         if category and confidence >= threshold:
             results.append((text, category, confidence))
         else:
@@ -174,55 +468,14 @@ def classify_clauses_batch(texts, threshold=0.12, batch_size=8):
 
 # RISK EXPANSION (DOMAIN-AWARE)
 def expand_related_risks(primary_category, text):
-    t = text.lower()
     risks = set()
 
     if primary_category:
         risks.add(primary_category)
 
-    PAYMENT_TERMS = [
-        "payment", "payments", "paid", "payable",
-        "compensation", "hardship", "displacement",
-        "corpus fund", "fees", "charges",
-        "gst", "stamp duty", "premium"
-    ]
-
-    TIMELINE_TERMS = [
-        "time schedule", "completion period",
-        "completion time", "within", "months",
-        "days", "delay", "milestone", "handover"
-    ]
-
-    FINANCIAL_TERMS = [
-        "liquidated", "penalty", "damages",
-        "cost", "expense", "fsi", "tdr", "fungible"
-    ]
-
-    LEGAL_TERMS = [
-        "terminate", "termination",
-        "indemn", "liability",
-        "arbitration", "court", "litigation"
-    ]
-
-    RESOURCE_TERMS = [
-        "manpower", "staff", "labour",
-        "equipment", "machinery"
-    ]
-
-    if any(k in t for k in PAYMENT_TERMS):
-        risks.add("Payment")
-
-    if any(k in t for k in TIMELINE_TERMS):
-        risks.add("Timeline")
-
-    if any(k in t for k in FINANCIAL_TERMS):
-        risks.add("Financial")
-
-    if any(k in t for k in LEGAL_TERMS):
-        risks.add("Legal")
-
-    if any(k in t for k in RESOURCE_TERMS):
-        risks.add("Resource")
+    for hit in RISK_KEYWORDS.matched_categories(text):
+        if hit.startswith("related:"):
+            risks.add(hit[len("related:"):])
 
     return list(risks)
 
@@ -230,16 +483,11 @@ def expand_related_risks(primary_category, text):
 # SEVERITY
 def severity_from_confidence(confidence, text):
     base = confidence * 100
-    t = text.lower()
+    hits = RISK_KEYWORDS.match(text)
 
-    if "liquidated" in t or "penalty" in t:
-        base += 30
-    if "delay" in t:
-        base += 20
-    if "terminate" in t:
-        base += 25
-    if "compensation" in t or "payment" in t:
-        base += 15
+    for i, (_, boost) in enumerate(SEVERITY_BOOSTS):
+        if hits[f"severity:{i}"]:
+            base += boost
 
     severity = min(int(base), 95)
 
@@ -1,5 +1,6 @@
 import hashlib
 import os
+import sys
 import time
 import re
 from datetime import datetime
@@ -18,6 +19,11 @@ from selenium.webdriver.chrome.service import Service
 from selenium.common.exceptions import TimeoutException, WebDriverException
 from webdriver_manager.chrome import ChromeDriverManager
 
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.keyword_matcher import KeywordMatcher
+
 # ======================================================
 # ENV SETUP
 # ======================================================
@@ -34,9 +40,38 @@ if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
 supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
 
 # ======================================================
-# VALIDATION LOGIC (UNCHANGED)
+# VALIDATION LOGIC
 # ======================================================
 
+UI_NOISE = [
+    "active tenders", "bids", "search", "calendar",
+    "closing today", "recent tenders", "dashboard",
+    "statistics", "total", "count",
+    "home", "welcome", "login", "register",
+    "faq", "help", "support",
+    "model tender documents", "tender calendar",
+    "web information manager", "skip to",
+    "screen reader", "accessibility",
+    "policies", "training", "courses",
+    "ask", "chat", "contact", "about"
+]
+
+STRONG_SIGNALS = [
+    "corrigendum", "amendment", "addendum",
+    "notification", "circular",
+    "rule", "gfr", "guideline", "manual",
+    "eligibility", "qualification",
+    "suspended", "debarred", "blacklisted",
+    "extension", "deadline",
+    "tender no", "bid no", "reference",
+    "document", "clause"
+]
+
+HREF_SIGNALS = ["corrigendum", "amendment", "circular", "notification", "pdf"]
+
+BID_UPDATE_KEYWORDS = KeywordMatcher({"noise": UI_NOISE, "signal": STRONG_SIGNALS, "href": HREF_SIGNALS})
+
+
 def is_valid_bid_update(text: str, href: str) -> bool:
     text = (text or "").strip().lower()
     href = (href or "").lower()
@@ -47,37 +82,15 @@ def is_valid_bid_update(text: str, href: str) -> bool:
     if re.fullmatch(r"\d+", text):
         return False
 
-    UI_NOISE = [
-        "active tenders", "bids", "search", "calendar",
-        "closing today", "recent tenders", "dashboard",
-        "statistics", "total", "count",
-        "home", "welcome", "login", "register",
-        "faq", "help", "support",
-        "model tender documents", "tender calendar",
-        "web information manager", "skip to",
-        "screen reader", "accessibility",
-        "policies", "training", "courses",
-        "ask", "chat", "contact", "about"
-    ]
-
-    if any(n in text for n in UI_NOISE):
+    hits = BID_UPDATE_KEYWORDS.matched_categories(text)
+
+    if "noise" in hits:
         return False
 
-    STRONG_SIGNALS = [
-        "corrigendum", "amendment", "addendum",
-        "notification", "circular",
-        "rule", "gfr", "guideline", "manual",
-        "eligibility", "qualification",
-        "suspended", "debarred", "blacklisted",
-        "extension", "deadline",
-        "tender no", "bid no", "reference",
-        "document", "clause"
-    ]
-
-    if any(s in text for s in STRONG_SIGNALS):
+    if "signal" in hits:
         return True
 
-    if any(s in href for s in ["corrigendum", "amendment", "circular", "notification", "pdf"]):
+    if BID_UPDATE_KEYWORDS.any(href, "href"):
         return True
 
     return False
@@ -0,0 +1,149 @@
+"""
+Per-tender BM25 inverted index, stored next to the FAISS index, plus RRF fusion.
+
+Dense BGE retrieval misses exact tokens that tender questions hinge on - clause
+numbers ("5.2.1"), EMD / fee amounts, GFR rule ids. The sparse index matches them
+exactly, and reciprocal-rank fusion (RRF) merges both rankings, so a smaller k
+gives the same or better recall.
+
+Files (row i = FAISS id i = chunk store row i, see backend/index_store.py):
+- bm25_terms.json:          {"terms": [...sorted vocabulary], "avgdl": float, "count": n}
+- bm25_term_offsets.npy:    int64, term t's postings are [offsets[t], offsets[t + 1])
+- bm25_postings.npy:        int32 chunk rows, grouped by term
+- bm25_tf.npy:              float32 term frequency for each posting
+- bm25_doc_len.npy:         int32 token count per chunk
+
+Arrays are memory-mapped, so loading costs one JSON read of the vocabulary.
+"""
+import json
+import os
+import re
+from collections import Counter, defaultdict
+
+import numpy as np
+
+# Configuration
+BM25_K1 = float(os.getenv("BM25_K1", "1.2"))
+BM25_B = float(os.getenv("BM25_B", "0.75"))
+RRF_K = int(os.getenv("RRF_K", "60"))
+
+TERMS_FILE = "bm25_terms.json"
+OFFSETS_FILE = "bm25_term_offsets.npy"
+POSTINGS_FILE = "bm25_postings.npy"
+TF_FILE = "bm25_tf.npy"
+DOC_LEN_FILE = "bm25_doc_len.npy"
+SPARSE_FILES = (TERMS_FILE, OFFSETS_FILE, POSTINGS_FILE, TF_FILE, DOC_LEN_FILE)
+
+# Dotted / comma-grouped numbers stay one token ("5.2.1", "1,50,000"), words keep inner - and /
+_TOKEN_RE = re.compile(r"\d+(?:[.,/]\d+)*|[a-z][a-z0-9]*(?:[-/][a-z0-9]+)*")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or shall the this to was were will with".split()
+)
+
+
+def tokenize(text: str) -> list:
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        if token in _STOPWORDS:
+            continue
+        if token[0].isdigit() and "," in token:
+            token = token.replace(",", "")  # 1,50,000 == 150000 (Indian / western grouping)
+        tokens.append(token)
+    return tokens
+
+
+def has_sparse_files(index_dir: str) -> bool:
+    return all(os.path.exists(os.path.join(index_dir, name)) for name in SPARSE_FILES)
+
+
+def build_sparse_index(index_dir: str, texts: list):
+    """Writes the BM25 files for `texts` (in FAISS row order); temp files are swapped in terms-file last."""
+    postings = defaultdict(list)  # term -> [(row, tf)]
+    doc_len = np.zeros(len(texts), dtype=np.int32)
+    for row, text in enumerate(texts):
+        counts = Counter(tokenize(text))
+        doc_len[row] = sum(counts.values())
+        for term, tf in counts.items():
+            postings[term].append((row, tf))
+
+    terms = sorted(postings)
+    offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+    for t, term in enumerate(terms):
+        offsets[t + 1] = offsets[t] + len(postings[term])
+    rows = np.empty(offsets[-1], dtype=np.int32)
+    tfs = np.empty(offsets[-1], dtype=np.float32)
+    for t, term in enumerate(terms):
+        entries = np.asarray(postings[term], dtype=np.int64).reshape(-1, 2)
+        rows[offsets[t]:offsets[t + 1]] = entries[:, 0]
+        tfs[offsets[t]:offsets[t + 1]] = entries[:, 1]
+
+    tmp = lambda name: os.path.join(index_dir, f"{name}.tmp")
+    for name, array in ((OFFSETS_FILE, offsets), (POSTINGS_FILE, rows), (TF_FILE, tfs), (DOC_LEN_FILE, doc_len)):
+        with open(tmp(name), "wb") as f:
+            np.save(f, array)
+    with open(tmp(TERMS_FILE), "w", encoding="utf-8") as f:
+        json.dump({"terms": terms, "avgdl": float(doc_len.mean()) if len(texts) else 0.0,
+                   "count": len(texts)}, f)
+    for name in (OFFSETS_FILE, POSTINGS_FILE, TF_FILE, DOC_LEN_FILE, TERMS_FILE):
+        os.replace(tmp(name), os.path.join(index_dir, name))
+
+
+class SparseIndex:
+    """Read-only BM25 scorer over the memory-mapped inverted index."""
+
+    def __init__(self, index_dir: str):
+        with open(os.path.join(index_dir, TERMS_FILE), "r", encoding="utf-8") as f:
+            header = json.load(f)
+        self.term_ids = {term: t for t, term in enumerate(header["terms"])}
+        self.avgdl = header["avgdl"] or 1.0
+        self.count = header["count"]
+        load = lambda name: np.load(os.path.join(index_dir, name), mmap_mode="r")
+        self.offsets = load(OFFSETS_FILE)
+        self.postings = load(POSTINGS_FILE)
+        self.tf = load(TF_FILE)
+        # Per-chunk length normalization, precomputed once per load
+        self.norm = BM25_K1 * (1 - BM25_B + BM25_B * load(DOC_LEN_FILE) / self.avgdl)
+
+    def __len__(self):
+        return self.count
+
+    def search(self, query: str, k: int) -> list:
+        """Top-k (row, bm25 score) pairs, best first. Rows with no query term are not returned."""
+        scores = np.zeros(self.count, dtype=np.float32)
+        for term, query_tf in Counter(tokenize(query)).items():
+            t = self.term_ids.get(term)
+            if t is None:
+                continue
+            start, end = int(self.offsets[t]), int(self.offsets[t + 1])
+            rows = self.postings[start:end]
+            tf = self.tf[start:end]
+            idf = np.log(1 + (self.count - (end - start) + 0.5) / ((end - start) + 0.5))
+            # posting rows are unique per term, so fancy-index += is safe
+            scores[rows] += query_tf * idf * tf * (BM25_K1 + 1) / (tf + self.norm[rows])
+        hits = np.flatnonzero(scores)
+        if len(hits) > k:
+            hits = hits[np.argpartition(-scores[hits], k - 1)[:k]]
+        hits = hits[np.argsort(-scores[hits], kind="stable")]
+        return [(int(row), float(scores[row])) for row in hits]
+
+
+def rrf_fuse(rankings: list, k: int, rrf_k: int = RRF_K) -> list:
+    """Reciprocal-rank fusion of several best-first row lists -> top-k rows."""
+    fused = defaultdict(float)
+    for ranking in rankings:
+        for rank, row in enumerate(ranking):
+            fused[row] += 1.0 / (rrf_k + rank + 1)
+    return sorted(fused, key=lambda row: (-fused[row], row))[:k]
+
+
+def hybrid_search(vectorstore, sparse: SparseIndex, query: str, query_vector: list, k: int, fetch_k: int) -> list:
+    """
+    Top-k Documents by RRF over the dense (FAISS) and sparse (BM25) rankings of
+    `fetch_k` candidates each. `vectorstore` is a LangChain FAISS store whose rows
+    line up with `sparse` (both are written from the same chunk order).
+    """
+    _, ids = vectorstore.index.search(np.asarray([query_vector], dtype=np.float32), max(k, fetch_k))
+    dense_rows = [int(i) for i in ids[0] if i >= 0]
+    sparse_rows = [row for row, _ in sparse.search(query, max(k, fetch_k))]
+    rows = rrf_fuse([dense_rows, sparse_rows], k)
+    return [vectorstore.docstore.search(vectorstore.index_to_docstore_id[row]) for row in rows]
@@ -13,7 +13,18 @@ from supabase import create_client
 from dotenv import load_dotenv
 import base64
 from pathlib import Path
+import sys
+
+# Ensure the frontend root and repo root are in sys.path so utils/ and backend/ resolve
+FRONTEND_DIR = Path(__file__).resolve().parents[1]
+ROOT_DIR = Path(__file__).resolve().parents[2]
+for p in [str(FRONTEND_DIR), str(ROOT_DIR)]:
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
 from utils.auth import can_access
+from backend.amount_extract import extract_tender_amounts
+from backend.keyword_matcher import KeywordMatcher
 
 def get_base64_of_bin_file(path):
     if os.path.exists(path):
@@ -87,6 +98,10 @@ NON_BILLABLE_KEYWORDS = [
     "schedule of completion"
 ]
 
+@st.cache_resource
+def get_boq_keywords():
+    return KeywordMatcher({"non_billable": NON_BILLABLE_KEYWORDS, "material": MATERIAL_KEYWORDS})
+
 # Supabase Setup
 if not SUPABASE_URL or not SUPABASE_KEY:
     st.error("Supabase credentials not found. Check your .env file.")
@@ -158,32 +173,25 @@ def safe_json_parse(text):
         return []
 
 def classify_item(task_name: str) -> str:
-    t = task_name.lower()
+    hits = get_boq_keywords().matched_categories(task_name)
 
-    for kw in NON_BILLABLE_KEYWORDS:
-        if kw in t:
-            return "non_billable"
+    if "non_billable" in hits:
+        return "non_billable"
 
-    for kw in MATERIAL_KEYWORDS:
-        if kw in t:
-            return "material"
+    if "material" in hits:
+        return "material"
 
     return "service"
 
 def normalize_task(task: str) -> str:
-    task = task.lower()
+    materials = get_boq_keywords().match(task)["material"]
     for kw in MATERIAL_KEYWORDS:
-        if kw in task:
+        if kw in materials:
             return kw.title()
-    return task.title()
+    return task.lower().title()
 
 def keyword_fallback_items(text):
-    found = set()
-    t = text.lower()
-
-    for kw in MATERIAL_KEYWORDS:
-        if kw in t:
-            found.add(kw.title())
+    found = {kw.title() for kw in get_boq_keywords().match(text)["material"]}
 
     return [
         {"Task": item, "Qty": 1, "Rate": 0}
@@ -883,47 +891,9 @@ a:hover { text-decoration: underline !important; }
 
                         st.session_state.cost_df = pd.DataFrame(boq_items)
                         
-                        def extract_amount(label):
-                            """
-                            Extract rupee amounts from tender text. Handles:
-                            - ₹ symbol and Rs./Rs variations
-                            - Lakhs (e.g., 12,50,000 or 12.50 Lakhs)
-                            - Crores notation
-                            """
-                            # Try ₹ symbol first
-                            patterns = [
-                                rf"(?:{label})[^\n]{{0,80}}₹\s*([\d,\.]+)\s*(Lakh|Crore|lakh|crore|L|Cr)?",
-                                rf"(?:{label})[^\n]{{0,80}}Rs\.?\s*([\d,\.]+)\s*(Lakh|Crore|lakh|crore|L|Cr)?",
-                                rf"(?:{label})[^\n]{{0,80}}INR\s*([\d,\.]+)\s*(Lakh|Crore|lakh|crore|L|Cr)?",
-                                rf"([\d,\.]+)\s*(Lakh|Crore|lakh|crore|L|Cr)[^\n]{{0,60}}(?:{label})",
-                            ]
-                            for pat in patterns:
-                                m = re.search(pat, text, re.IGNORECASE)
-                                # if m:
-                                #     try:
-                                #         val_str = m.group(1).replace(",", "")
-                                #         val = float(val_str)
-                                #         unit = (m.group(2) or "").lower()
-                                #         if unit in ("lakh", "l"):
-                                #             val *= 100000
-                                #         elif unit in ("crore", "cr"):
-                                #             val *= 10000000
-                                #         return val
-                                #     except (IndexError, ValueError):
-                                #         continue
-                                if m and m.group(1):
-                                    try:
-                                        # Clean the string and convert to float
-                                        return float(m.group(1).replace(",", ""))
-                                    except ValueError:
-                                        continue
-                            return 0.0
-
-
-                        tender_data = {
-                            "estimated_budget": extract_amount("Estimated Cost|Tender Value|Estimated Amount|Approximate Value|Total Estimated"),
-                            "emd": extract_amount("EMD|Earnest Money"),
-                        }
+                        # Budget + EMD (normalized INR, lakh / crore aware) from one scan,
+                        # shared with the API (backend/amount_extract.py)
+                        tender_data = extract_tender_amounts(text)
 
                         complexity_score = compute_complexity_score(uploaded_tender)
 
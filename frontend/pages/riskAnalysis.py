@@ -20,7 +20,7 @@ for p in [str(FRONTEND_DIR), str(ROOT_DIR)]:
         sys.path.insert(0, p)
 
 from utils.auth import can_access
-from backend.risk_engine import analyze_pdf
+from backend.risk_engine import analyze_pdf, clause_cache_stats
 
 def get_base64_of_bin_file(path):
     if os.path.exists(path):
@@ -208,6 +208,10 @@ def risk_analysis_page():
             with st.status("🧬 Scanning Document Vectors...", expanded=True) as status:
                 st.session_state.analysis_results = analyze_pdf(uploaded_file)
                 st.session_state.last_file_id = file_id
+                cache = clause_cache_stats()
+                if cache["hit_rate"] is not None:
+                    st.caption(f"Clause cache: {cache['hit_rate']:.0%} hit rate, "
+                               f"{cache['latency_saved_s']:.1f}s of model time saved")
                 status.update(label="Analysis Verified", state="complete")
 
     st.markdown('<hr style="border-color: rgba(168, 85, 247, 0.2); margin: 30px 0; margin-top: -20px;">', unsafe_allow_html=True)
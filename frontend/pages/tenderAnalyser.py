@@ -35,6 +35,104 @@ def get_base64_of_bin_file(path):
             return base64.b64encode(f.read()).decode()
     return None
 
+class _StreamResult:
+    """Minimal response-like wrapper so streamed results flow through the existing handling below."""
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self._payload = payload
+        self.text = payload if isinstance(payload, str) else str(payload)
+
+    def json(self):
+        return self._payload
+
+
+def iter_sse_events(response):
+    """Parses a text/event-stream response into (event, data-dict) pairs."""
+    import json
+    event, data_lines = "message", []
+    for line in response.iter_lines(decode_unicode=True):
+        if line is None:
+            continue
+        if line == "":
+            if data_lines:
+                yield event, json.loads("\n".join(data_lines))
+            event, data_lines = "message", []
+        elif line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            data_lines.append(line[len("data:"):].strip())
+
+
+def poll_index_job(job_id, progress_bar, poll_interval=1.5, timeout=600):
+    """Polls GET /jobs/{job_id} with a live progress bar until indexing finishes."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = requests.get(f"{API_BASE_URL}/jobs/{job_id}", timeout=30).json()
+        stage = job.get("stage", "queued")
+        if stage == "complete":
+            return _StreamResult(200, job["result"])
+        if stage == "failed":
+            return _StreamResult(500, job.get("error") or "Indexing failed")
+
+        total_pages = job.get("total_pages") or 0
+        pages = job.get("pages_parsed", 0)
+        fraction = min(pages / total_pages, 1.0) * 0.8 if total_pages else 0.0
+        eta = job.get("eta_seconds")
+        label = f"{stage.capitalize()} · {pages}/{total_pages or '?'} pages · {job.get('chunks_embedded', 0)} chunks embedded"
+        if eta:
+            label += f" · ~{int(eta)}s left"
+        progress_bar.progress(fraction, text=label)
+        time.sleep(poll_interval)
+    return _StreamResult(504, "Timed out waiting for the indexing job")
+
+
+def stream_analysis(files, data):
+    """
+    Indexes the PDF as a background job (POST /jobs/analyze-tender, summarize=false)
+    and polls its progress, so no request stays open while pages are parsed and
+    embedded. Only the summary is then streamed (POST /analyze-tender/stream with the
+    job's index_key), rendered token-by-token as Groq generates it.
+    """
+    progress_bar = st.progress(0.0, text="Uploading…")
+    response = requests.post(f"{API_BASE_URL}/jobs/analyze-tender", files=files,
+                             data={**data, "summarize": "false"}, timeout=120)
+    if response.status_code != 200:
+        progress_bar.empty()
+        return _StreamResult(response.status_code, response.text)
+    indexed = poll_index_job(response.json()["job_id"], progress_bar)
+    if indexed.status_code != 200:
+        progress_bar.empty()
+        return indexed
+    index_cached = indexed.json().get("cached", False)
+
+    progress_bar.progress(0.85, text="Retrieving context…")
+    live_summary = st.empty()
+    summary = ""
+    with requests.post(f"{API_BASE_URL}/analyze-tender/stream",
+                       data={**data, "index_key": indexed.json()["index_key"]},
+                       stream=True, timeout=(30, 300)) as response:
+        if response.status_code != 200:
+            progress_bar.empty()
+            return _StreamResult(response.status_code, response.text)
+        for event, payload in iter_sse_events(response):
+            if event == "meta":
+                progress_bar.progress(0.9, text="Writing summary…")
+            elif event == "delta":
+                summary += payload["text"]
+                live_summary.markdown(summary + "▌")
+            elif event == "error":
+                progress_bar.empty()
+                live_summary.empty()
+                return _StreamResult(500, payload.get("message", "Analysis failed"))
+            elif event == "done":
+                progress_bar.empty()
+                live_summary.empty()
+                return _StreamResult(200, {"status": "success", "summary": summary, **payload, "cached": index_cached})
+    progress_bar.empty()
+    live_summary.empty()
+    return _StreamResult(502, "Stream ended before the analysis finished")
+
+
 # 1. PAGE CONFIG & SESSION STATE
 st.set_page_config(page_title="TenderFlow AI | Analyzer", layout="wide")
 
@@ -449,9 +547,8 @@ if analyze_button:
 
                 }
                 
-                # Call Backend
-                # Increased timeout to 600s (10 min) for large High-Quality jobs
-                response = requests.post(f"{API_BASE_URL}/analyze-tender", files=files, data=data, timeout=600)
+                # Call Backend: indexing runs as a polled job, then the summary streams in
+                response = stream_analysis(files, data)
                 
                 if response.status_code == 200:
                     result = response.json()
@@ -1,6 +1,8 @@
 # utils/complexity.py
 from PyPDF2 import PdfReader
 
+from backend.keyword_matcher import KeywordMatcher
+
 # ----------------------------
 # Keyword dictionaries
 # ----------------------------
@@ -39,6 +41,14 @@ SCHEDULE_KEYWORDS = {
     "emergency": 3,
 }
 
+# One automaton over all four dictionaries
+COMPLEXITY_KEYWORDS = KeywordMatcher({
+    "technical": TECHNICAL_KEYWORDS,
+    "risk": RISK_KEYWORDS,
+    "legal": LEGAL_KEYWORDS,
+    "schedule": SCHEDULE_KEYWORDS,
+})
+
 # ----------------------------
 # Extract raw text
 # ----------------------------
@@ -51,18 +61,7 @@ def extract_text_from_pdf(pdf_file):
 # ----------------------------
 def compute_complexity_score(pdf_file):
     text = extract_text_from_pdf(pdf_file)
-    score = 0
-
-    def apply_keywords(keyword_dict):
-        nonlocal score
-        for word, weight in keyword_dict.items():
-            if word in text:
-                score += weight
-
-    apply_keywords(TECHNICAL_KEYWORDS)
-    apply_keywords(RISK_KEYWORDS)
-    apply_keywords(LEGAL_KEYWORDS)
-    apply_keywords(SCHEDULE_KEYWORDS)
+    score = sum(COMPLEXITY_KEYWORDS.score(text).values())
 
     # Normalize to 1–10
     return min(10, max(1, round(score / 2)))
@@ -0,0 +1,44 @@
+"""Shared fixtures: backend.rag_api imported offline, with a deterministic embedding model."""
+import importlib
+
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding, Embeddings
+
+DIM = 32
+
+
+class CountingEmbeddings(Embeddings):
+    """Deterministic vectors; counts embedded texts and can fail on the N-th call."""
+
+    def __init__(self, fail_on_call: int = None):
+        self.fake = DeterministicFakeEmbedding(size=DIM)
+        self.fail_on_call = fail_on_call
+        self.calls = 0
+        self.texts = 0
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        if self.calls == self.fail_on_call:
+            raise RuntimeError("embedding worker killed")
+        self.texts += len(texts)
+        return self.fake.embed_documents(texts)
+
+    def embed_query(self, text):
+        return self.fake.embed_query(text)
+
+
+@pytest.fixture
+def rag_api(tmp_path, monkeypatch):
+    # rag_api builds its embedding model and Groq clients at import: keep that offline
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("GROQ_API_KEY", "test")
+    import backend.embedding_engine as embedding_engine
+    monkeypatch.setattr(embedding_engine, "create_embeddings", lambda *args, **kwargs: CountingEmbeddings())
+    return importlib.import_module("backend.rag_api")
+
+
+@pytest.fixture
+def risk_engine(tmp_path, monkeypatch):
+    # risk_engine opens its clause cache (SQLite) in the working directory at import
+    monkeypatch.chdir(tmp_path)
+    return importlib.import_module("backend.risk_engine")
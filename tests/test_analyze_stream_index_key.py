@@ -0,0 +1,53 @@
+"""
+POST /analyze-tender/stream with the index_key of an index built beforehand by an
+indexing job: only retrieval and the summary run inside the request.
+"""
+import json
+
+from fastapi.testclient import TestClient
+from langchain_core.documents import Document
+
+
+def _events(body: str) -> list:
+    events = []
+    for frame in body.strip().split("\n\n"):
+        lines = frame.split("\n")
+        events.append((lines[0][len("event: "):], json.loads(lines[1][len("data: "):])))
+    return events
+
+
+def test_rejects_unknown_or_missing_index(rag_api):
+    client = TestClient(rag_api.app)
+    url = "/analyze-tender/stream"
+    assert client.post(url, data={"index_key": "../secrets"}).status_code == 400
+    assert client.post(url, data={"index_key": "0" * 32}).status_code == 409
+    assert client.post(url, data={}).status_code == 422
+
+
+def test_streams_summary_for_built_index(rag_api, monkeypatch):
+    index_key = "a" * 32
+    rag_api.write_index_progress(rag_api.get_content_index_path(index_key), "complete", 3, 1)
+    docs = [Document(page_content="Bid security of INR 5,00,000 is required.", metadata={"page": 1})]
+    retrieved = []
+
+    def fake_retrieve(index_path, query, depth):
+        retrieved.append(index_path)
+        return docs
+
+    async def fake_deltas(messages, temperature, max_tokens):
+        for text in ("Bid security: ", "INR 5,00,000"):
+            yield text
+
+    monkeypatch.setattr(rag_api, "retrieve_analysis_context", fake_retrieve)
+    monkeypatch.setattr(rag_api, "stream_groq_deltas", fake_deltas)
+    monkeypatch.setattr(rag_api, "get_cached_llm_response", lambda *args: None)
+    monkeypatch.setattr(rag_api, "store_llm_response", lambda *args: None)
+
+    response = TestClient(rag_api.app).post("/analyze-tender/stream", data={"index_key": index_key})
+
+    assert response.status_code == 200
+    events = _events(response.text)
+    assert [name for name, _ in events] == ["progress", "meta", "delta", "delta", "done"]
+    assert events[1][1]["cached"] is True and events[1][1]["chunks_used"] == 1
+    assert "".join(data["text"] for name, data in events if name == "delta") == "Bid security: INR 5,00,000"
+    assert retrieved == [rag_api.get_content_index_path(index_key)]
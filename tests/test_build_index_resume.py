@@ -0,0 +1,131 @@
+"""
+Resuming an interrupted checkpointed build (build_index_streaming with
+checkpoint_path) while a progress callback is attached, as the job workers do.
+"""
+import pytest
+from langchain_core.documents import Document
+
+from tests.conftest import CountingEmbeddings
+
+
+@pytest.fixture(autouse=True)
+def checkpoint_every_batch(rag_api, monkeypatch):
+    monkeypatch.setattr(rag_api, "INDEX_CHECKPOINT_EVERY", 1)
+
+
+def _pages(count: int = 6) -> list:
+    return [
+        Document(
+            page_content="\n".join(f"{page}.{n} The contractor shall complete item {page}-{n} of the works "
+                                   f"within the stipulated period and as directed by the engineer." for n in range(1, 12)),
+            metadata={"source": "tender.pdf", "page": page},
+        )
+        for page in range(1, count + 1)
+    ]
+
+
+def test_resumed_build_with_progress_callback(rag_api, tmp_path, monkeypatch):
+    index_path = str(tmp_path / "index")
+
+    # First build dies on its second embedding batch, after one checkpoint
+    monkeypatch.setattr(rag_api, "embeddings", CountingEmbeddings(fail_on_call=2))
+    with pytest.raises(RuntimeError):
+        rag_api.build_index_streaming(iter(_pages()), rag_api.make_text_splitter(300, 30), "TEST",
+                                      batch_size=4, checkpoint_path=index_path)
+    assert rag_api.get_index_status(index_path) == "building"
+    checkpointed = rag_api.read_index_progress(index_path)["chunks_indexed"]
+    assert checkpointed == 4
+
+    # Resume with a progress callback attached
+    embeddings = CountingEmbeddings()
+    monkeypatch.setattr(rag_api, "embeddings", embeddings)
+    updates = []
+    vectorstore, stats = rag_api.build_index_streaming(
+        iter(_pages()), rag_api.make_text_splitter(300, 30), "TEST", batch_size=4,
+        checkpoint_path=index_path, progress=lambda stage=None, **counters: updates.append((stage, counters)),
+    )
+
+    assert rag_api.get_index_status(index_path) == "complete"
+    assert vectorstore.index.ntotal == stats["chunks"] > checkpointed
+    assert embeddings.texts == stats["chunks"] - checkpointed  # checkpointed chunks are not re-embedded
+    assert updates and all(stage == "embedding" for stage, _ in updates)
+    assert updates[-1][1]["chunks_embedded"] == stats["chunks"]
+    assert updates[-1][1]["pages_parsed"] == stats["pages"] == 6
+
+
+def _interrupted_build(rag_api, monkeypatch, index_path, parse_pass=None, batch_size=4):
+    """Checkpoint holding the first `batch_size` chunks of _pages(), as left by a crashed build."""
+    monkeypatch.setattr(rag_api, "embeddings", CountingEmbeddings(fail_on_call=2))
+    with pytest.raises(RuntimeError):
+        rag_api.build_index_streaming(iter(_pages()), rag_api.make_text_splitter(300, 30), "TEST",
+                                      batch_size=batch_size, checkpoint_path=index_path, parse_pass=parse_pass)
+    embeddings = CountingEmbeddings()
+    monkeypatch.setattr(rag_api, "embeddings", embeddings)
+    return embeddings
+
+
+def _texts(vectorstore) -> list:
+    return [vectorstore.docstore.search(vectorstore.index_to_docstore_id[i]).page_content
+            for i in range(vectorstore.index.ntotal)]
+
+
+def test_resume_with_shorter_stream_drops_unmatched_checkpoint_chunks(rag_api, tmp_path, monkeypatch):
+    index_path = str(tmp_path / "index")
+    _interrupted_build(rag_api, monkeypatch, index_path, batch_size=8)
+    first_page_chunks = rag_api.make_text_splitter(300, 30).split_documents(_pages(1))
+    assert 0 < len(first_page_chunks) < 8  # the checkpoint reaches past the shorter stream
+
+    vectorstore, stats = rag_api.build_index_streaming(iter(_pages(1)), rag_api.make_text_splitter(300, 30),
+                                                       "TEST", batch_size=4, checkpoint_path=index_path)
+
+    assert vectorstore.index.ntotal == stats["chunks"] == len(first_page_chunks)
+    assert _texts(vectorstore) == [chunk.page_content for chunk in first_page_chunks]
+    assert rag_api.read_index_progress(index_path)["chunks_indexed"] == len(first_page_chunks)
+
+
+def test_resume_with_diverging_chunks_reindexes_from_the_difference(rag_api, tmp_path, monkeypatch):
+    index_path = str(tmp_path / "index")
+    embeddings = _interrupted_build(rag_api, monkeypatch, index_path)
+    pages = _pages()
+    pages[0].page_content = pages[0].page_content.replace("1.3 The contractor", "1.3 The supplier")
+    expected = rag_api.make_text_splitter(300, 30).split_documents(pages)
+
+    vectorstore, stats = rag_api.build_index_streaming(iter(pages), rag_api.make_text_splitter(300, 30),
+                                                       "TEST", batch_size=4, checkpoint_path=index_path)
+
+    assert _texts(vectorstore) == [chunk.page_content for chunk in expected]
+    assert embeddings.texts < stats["chunks"]  # the matching prefix was still reused
+
+
+def test_other_pass_never_appends_to_a_checkpoint(rag_api, tmp_path, monkeypatch):
+    index_path = str(tmp_path / "index")
+    _interrupted_build(rag_api, monkeypatch, index_path, parse_pass="ocr")
+
+    # A fast pass that extracts nothing leaves the OCR checkpoint for the fallback
+    vectorstore, _ = rag_api.build_index_streaming(iter([]), rag_api.make_text_splitter(300, 30), "TEST",
+                                                   batch_size=4, checkpoint_path=index_path, parse_pass="fast")
+    assert vectorstore is None
+    assert rag_api.get_index_status(index_path) == "building"
+
+    # ...which then resumes it
+    embeddings = CountingEmbeddings()
+    monkeypatch.setattr(rag_api, "embeddings", embeddings)
+    vectorstore, stats = rag_api.build_index_streaming(iter(_pages()), rag_api.make_text_splitter(300, 30), "TEST",
+                                                       batch_size=4, checkpoint_path=index_path, parse_pass="ocr")
+    assert embeddings.texts == stats["chunks"] - 4
+    assert rag_api.read_index_progress(index_path)["pass"] == "ocr"
+
+
+def test_checkpoints_are_spaced_in_time_by_default(rag_api, tmp_path, monkeypatch):
+    monkeypatch.setattr(rag_api, "INDEX_CHECKPOINT_EVERY", 0)
+    monkeypatch.setattr(rag_api, "INDEX_CHECKPOINT_SECONDS", 3600)
+    monkeypatch.setattr(rag_api, "embeddings", CountingEmbeddings())
+    saves = []
+    save = rag_api.save_index_checkpoint
+    monkeypatch.setattr(rag_api, "save_index_checkpoint", lambda vs, path: (saves.append(vs.index.ntotal), save(vs, path)))
+
+    vectorstore, stats = rag_api.build_index_streaming(iter(_pages()), rag_api.make_text_splitter(300, 30), "TEST",
+                                                       batch_size=4, checkpoint_path=str(tmp_path / "index"))
+
+    assert stats["chunks"] > 4 * 2
+    assert saves == [stats["chunks"]]  # only the final save, not one per batch
@@ -0,0 +1,63 @@
+"""
+The local clause classifier never trains inside a request: without a prebuilt model
+every clause is left for Groq, and a model built by the CLI (from the Groq labels in
+the clause cache) is picked up on the fly.
+"""
+import pytest
+
+from backend import clause_classifier
+from backend.llm_cache import ResponseCache
+from tests.conftest import CountingEmbeddings
+
+
+@pytest.fixture
+def classifier(tmp_path, monkeypatch, risk_engine):
+    cache = ResponseCache(str(tmp_path / "clause_cache.sqlite3"), 3600, 1024 * 1024, log_tag="CLAUSE-CACHE")
+    monkeypatch.setattr(risk_engine, "clause_label_cache", cache)
+    monkeypatch.setattr(clause_classifier, "CLAUSE_MODEL_PATH", str(tmp_path / "clause_classifier.joblib"))
+    monkeypatch.setattr(clause_classifier, "CLAUSE_MIN_TRAIN_LABELS", 4)
+    monkeypatch.setattr(clause_classifier, "_embeddings", CountingEmbeddings())
+    monkeypatch.setattr(clause_classifier, "_model", None)
+    monkeypatch.setattr(clause_classifier, "_model_mtime", None)
+    return clause_classifier
+
+
+def _record(risk_engine):
+    financial = [f"Liquidated damages of {n}% of the contract value per week of delay." for n in range(1, 6)]
+    timeline = [f"The work shall be completed within {n} months from the date of award." for n in range(1, 6)]
+    neutral = [f"The bid shall be submitted in {n} sealed copies at the office address." for n in range(1, 6)]
+    labels = [("Financial", 0.9)] * 5 + [("Timeline", 0.9)] * 5 + [(None, 0.9)] * 5
+    assert {category for category, _ in labels} - {None} <= set(risk_engine.LABELS)
+    risk_engine.remember_labels(financial + timeline + neutral, labels, seconds=3.0)
+    return financial + timeline + neutral
+
+
+def test_missing_model_falls_back_without_training(classifier, risk_engine, monkeypatch):
+    texts = _record(risk_engine)
+    monkeypatch.setattr(classifier, "train", lambda: pytest.fail("trained inside a request"))
+    embeddings = classifier._embeddings
+
+    assert classifier.local_classify(texts) == [None] * len(texts)
+    assert embeddings.calls == 0  # no embedding model work either
+
+
+def test_model_built_offline_is_picked_up(classifier, risk_engine, monkeypatch):
+    texts = _record(risk_engine)
+    assert classifier.local_classify(texts[:1]) == [None]
+
+    assert classifier.train() is not None
+    monkeypatch.setattr(classifier, "CLAUSE_LOCAL_THRESHOLD", 0.0)
+    predictions = classifier.local_classify(texts)
+    assert all(prediction is not None for prediction in predictions)
+    assert {prediction[0] for prediction in predictions} <= {"Financial", "Timeline", None}
+    assert classifier._model["samples"] == len(texts)
+
+
+def test_labels_come_from_the_deduplicated_clause_cache(classifier, risk_engine):
+    texts = _record(risk_engine)
+    _record(risk_engine)  # the same clauses labelled again replace, not append
+    risk_engine.remember_labels(["1. " + texts[0].upper()], [("Legal", 0.8)], seconds=1.0)
+
+    labels = classifier.load_labels()
+    assert len(labels) == len(texts)
+    assert labels[classifier.clause_hash(texts[0])][1] == "Legal"  # the latest label of a clause wins
@@ -0,0 +1,38 @@
+"""Archive filename filters follow the bytes last uploaded under each name."""
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+from backend.global_index import GlobalIndex
+from backend.index_store import save_index
+from tests.conftest import CountingEmbeddings
+
+
+def _tender_index(tmp_path, name: str, texts: list) -> str:
+    docs = [Document(page_content=text, metadata={"page": page}) for page, text in enumerate(texts, 1)]
+    index_path = str(tmp_path / name)
+    save_index(FAISS.from_documents(docs, CountingEmbeddings()), index_path)
+    return index_path
+
+
+def _search(archive, filename: str) -> list:
+    query = CountingEmbeddings().embed_query("performance security")
+    return [(doc.page_content, doc.metadata["filename"]) for doc, _ in archive.search(query, k=10, filenames=[filename])]
+
+
+def test_filename_filter_after_rename_and_reused_name(tmp_path):
+    archive = GlobalIndex(str(tmp_path / "archive"), num_shards=2)
+    original = _tender_index(tmp_path, "key-original", ["Performance security of 5%.", "EMD of INR 2 lakh."])
+    corrigendum = _tender_index(tmp_path, "key-corrigendum", ["Performance security of 3%."])
+
+    assert archive.add_document("key-original", original, "tender.pdf", "hash-original") == 2
+
+    # Same bytes re-uploaded under a new name: stored once, found under both names
+    assert archive.add_document("key-original", original, "tender_final.pdf", "hash-original") == 0
+    renamed = _search(archive, "tender_final.pdf")
+    assert sorted(text for text, _ in renamed) == ["EMD of INR 2 lakh.", "Performance security of 5%."]
+    assert {filename for _, filename in renamed} == {"tender_final.pdf"}
+
+    # The old name reused for different bytes: the filter only matches the new document
+    assert archive.add_document("key-corrigendum", corrigendum, "tender.pdf", "hash-corrigendum") == 1
+    assert [text for text, _ in _search(archive, "tender.pdf")] == ["Performance security of 3%."]
+    assert len(_search(archive, "tender_final.pdf")) == 2
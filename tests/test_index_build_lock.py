@@ -0,0 +1,61 @@
+"""
+The index build lock (claim_index_build) must hold across processes: job workers
+and the API process build into the same index directories.
+"""
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+
+ROOT = __file__.rsplit("/tests/", 1)[0]
+
+
+def _hold_lock_in_subprocess(lock_path: str) -> subprocess.Popen:
+    """Another process holding the lock file until its stdin is closed."""
+    script = textwrap.dedent(f"""
+        import sys
+        sys.path.insert(0, {ROOT!r})
+        from backend.embedding_cache import exclusive_file_lock
+        with exclusive_file_lock({lock_path!r}):
+            print("locked", flush=True)
+            sys.stdin.read()
+    """)
+    holder = subprocess.Popen([sys.executable, "-c", script], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    assert holder.stdout.readline().strip() == "locked"
+    return holder
+
+
+def test_claim_fails_while_another_process_builds(rag_api, tmp_path):
+    index_path = str(tmp_path / "index")
+    holder = _hold_lock_in_subprocess(f"{index_path}.lock")
+    try:
+        assert not rag_api.claim_index_build(index_path)
+    finally:
+        holder.stdin.close()
+        holder.wait(timeout=10)
+
+    assert rag_api.claim_index_build(index_path)
+    try:
+        assert not rag_api.claim_index_build(index_path)  # a second request in this process
+    finally:
+        rag_api.release_index_build(index_path)
+    assert rag_api.claim_index_build(index_path)
+    rag_api.release_index_build(index_path)
+
+
+def test_waiting_claim_sees_the_completed_index(rag_api, tmp_path):
+    index_path = str(tmp_path / "index")
+    holder = _hold_lock_in_subprocess(f"{index_path}.lock")
+    claimed = []
+    waiter = threading.Thread(target=lambda: claimed.append(rag_api.claim_index_build(index_path, wait=True)))
+    waiter.start()
+    time.sleep(0.2)
+    assert not claimed  # blocked on the other process's build
+
+    # The other process finishes its build, then releases the lock
+    rag_api.write_index_progress(index_path, "complete", chunks_indexed=10, pages_parsed=2)
+    holder.stdin.close()
+    holder.wait(timeout=10)
+    waiter.join(timeout=10)
+    assert claimed == [False]  # nothing left to build: the caller reuses the index
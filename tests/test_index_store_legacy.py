@@ -0,0 +1,30 @@
+"""Legacy pickle indexes are refused at runtime and converted only by the migration command."""
+import pytest
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+from backend import index_store
+from tests.conftest import CountingEmbeddings
+
+
+def _legacy_index(path) -> str:
+    docs = [Document(page_content=f"Clause {n}: performance security", metadata={"page": n}) for n in range(3)]
+    FAISS.from_documents(docs, CountingEmbeddings()).save_local(str(path))
+    return str(path)
+
+
+def test_legacy_index_is_refused_by_default(tmp_path):
+    index_dir = _legacy_index(tmp_path / "legacy")
+    assert not index_store.LEGACY_PICKLE_INDEXES
+    with pytest.raises(ValueError, match="index_store.py migrate"):
+        index_store.load_index(index_dir, CountingEmbeddings())
+    assert not index_store.has_store_files(index_dir)
+
+
+def test_migration_converts_legacy_index(tmp_path):
+    index_dir = _legacy_index(tmp_path / "legacy")
+    index_store.migrate_legacy_index(index_dir, CountingEmbeddings())
+
+    vectorstore = index_store.load_index(index_dir, CountingEmbeddings())
+    assert vectorstore.index.ntotal == 3
+    assert vectorstore.docstore.search(2).page_content == "Clause 2: performance security"
@@ -0,0 +1,32 @@
+"""ResponseCache writes: batched puts and the running size total."""
+from backend.llm_cache import ResponseCache
+
+
+def _traced(cache):
+    statements = []
+    cache._conn().set_trace_callback(statements.append)
+    return statements
+
+
+def test_put_many_is_one_transaction_without_size_scans(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"), 3600, 1024 * 1024)
+    cache.put("warm", {"n": -1})  # first write reads the table total once
+    statements = _traced(cache)
+
+    cache.put_many([(f"k{n}", {"n": n}) for n in range(20)], scope="s")
+    cache.put("single", {"n": 20})
+
+    assert sum("COMMIT" in s for s in statements) == 2
+    assert not any("SUM(size)" in s for s in statements)
+    assert cache.get("k7") == {"n": 7}
+    assert len(cache.values("s")) == 20
+
+
+def test_running_total_still_enforces_the_budget(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"), 3600, 2000)
+    for batch in range(10):
+        cache.put_many([(f"k{batch}-{n}", "x" * 90) for n in range(5)])
+        assert cache.stats()["bytes"] <= 2000
+
+    assert cache.get("k9-4") is not None  # newest kept, oldest evicted
+    assert cache.get("k0-0") is None
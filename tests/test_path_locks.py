@@ -0,0 +1,41 @@
+"""Per-index load / build locks: one lock per path across threads, dropped with the LRU entry."""
+import threading
+
+
+def test_concurrent_first_callers_share_one_lock(rag_api):
+    locks, seen = {}, []
+    barrier = threading.Barrier(16)
+
+    def grab():
+        barrier.wait()
+        seen.append(rag_api._path_lock(locks, "indices/a"))
+
+    threads = [threading.Thread(target=grab) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(lock) for lock in seen}) == 1
+
+
+def test_lock_evicted_with_cache_entry_unless_held(rag_api):
+    locks = {}
+    held = rag_api._path_lock(locks, "indices/held")
+    rag_api._path_lock(locks, "indices/idle")
+    with held:
+        rag_api._drop_path_lock(locks, "indices/held")
+        rag_api._drop_path_lock(locks, "indices/idle")
+    assert list(locks) == ["indices/held"]
+
+
+def test_vectorstore_eviction_drops_load_lock(rag_api, monkeypatch):
+    from collections import OrderedDict
+    monkeypatch.setattr(rag_api, "_vectorstore_cache", OrderedDict())
+    monkeypatch.setattr(rag_api, "_vectorstore_load_locks", {})
+    monkeypatch.setattr(rag_api, "VECTORSTORE_CACHE_MAX_BYTES", 0)
+    monkeypatch.setattr(rag_api, "_index_dir_signature", lambda path: ((path, 0, 10),))
+    rag_api._path_lock(rag_api._vectorstore_load_locks, "indices/old")
+    rag_api.cache_vectorstore("indices/old", object())
+    rag_api.cache_vectorstore("indices/new", object())
+    assert "indices/old" not in rag_api._vectorstore_cache
+    assert "indices/old" not in rag_api._vectorstore_load_locks
@@ -0,0 +1,31 @@
+"""Groq clause classification: request rate limiting."""
+
+
+def test_rate_limiter_bursts_up_to_the_cap(risk_engine, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(risk_engine.time, "sleep", sleeps.append)
+    limiter = risk_engine._RateLimiter(per_minute=30)
+
+    for _ in range(30):
+        limiter.wait()
+    assert sleeps == []  # a whole document's batches start at once
+
+    limiter.wait()
+    assert len(sleeps) == 1 and 59 < sleeps[0] <= 60  # the 31st waits for the window to roll
+
+
+def test_rate_limiter_keeps_every_window_under_the_cap(risk_engine, monkeypatch):
+    clock, starts = [0.0], []
+    monkeypatch.setattr(risk_engine.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(risk_engine.time, "sleep", lambda seconds: starts.append(clock[0] + seconds))
+    limiter = risk_engine._RateLimiter(per_minute=3, window=10.0)
+
+    for now in (0, 1, 2, 3, 4, 15):
+        clock[0] = now
+        count = len(starts)
+        limiter.wait()
+        if len(starts) == count:
+            starts.append(now)  # started without waiting
+
+    assert starts == [0, 1, 2, 10, 11, 15]
+    assert all(sum(s <= t < s + 10 for t in starts) <= 3 for s in starts)